@@ -14,8 +14,19 @@
 from smv.conn.smvconnectioninfo import SmvConnectionInfo
 
 class SmvJdbcConnectionInfo(SmvConnectionInfo):
+    """JDBC connection
+
+        Besides the url, driver and credentials, the connection could define
+        defaults for the reads and writes over it:
+
+            - fetchsize: number of rows fetched per round trip of a read
+            - numpartitions: number of partitions of a read on a partition column
+            - batchsize: number of rows inserted per round trip of a write
+            - numwriters: max number of concurrent connections of a write
+    """
     def attributes(self):
-        return ["url", "driver", "user", "password"]
+        return ["url", "driver", "user", "password", "fetchsize", "numpartitions",
+            "batchsize", "numwriters"]
 
 
 class SmvHiveConnectionInfo(SmvConnectionInfo):
@@ -13,6 +13,7 @@
 
 from datetime import datetime
 from smv.error import SmvRuntimeError
+from smv.smvfingerprint import SmvInputFingerprints
 
 class DataSetResolver:
     """DataSetResolver (DSR) is the entrypoint through which the DataSetMgr acquires
@@ -37,6 +38,9 @@ class DataSetResolver:
         #Timestamp which will be injected into the resolved SmvGenericModules
         self.transaction_time = datetime.now()
 
+        # Input file listings are shared by all the SmvGenericModules of the transaction
+        self.fingerprints = SmvInputFingerprints()
+
     def loadDataSet(self, fqns):
         """Given a list of FQNs, return cached resolved version SmvGenericModules if exists, or
             otherwise load unresolved version from source and resolve them.
@@ -67,6 +71,7 @@ class DataSetResolver:
                 self.resolveStack.append(ds.fqn())
                 resolvedDs = ds.resolve(self)
                 resolvedDs.setTimestamp(self.transaction_time)
+                resolvedDs.setFingerprints(self.fingerprints)
                 self.fqn2res.update({ds.fqn(): resolvedDs})
                 self.resolveStack.pop()
                 return resolvedDs
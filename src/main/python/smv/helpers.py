@@ -236,8 +236,8 @@ class SmvGroupedData(object):
         return DataFrame(self.sgd.smvPivotCoalesce(smv_copy_array(self.df._sc, *pivotCols), smv_copy_array(self.df._sc, *valueCols), smv_copy_array(self.df._sc, *baseOutput)), self.df.sql_ctx)
 
     def smvRePartition(self, numParts):
-        """Repartition SmvGroupedData using specified partitioner on the keys. A
-            HashPartitioner with the specified number of partitions will be used.
+        """Repartition SmvGroupedData by the hash of the keys into the specified number
+            of partitions.
 
             This method is used in the cases that the key-space is very large. In the
             current Spark DF's groupBy method, the entire key-space is actually loaded
@@ -246,6 +246,10 @@ class SmvGroupedData(object):
             repartition will not guaranteed to reduce the key-space on each executor.
             In that case we need to use this function to linearly reduce the key-space.
 
+            The output is hash partitioned by the keys with Spark's own `repartition`, so
+            that a following aggregation or join on the same keys reuses the partitioning
+            instead of adding another shuffle.
+
             Example:
 
             >>> df.smvGroupBy("k1", "k2").smvRePartition(32).agg(sum("v") as "v")
@@ -617,30 +621,72 @@ class DataFrameHelper(object):
         jSgd = self._jPythonHelper.smvGroupBy(self._jdf, smv_copy_array(self._sc, *cols))
         return SmvGroupedData(self.df, keys, jSgd)
 
+    def _hashSampleKeys(self, key):
+        keys = key if isinstance(key, (list, tuple)) else [key]
+        if (len(keys) == 0):
+            raise SmvRuntimeError("at least one key column is required")
+
+        jkeys = []
+        for k in keys:
+            if is_string(k):
+                jkeys.append(F.col(k)._jc)
+            elif isinstance(k, Column):
+                jkeys.append(k._jc)
+            else:
+                raise SmvRuntimeError("key parameter must be either a String or a Column")
+        return _to_seq(jkeys)
+
     def smvHashSample(self, key, rate=0.01, seed=23):
         """Sample the df according to the hash of a column
 
-            MurmurHash3 algorithm is used for generating the hash
+            MurmurHash3 algorithm is used for generating the hash. It is Spark's
+            native hash expression, so that keys of the same value, type and seed are
+            always in or out of the sample. Earlier versions hashed the string
+            representation of the key, so the same rate and seed now select a
+            different set of keys.
 
             Args:
-                key (string or Column): column name or Column to sample on
+                key (string, Column or list): column name or Column to sample on,
+                    or a list of them to sample on their combined hash
                 rate (double): sample rate in range (0, 1] with a default of 0.01 (1%)
                 seed (int): random generator integer seed with a default of 23
 
             Example:
                 >>> df.smvHashSample(col("key"), rate=0.1, seed=123)
+                >>> df.smvHashSample(["k1", "k2"], rate=0.1)
 
             Returns:
                 (DataFrame): sampled DF
         """
-        if is_string(key):
-            jkey = F.col(key)._jc
-        elif isinstance(key, Column):
-            jkey = key._jc
-        else:
-            raise RuntimeError("key parameter must be either a String or a Column")
+        jdf = self._jDfHelper.smvHashSample(self._hashSampleKeys(key), float(rate), int(seed))
+
+        return DataFrame(jdf, self._sql_ctx)
 
-        jdf = self._jDfHelper.smvHashSample(jkey, rate, seed)
+    def smvStratifiedHashSample(self, key, strataCol, rates, seed=23):
+        """Sample each stratum of the df with its own rate, according to the hash of a column
+
+            Uses the same hash as `smvHashSample`. Rows of the strata which are not in
+            `rates` are dropped.
+
+            Args:
+                key (string, Column or list): column name or Column to sample on,
+                    or a list of them to sample on their combined hash
+                strataCol (string or Column): column which defines the strata
+                rates (dict): map from stratum value to sample rate in range [0, 1]
+                seed (int): random generator integer seed with a default of 23
+
+            Example:
+                >>> df.smvStratifiedHashSample("key", "state", {"CA": 0.01, "NV": 0.5})
+
+            Returns:
+                (DataFrame): sampled DF
+        """
+        jstrata = F.col(strataCol)._jc if is_string(strataCol) else strataCol._jc
+        jrates = _sparkContext()._jvm.PythonUtils.toScalaMap(
+            dict((k, float(v)) for (k, v) in rates.items()))
+
+        jdf = self._jDfHelper.smvStratifiedHashSample(
+            self._hashSampleKeys(key), jstrata, jrates, int(seed))
 
         return DataFrame(jdf, self._sql_ctx)
 
@@ -708,7 +754,7 @@ class DataFrameHelper(object):
         topNdf = DataFrame(self._jDfHelper._topNValsByFreq(n, col._jc), self._sql_ctx)
         return [list(r)[0] for r in topNdf.collect()]
 
-    def smvSkewJoinByKey(self, other, joinType, skewVals, key):
+    def smvSkewJoinByKey(self, other, joinType, skewVals, key, threshold=0.01, numBuckets=16, sampleRate=0.1):
         """Join that leverages broadcast (map-side) join of rows with skewed (high-frequency) values
 
             Rows keyed by skewed values are joined via broadcast join while remaining
@@ -716,11 +762,19 @@ class DataFrameHelper(object):
             infrequent enough that the filtered table is small enough for a broadcast join.
             result is the union of the join results.
 
+            When `skewVals` is None, the skewed values are detected on a sample of both sides
+            and reported in the log. Rows keyed by the detected values are joined on the key
+            plus a salt, which spreads each skewed value over `numBuckets` tasks even when it
+            is heavy on both sides. See the Scala `smvSkewJoinByKey` for details.
+
             Args:
                 other (DataFrame): DataFrame to join with
                 joinType (str): name of type of join (e.g. "inner")
-                skewVals (list(object)): list of skewed values
+                skewVals (list(object)): list of skewed values, or None to detect them
                 key (str): key on which to join (also the Column with the skewed values)
+                threshold (float): with detection, min share of the sampled rows of a value to be skewed
+                numBuckets (int): with detection, number of salt values each skewed value is spread over
+                sampleRate (float): with detection, fraction of rows sampled
 
             Example:
 
@@ -729,10 +783,18 @@ class DataFrameHelper(object):
                 will broadcast join the rows of df1 and df2 where col("cid") == "4"
                 and join the remaining rows of df1 and df2 without broadcast join.
 
+                >>> df.smvSkewJoinByKey(df2, "inner", None, "cid", threshold=0.05)
+
+                will salt the join of the values of cid with at least 5% of the rows of either side.
+
             Returns:
                 (DataFrame): the result of the join operation
         """
-        jdf = self._jDfHelper.smvSkewJoinByKey(other._jdf, joinType, _to_seq(skewVals), key)
+        if skewVals is None:
+            jdf = self._jDfHelper.smvSkewJoinByKey(
+                other._jdf, joinType, key, float(threshold), int(numBuckets), float(sampleRate))
+        else:
+            jdf = self._jDfHelper.smvSkewJoinByKey(other._jdf, joinType, _to_seq(skewVals), key)
         return DataFrame(jdf, self._sql_ctx)
 
     def smvSelectMinus(self, *cols):
@@ -787,7 +849,10 @@ class DataFrameHelper(object):
         return DataFrame(jdf, self._sql_ctx)
 
     def smvDedupByKey(self, *keys):
-        """Remove duplicate records from the DataFrame by arbitrarily selecting the first record from a set of records with same primary key or key combo.
+        """Remove duplicate records from the DataFrame by keeping the first record, in input order, from a set of records with same primary key or key combo.
+
+            Note:
+                The first record is chosen by an aggregation, without an RDD groupBy, so a large group is never held in memory.
 
             Args:
                 keys (\*string or \*Column): the column names or Columns on which to apply dedup
@@ -847,7 +912,7 @@ class DataFrameHelper(object):
             >>> def smvDedupByKeyWithOrder(self, *keys)(*orderCols)
 
             Note:
-                Same as the `smvDedupByKey` method, we use RDD groupBy in the implementation of this method to make sure we can handle large key space.
+                The first record is chosen by a window ranking within each key, without an RDD groupBy. Records tied on the ordering are picked arbitrarily.
 
             Args:
                 keys (\*string or \*Column): the column names or Columns on which to apply dedup
@@ -1007,23 +1072,27 @@ class DataFrameHelper(object):
         jdf = self._jDfHelper.smvUnpivotRegex(_to_seq(cols), colNameFn, indexColName)
         return DataFrame(jdf, self._sql_ctx)
 
-    def smvExportCsv(self, path, n=None):
+    def smvExportCsv(self, path, n=None, compression=None, partDir=None):
         """Export DataFrame to local file system
 
             Args:
                 path (string): relative path to the app running directory on local file system (instead of HDFS)
                 n (integer): optional. number of records to export. default is all records
+                compression (string): optional. compression codec name, e.g. "gzip", "bzip2" or "zstd". default is no compression
+                partDir (string): optional. when given, the partitions are written in parallel as part
+                    files under this (HDFS) directory, then concatenated into the local file.
+                    default is to stream the partitions to the driver one at a time
 
             Note:
-                Since we have to collect the DF and then call JAVA file operations, the job have to be launched as either local or yar-client mode. Also it is user's responsibility to make sure that the DF is small enough to fit into local file system.
+                Since we have to collect the DF and then call JAVA file operations, the job have to be launched as either local or yar-client mode. The driver only holds one partition at a time.
 
             Example:
                 >>> df.smvExportCsv("./target/python-test-export-csv.csv")
 
             Returns:
-                (None)
+                (integer): number of records exported
         """
-        self._jDfHelper.smvExportCsv(path, n)
+        return self._jDfHelper.smvExportCsv(path, n, compression, partDir)
 
     def smvOverlapCheck(self, keyColName):
         """For a set of DFs, which share the same key column, check the overlap across them
@@ -1291,6 +1360,27 @@ class DataFrameHelper(object):
         """
         self._println(self._smvEdd(*cols))
 
+    def _smvEddSketch(self, *cols):
+        return self._jDfHelper._smvEddSketch(_to_seq(cols)).createReport()
+
+    def smvEddSketch(self, *cols):
+        """Display EDD sketch summary
+
+            Numeric columns get approximate quantiles (q01 to q99), string, date
+            and timestamp columns get their 20 most frequent values. All columns get
+            count, null count and approximate distinct count.
+
+            Args:
+                cols (\*string): column names on which to perform EDD sketch summary
+
+            Example:
+                >>> df.smvEddSketch("a", "b")
+
+            Returns:
+                (None)
+        """
+        self._println(self._smvEddSketch(*cols))
+
     def _smvHist(self, *cols):
         return self._jDfHelper._smvHist(_to_seq(cols)).createReport()
 
@@ -1408,11 +1498,11 @@ class DataFrameHelper(object):
         """
         self._println(self._smvEddCompare(df2, ignoreColName))
 
-    def _smvDiscoverPK(self, n):
-        pk = self._jPythonHelper.smvDiscoverPK(self._jdf, n)
+    def _smvDiscoverPK(self, n, approx=False):
+        pk = self._jPythonHelper.smvDiscoverPK(self._jdf, n, approx)
         return "[{}], {}".format(", ".join(map(str, pk._1())), pk._2())
 
-    def smvDiscoverPK(self, n=10000):
+    def smvDiscoverPK(self, n=10000, approx=False):
         """Find a column combination which uniquely identifies a row from the data
 
             The resulting output is printed out
@@ -1422,15 +1512,19 @@ class DataFrameHelper(object):
 
             Args:
                 n (integer): number of rows the PK discovery algorithm will run on, defaults to 10000
+                approx (boolean): if True, run on a random sample of n rows (instead of the first n rows)
+                    and propose keys of up to 3 columns from HyperLogLog estimates computed in one pass,
+                    then verify them exactly. Defaults to False
 
             Example:
                 >>> df.smvDiscoverPK(5000)
+                >>> df.smvDiscoverPK(5000, approx=True)
 
             Returns:
                 (None)
 
         """
-        self._println(self._smvDiscoverPK(n))
+        self._println(self._smvDiscoverPK(n, approx))
 
     def smvDupeCheck(self, keys, n=10000):
         """For a given list of potential keys, check for duplicated records with the number of duplications and all the columns.
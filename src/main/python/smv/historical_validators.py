@@ -1,3 +1,8 @@
+import json
+
+from smv.utils import smv_copy_array
+
+
 def SmvHistoricalValidators(*validators):
     """Decorator to specify set of validators to apply to an SmvGenericModule.
 
@@ -68,3 +73,91 @@ class SmvHistoricalValidator(object):
     def validateMetadata(self, cur, hist):
         """identical interface to standard dataset `validateMetadata` method"""
         raise NotImplementedError("missing validateMetadata() method")
+
+
+def _sketchValues(edd_rows, col):
+    """Extract the EDD results of a column as {taskName: value}
+
+        `edd_rows` are EDD results as dicts (`colName`, `taskType`, `taskName`,
+        `taskDesc`, `valueJSON`), such as the `_edd` entry of module metadata.
+        Histogram values are {item: count}.
+    """
+    res = {}
+    for r in edd_rows:
+        if r['colName'] != col:
+            continue
+        v = json.loads(r['valueJSON'])
+        res[r['taskName']] = v['hist'] if r['taskType'] == 'hist' else v
+    return res
+
+
+def _eddDrift(cur, hist):
+    """Compare the sketch values (see `_sketchValues`) of 2 runs of a column
+
+        Returns a list of (measure, drift) pairs:
+            - quantiles: largest quantile shift, relative to the historical q01-q99 range
+            - distinct count: relative change of the approx distinct count
+            - null rate: change of the null rate
+            - frequent items: largest change of the share of a frequent item
+    """
+    res = []
+
+    qs = [k for k in hist if k.startswith('q') and k in cur
+          and hist[k] is not None and cur[k] is not None]
+    if qs:
+        spread = (hist.get('q99') or 0.0) - (hist.get('q01') or 0.0)
+        if spread <= 0:
+            spread = abs(hist.get('q50') or 0.0) or 1.0
+        res.append(('quantiles', max(abs(cur[k] - hist[k]) for k in qs) / spread))
+
+    if cur.get('dct') is not None and hist.get('dct') is not None:
+        res.append(('distinct count', float(abs(cur['dct'] - hist['dct'])) / max(hist['dct'], 1)))
+
+    def total(m):
+        return (m.get('cnt') or 0) + (m.get('nct') or 0)
+
+    if total(cur) > 0 and total(hist) > 0:
+        res.append(('null rate', abs(float(cur.get('nct') or 0) / total(cur) -
+                                     float(hist.get('nct') or 0) / total(hist))))
+
+        if 'fqi' in cur and 'fqi' in hist:
+            items = set(cur['fqi']) | set(hist['fqi'])
+            if items:
+                res.append(('frequent items', max(
+                    abs(float(cur['fqi'].get(i, 0)) / total(cur) -
+                        float(hist['fqi'].get(i, 0)) / total(hist)) for i in items)))
+
+    return res
+
+
+class SmvEddDriftValidator(SmvHistoricalValidator):
+    """Check the distribution of a column against the previous run, with EDD sketches
+
+        The metadata is the EDD sketch summary of the column (count, null count,
+        approx distinct count, and approx quantiles for numeric columns or the most
+        frequent values otherwise). The current run is compared with the stored
+        metadata of the previous run, so the old data is never read again.
+
+        Args:
+            col (string): column name
+            threshold (float): allowed drift of each measure, range [0,1]
+    """
+    def __init__(self, col, threshold=0.1):
+        super(SmvEddDriftValidator, self).__init__(col, threshold)
+        self.col = col
+        self.threshold = threshold
+
+    def metadata(self, df):
+        rows = df._sc._jvm.SmvPythonHelper.getEddSketchJsonArray(
+            df._jdf, smv_copy_array(df._sc, self.col))
+        return _sketchValues([json.loads(r) for r in rows], self.col)
+
+    def validateMetadata(self, cur, hist):
+        if len(hist) == 0:
+            return None
+        # history is ordered from the latest run
+        failed = [(m, d) for (m, d) in _eddDrift(cur, hist[0]) if d > self.threshold]
+        if failed:
+            return "SmvEddDriftValidator: column %s: %s" % (
+                self.col, ", ".join("%s drift = %g" % (m, d) for (m, d) in failed))
+        return None
@@ -21,9 +21,9 @@ from pyspark.sql.types import StructType
 from smv.iomod.base import SmvInput, AsTable, AsFile
 from smv.smviostrategy import SmvJdbcIoStrategy, SmvHiveIoStrategy, \
     SmvSchemaOnHdfsIoStrategy, SmvCsvOnHdfsIoStrategy, SmvTextOnHdfsIoStrategy,\
-    SmvXmlOnHdfsIoStrategy
+    SmvXmlOnHdfsIoStrategy, SmvColumnarOnHdfsIoStrategy
 from smv.dqm import SmvDQM
-from smv.utils import lazy_property
+from smv.utils import lazy_property, smvhash
 from smv.error import SmvRuntimeError
 
 
@@ -33,11 +33,95 @@ class SmvJdbcInputTable(SmvInput, AsTable):
 
             - connectionName
             - tableName
+
+        By default the table is read in a single task over a single connection.
+        To read it in parallel, either implement
+
+            - partitionColumn: an integral column, the range between its bounds
+              is split in numPartitions even strides
+            - lowerBound/upperBound: optional, looked up with a MIN/MAX query
+            - numPartitions: optional, defaults to the connection's numpartitions,
+              then to Spark's default parallelism
+
+        or
+
+            - predicates: list of WHERE clauses, each defines a partition
+
+        Other optional methods
+
+            - userQuery: query to read instead of the table, pushed down to the database
+            - fetchSize: rows per round trip, defaults to the connection's fetchsize
     """
+    def userQuery(self):
+        """Optional SQL query to read from instead of the whole table
+
+            Returns:
+                (str)
+        """
+        return None
+
+    def partitionColumn(self):
+        """Optional integral column to partition the read on
+
+            Returns:
+                (str)
+        """
+        return None
+
+    def lowerBound(self):
+        """Optional lower bound of the partition column
+
+            Returns:
+                (int)
+        """
+        return None
+
+    def upperBound(self):
+        """Optional upper bound of the partition column
+
+            Returns:
+                (int)
+        """
+        return None
+
+    def numPartitions(self):
+        """Optional number of partitions of a read on the partition column
+
+            Returns:
+                (int)
+        """
+        return None
+
+    def predicates(self):
+        """Optional list of WHERE clauses, one partition for each of them
+
+            Returns:
+                (list(str))
+        """
+        return None
+
+    def fetchSize(self):
+        """Optional number of rows fetched per round trip
+
+            Returns:
+                (int)
+        """
+        return None
 
     def doRun(self, known):
         conn = self.get_connection()
-        return SmvJdbcIoStrategy(self.smvApp, conn, self.tableName()).read()
+        return SmvJdbcIoStrategy(
+            self.smvApp,
+            conn,
+            self.tableName(),
+            query=self.userQuery(),
+            partition_column=self.partitionColumn(),
+            lower_bound=self.lowerBound(),
+            upper_bound=self.upperBound(),
+            num_partitions=self.numPartitions(),
+            predicates=self.predicates(),
+            fetch_size=self.fetchSize()
+        ).read()
 
 
 class SmvHiveInputTable(SmvInput, AsTable):
@@ -53,7 +137,30 @@ class SmvHiveInputTable(SmvInput, AsTable):
         return SmvHiveIoStrategy(self.smvApp, conn, self.tableName()).read()
 
 
-class InputFileWithSchema(SmvInput, AsFile):
+class InputFile(SmvInput, AsFile):
+    """Base class for input files, the module hash follows the content fingerprint
+        of the files
+    """
+
+    def fingerprintWithChecksum(self):
+        """Optional, when True the file system checksums of the input files are part
+            of the input fingerprint as well, default False (paths, sizes and
+            modification times only)
+        """
+        return False
+
+    def _data_path(self):
+        """Full path of the input data"""
+        return os.path.join(self.get_connection().path, self.fileName())
+
+    def instanceValHash(self):
+        """Hash of the fingerprint of all the input files, so any added, removed
+            or rewritten file changes the module's hash
+        """
+        return self.inputFingerprintHash(self._data_path(), self.fingerprintWithChecksum())
+
+
+class InputFileWithSchema(InputFile):
     """Base class for input files which has input schema"""
 
     def schemaConnectionName(self):
@@ -121,6 +228,11 @@ class SmvXmlInputFile(InputFileWithSchema):
             - schemaConnectionName: optional
             - schemaFileName: optional
             - userSchema: optional
+            - samplingRatio: optional
+
+        Without a userSchema or a schema file, the schema is inferred from the data
+        and saved in the output dir. Later runs reuse it, as long as the input
+        files and the rowTag are unchanged. Saving a new one removes the older ones.
     """
 
     @abc.abstractmethod
@@ -128,6 +240,24 @@ class SmvXmlInputFile(InputFileWithSchema):
         """XML tag for identifying a record (row)"""
         pass
 
+    def samplingRatio(self):
+        """Optional fraction of the records to infer the schema from,
+            default None for all of them
+        """
+        return None
+
+    def _schema_cache_path(self):
+        """Path of the inferred schema, keyed by the input fingerprint, the rowTag
+            and the sampling ratio
+        """
+        fp = self.fingerprints.fingerprint(self.smvApp, self._data_path())
+        key = smvhash("{}|{}|{}".format(fp, self.rowTag(), self.samplingRatio())) & 0xffffffff
+        return "{}/{}_{:08x}.xmlschema.json".format(self.smvApp.outputDir(), self.fqn(), key)
+
+    def _schema_cache_glob(self):
+        """Glob pattern of the inferred schemas of the input, for any key"""
+        return "{}/{}_????????.xmlschema.json".format(self.smvApp.outputDir(), self.fqn())
+
     def _schema(self):
         """load schema from userSchema (as a json string) or a json file"""
         def str_to_schema(s):
@@ -145,14 +275,93 @@ class SmvXmlInputFile(InputFileWithSchema):
 
     def doRun(self, known):
         """readin xml data"""
-        file_path = os.path.join(self.get_connection().path, self.fileName())
+        file_path = self._data_path()
         return SmvXmlOnHdfsIoStrategy(
             self.smvApp,
             file_path,
             self.rowTag(),
-            self._schema()
+            self._schema(),
+            schema_cache_path=self._schema_cache_path(),
+            sampling_ratio=self.samplingRatio(),
+            schema_cache_glob=self._schema_cache_glob()
+        ).read()
+
+class SmvColumnarInputFile(InputFile):
+    """Base class for input files in a self-describing columnar (or binary) format
+        User need to implement:
+
+            - connectionName: required
+            - fileName: required, a file, a directory or a glob pattern
+            - requiredColumns: optional
+            - partitionFilter: optional
+            - mergeSchema: optional
+            - fingerprintWithChecksum: optional
+
+        The column selection and the filter are applied right after the read, so
+        Spark prunes the columns and the partition directories. The Parquet reader
+        also uses the filter on the data columns, the ORC reader only does when the
+        spark.sql.orc.filterPushdown config is true (false by default)
+    """
+
+    @abc.abstractmethod
+    def _format(self):
+        """Spark data source format name"""
+
+    def requiredColumns(self):
+        """Optional list of the columns to read, default None for all of them
+
+            Returns:
+                (list(str))
+        """
+        return None
+
+    def partitionFilter(self):
+        """Optional filter applied at read time, typically on partition columns.
+            Could be a SQL expression string or a Column
+
+            Returns:
+                (str|Column)
+        """
+        return None
+
+    def mergeSchema(self):
+        """Optional, whether to merge the schemas of all the files. Default None
+            for the spark.sql.*.mergeSchema config. Ignored by the Avro format
+
+            Returns:
+                (bool)
+        """
+        return None
+
+    def doRun(self, known):
+        return SmvColumnarOnHdfsIoStrategy(
+            self.smvApp,
+            self._data_path(),
+            self._format(),
+            columns=self.requiredColumns(),
+            partition_filter=self.partitionFilter(),
+            merge_schema=self.mergeSchema()
         ).read()
 
+
+class SmvParquetInputFile(SmvColumnarInputFile):
+    """Input from Parquet files, see SmvColumnarInputFile"""
+    def _format(self):
+        return "parquet"
+
+
+class SmvOrcInputFile(SmvColumnarInputFile):
+    """Input from ORC files, see SmvColumnarInputFile"""
+    def _format(self):
+        return "orc"
+
+
+class SmvAvroInputFile(SmvColumnarInputFile):
+    """Input from Avro files, see SmvColumnarInputFile"""
+    def _format(self):
+        return "com.databricks.spark.avro"
+
+
 class WithCsvParser(SmvInput):
     """Mixin for input modules to parse csv data"""
 
@@ -187,6 +396,12 @@ class WithCsvParser(SmvInput):
         else:
             return self.dqmValidator.createParserValidator()
 
+    def csvEngine(self):
+        """Engine to parse the csv data with: "smv" (default) for SMV's own parser,
+            or "spark" for Spark's native CSV data source (Spark 2.2+, no Map/Array fields)
+        """
+        return "smv"
+
 class WithSmvSchema(InputFileWithSchema):
     def _smv_schema(self):
         """Return the schema specified by user either through
@@ -218,18 +433,20 @@ class SmvCsvInputFile(WithSmvSchema, WithCsvParser):
             - userSchema: optional
             - failAtParsingError: optional, default True
             - dqm: optional, default SmvDQM()
+            - csvEngine: optional, default "smv"
     """
 
     def doRun(self, known):
         self._assert_file_postfix(".csv")
 
-        file_path = os.path.join(self.get_connection().path, self.fileName())
+        file_path = self._data_path()
 
         return SmvCsvOnHdfsIoStrategy(
             self.smvApp,
             file_path,
             self._smv_schema(),
-            self.readerLogger()
+            self.readerLogger(),
+            engine=self.csvEngine()
         ).read()
 
 
@@ -244,12 +461,16 @@ class SmvMultiCsvInputFiles(WithSmvSchema, WithCsvParser):
             - userSchema: optional
             - failAtParsingError: optional, default True
             - dqm: optional, default SmvDQM()
+            - csvEngine: optional, default "smv"
+            - minPartitions: optional, default 0
+            - maxSplitSizeMB: optional, default 0
     """
 
     @abc.abstractmethod
     def dirName(self):
         """Path to the directory containing the csv files
-            relative to the path defined in the connection
+            relative to the path defined in the connection. Could also be
+            a glob pattern
 
             Returns:
                 (str)
@@ -270,29 +491,33 @@ class SmvMultiCsvInputFiles(WithSmvSchema, WithCsvParser):
     def fileName(self):
         return None
 
-    def doRun(self, known):
-        dir_path = os.path.join(self.get_connection().path, self.dirName())
-        smv_schema = self._smv_schema()
+    def _data_path(self):
+        return os.path.join(self.get_connection().path, self.dirName())
 
-        flist = self.smvApp._jvm.SmvHDFS.dirList(dir_path).array()
-        # ignore all hidden files in the data dir
-        filesInDir = [os.path.join(dir_path, n) for n in flist if not n.startswith(".")]
+    def minPartitions(self):
+        """Optional minimum number of partitions, default 0 for Spark's default"""
+        return 0
 
-        if (not filesInDir):
-            raise SmvRuntimeError("There are no data files in {}".format(dir_path))
+    def maxSplitSizeMB(self):
+        """Optional max size (in MB) of the partitions small files are combined into,
+            default 0 for no combining
+        """
+        return 0
 
-        combinedDf = None
-        reader_logger = self.readerLogger()
-        for filePath in filesInDir:
-            df = SmvCsvOnHdfsIoStrategy(
-                self.smvApp,
-                filePath,
-                smv_schema,
-                reader_logger
-            ).read()
-            combinedDf = df if (combinedDf is None) else combinedDf.unionAll(df)
+    def doRun(self, known):
+        dir_path = self._data_path()
 
-        return combinedDf
+        # all the files (hidden files ignored) are read in a single scan, and
+        # the header, if any, is dropped from each of them
+        return SmvCsvOnHdfsIoStrategy(
+            self.smvApp,
+            dir_path,
+            self._smv_schema(),
+            self.readerLogger(),
+            self.minPartitions(),
+            self.maxSplitSizeMB(),
+            engine=self.csvEngine()
+        ).read()
 
 
 __all__ = [
@@ -301,4 +526,7 @@ __all__ = [
     'SmvXmlInputFile',
     'SmvCsvInputFile',
     'SmvMultiCsvInputFiles',
+    'SmvParquetInputFile',
+    'SmvOrcInputFile',
+    'SmvAvroInputFile',
 ]
@@ -11,6 +11,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
 import os
 import re
 
@@ -34,6 +35,73 @@ class WithSparkDfWriter(object):
         return "errorifexists"
 
 
+class WithOutputFileSize(object):
+    """Mixin for file output modules to control the number and the size of the
+        output files
+    """
+    def numOutputFiles(self):
+        """Number of files to write (per partition directory for partitioned
+            output), default None to keep one file per partition of the data
+
+            Returns:
+                (int)
+        """
+        return None
+
+    def targetFileSizeMB(self):
+        """Target size (in MB) of the output files, ignored when numOutputFiles is
+            given. The data is written to a temporary dir first; when it has more
+            files than its size needs, it is read back and compacted into
+            ceil(size / target) files.
+
+            Returns:
+                (int)
+        """
+        return None
+
+    @staticmethod
+    def _layout(df, n, partition_by):
+        if (partition_by):
+            # all the rows of a partition value go to the same task, so there are
+            # at most n files in total and one file per partition directory
+            return df.repartition(n, *partition_by)
+        else:
+            return df.coalesce(n)
+
+    def _write_sized(self, df, file_path, write, read, partition_by=None, overwrite=True):
+        """Write the data with write(df, path), compacting the files with read(path)
+            if needed. When not overwriting, the compacted data is always written
+            over again with write, instead of renamed into place.
+        """
+        n = self.numOutputFiles()
+        target_mb = self.targetFileSizeMB()
+        hdfs = self.smvApp._jvm.SmvHDFS
+
+        if (n is not None):
+            write(self._layout(df, n, partition_by), file_path)
+        elif (target_mb is not None):
+            tmp_path = file_path + ".smv_tmp"
+            hdfs.deleteFile(tmp_path)
+            try:
+                write(df, tmp_path)
+
+                size = hdfs.totalSize(tmp_path)
+                n_needed = max(1, int(math.ceil(float(size) / (target_mb * 1024 * 1024))))
+                n_files = hdfs.fileCount(tmp_path)
+                self.smvApp.log.info("{}: {} bytes in {} files, target {} files".format(
+                    self.fqn(), size, n_files, n_needed))
+
+                if (n_files <= n_needed and (overwrite or not hdfs.exists(file_path))):
+                    hdfs.rename(tmp_path, file_path)
+                else:
+                    write(self._layout(read(tmp_path), n_needed, partition_by), file_path)
+            finally:
+                # nothing is left once renamed, otherwise also removed when a step failed
+                hdfs.deleteFile(tmp_path)
+        else:
+            write(df, file_path)
+
+
 class SmvJdbcOutputTable(SmvSparkDfOutput, WithSparkDfWriter, AsTable):
     """
         User need to implement
@@ -42,14 +110,78 @@ class SmvJdbcOutputTable(SmvSparkDfOutput, WithSparkDfWriter, AsTable):
             - connectionName
             - tableName
             - writeMode: optional, default "errorifexists"
+            - batchSize: optional, default to the connection's batchsize
+            - isolationLevel: optional, default "READ_UNCOMMITTED"
+            - numWriters: optional, default to the connection's numwriters
+            - truncate: optional, default False
+            - upsertKeys: optional, default None
     """
+    def batchSize(self):
+        """Number of rows inserted per round trip
+
+            Returns:
+                (int)
+        """
+        return None
+
+    def isolationLevel(self):
+        """Transaction isolation level of the write. Valid values:
+
+                - "NONE"
+                - "READ_UNCOMMITTED" (Spark's default)
+                - "READ_COMMITTED"
+                - "REPEATABLE_READ"
+                - "SERIALIZABLE"
+        """
+        return None
+
+    def numWriters(self):
+        """Max number of concurrent connections, the data is coalesced to that
+            many partitions before the write
+
+            Returns:
+                (int)
+        """
+        return None
+
+    def truncate(self):
+        """With "overwrite" write mode, truncate the table instead of dropping and
+            re-creating it. Keeps the table definition, indexes and grants.
+
+            Returns:
+                (bool)
+        """
+        return False
+
+    def upsertKeys(self):
+        """Key columns to upsert the data by
+
+            When given, the rows of the table with the same keys as the new rows
+            are replaced and the other new rows inserted, in a single transaction.
+            The data is first written to a uniquely named "<tableName>_smv_stage_*"
+            table. The keys are matched with "=", so rows with a null key are
+            rejected (the upsert fails). Write mode is ignored.
+
+            Returns:
+                (list(str))
+        """
+        return None
 
     def doRun(self, known):
         data = self.get_spark_df(known)
         conn = self.get_connection()
 
-        SmvJdbcIoStrategy(self.smvApp, conn, self.tableName(), self.writeMode())\
-            .write(data)
+        SmvJdbcIoStrategy(
+            self.smvApp,
+            conn,
+            self.tableName(),
+            self.writeMode(),
+            batch_size=self.batchSize(),
+            isolation_level=self.isolationLevel(),
+            num_writers=self.numWriters(),
+            truncate=self.truncate(),
+            upsert_keys=self.upsertKeys()
+        ).write(data)
 
         # return data back for meta calculation
         # TODO: need to review whether we should even calculate meta for output
@@ -64,25 +196,58 @@ class SmvHiveOutputTable(SmvSparkDfOutput, WithSparkDfWriter, AsTable):
             - connectionName
             - tableName
             - writeMode: optional, default "errorifexists"
+            - partitionBy: optional, default None
+            - atomicSwap: optional, default False
+
+        With "overwrite" write mode, the table is only re-created when its schema
+        changed, otherwise the data is inserted over the existing table.
     """
+    def partitionBy(self):
+        """Partition columns of the table
+
+            With "overwrite" write mode, only the partitions present in the data
+            are replaced, the others are kept.
+
+            Returns:
+                (list(str))
+        """
+        return None
+
+    def atomicSwap(self):
+        """With "overwrite" write mode, write the data to a new table and swap
+            it in with renames, so that the table is never missing or partially
+            written while the data is written
+
+            Returns:
+                (bool)
+        """
+        return False
 
     def doRun(self, known):
         data = self.get_spark_df(known)
         conn = self.get_connection()
 
-        SmvHiveIoStrategy(self.smvApp, conn, self.tableName(), self.writeMode())\
-            .write(data)
+        SmvHiveIoStrategy(
+            self.smvApp,
+            conn,
+            self.tableName(),
+            self.writeMode(),
+            partition_by=self.partitionBy(),
+            atomic_swap=self.atomicSwap()
+        ).write(data)
 
         return data
 
 
-class SmvCsvOutputFile(SmvSparkDfOutput, AsFile):
+class SmvCsvOutputFile(SmvSparkDfOutput, WithOutputFileSize, AsFile):
     """
         User need to implement
 
             - requiresDS
             - connectionName
             - fileName
+            - numOutputFiles: optional, default None
+            - targetFileSizeMB: optional, default None
     """
     def doRun(self, known):
         data = self.get_spark_df(known)
@@ -92,12 +257,77 @@ class SmvCsvOutputFile(SmvSparkDfOutput, AsFile):
         smvSchemaObj = self.smvApp.j_smvPyClient.getSmvSchema()
         schema = smvSchemaObj.fromDataFrame(data._jdf, "_SmvStrNull_", self.smvApp.scalaOption(CsvAttributes()))
 
-        SmvCsvOnHdfsIoStrategy(self.smvApp, file_path, schema, None).write(data)
+        def write(df, path):
+            SmvCsvOnHdfsIoStrategy(self.smvApp, path, schema, None).write(df)
+
+        def read(path):
+            logger = self.smvApp._jvm.SmvPythonHelper.getTerminateParserLogger()
+            return SmvCsvOnHdfsIoStrategy(self.smvApp, path, schema, logger).read()
+
+        self._write_sized(data, file_path, write, read)
         SmvSchemaOnHdfsIoStrategy(self.smvApp, schema_path).write(schema)
         return data
 
+
+class SmvParquetOutputFile(SmvSparkDfOutput, WithSparkDfWriter, WithOutputFileSize, AsFile):
+    """
+        User need to implement
+
+            - requiresDS
+            - connectionName
+            - fileName
+            - writeMode: optional, default "errorifexists"
+            - partitionBy: optional, default None
+            - compression: optional, default None
+            - numOutputFiles: optional, default None
+            - targetFileSizeMB: optional, default None
+    """
+    def partitionBy(self):
+        """Columns to partition the output directories by
+
+            Returns:
+                (list(str))
+        """
+        return None
+
+    def compression(self):
+        """Parquet compression codec, e.g. "snappy", "gzip" or "none". Default
+            None for the spark.sql.parquet.compression.codec config
+
+            Returns:
+                (str)
+        """
+        return None
+
+    def doRun(self, known):
+        data = self.get_spark_df(known)
+        file_path = os.path.join(self.get_connection().path, self.fileName())
+        partition_by = self.partitionBy()
+        mode = self.writeMode()
+
+        def writer(df, m):
+            w = df.write.mode(m)
+            if (partition_by):
+                w = w.partitionBy(*partition_by)
+            if (self.compression() is not None):
+                w = w.option("compression", self.compression())
+            return w
+
+        def write(df, path):
+            # the temporary dir of a compaction is always overwritten
+            writer(df, mode if path == file_path else "overwrite").parquet(path)
+
+        def read(path):
+            # read back the partition columns with their original types
+            return self.smvApp.sqlContext.read.schema(data.schema).parquet(path)\
+                .select(*data.columns)
+
+        self._write_sized(data, file_path, write, read, partition_by, overwrite=(mode == "overwrite"))
+        return data
+
 __all__ = [
     'SmvJdbcOutputTable',
     'SmvHiveOutputTable',
     'SmvCsvOutputFile',
+    'SmvParquetOutputFile',
 ]
@@ -248,14 +248,16 @@ class SmvApp(object):
     def appId(self):
         return self.py_smvconf.app_id()
 
-    def discoverSchemaAsSmvSchema(self, path, csvAttributes, n=100000):
+    def discoverSchemaAsSmvSchema(self, path, csvAttributes, n=100000, sampling="head", seed=23):
         """Discovers the schema of a .csv file and returns a Scala SmvSchema instance
 
         path --- path to csvfile
         n --- number of records used to discover schema (optional)
         csvAttributes --- Scala CsvAttributes instance (optional)
+        sampling --- how the records are chosen: "head", "random" or "stratified" (optional)
+        seed --- random seed of the "random" and "stratified" samplings (optional)
         """
-        return self._jvm.SmvPythonHelper.discoverSchemaAsSmvSchema(path, n, csvAttributes)
+        return self._jvm.SmvPythonHelper.discoverSchemaAsSmvSchema(path, n, csvAttributes, sampling, seed)
 
     def getSchemaByDataFileAsSmvSchema(self, data_file_name):
         """Get the schema of a data file from its path and returns a Scala SmvSchema instance.
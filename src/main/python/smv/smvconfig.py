@@ -136,9 +136,27 @@ class SmvConfig(object):
         """
         return self.merged_props().get("smv.sparkdf.defaultPersistFormat", "parquet_on_hdfs")
 
+    def csv_persist_compression(self):
+        """Compression codec of the smvcsv persisted and published files, e.g. gzip,
+            bzip2 (splittable), snappy or zstd. Default is no compression
+        """
+        return self.merged_props().get("smv.sparkdf.csvCompression") or None
+
     def use_lock(self):
         return self._get_prop_as_bool("smv.lock")
 
+    def export_csv_compression(self):
+        """Compression codec of --export-csv files, e.g. gzip, bzip2 or zstd.
+            Default is no compression
+        """
+        return self.merged_props().get("smv.exportCsv.compression") or None
+
+    def export_csv_parallel(self):
+        """Whether --export-csv writes part files in parallel before concatenating
+            them, instead of streaming the partitions to the driver one at a time
+        """
+        return self._get_prop_as_bool("smv.exportCsv.parallel")
+
     def get_run_config(self, key):
         """Run config will be accessed within client modules. Return 
             run-config value of the given key.
@@ -0,0 +1,50 @@
+#
+# This file is licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content fingerprints of input files
+
+    A fingerprint covers all the files a path matches: the path could be a file, a
+    directory, a glob pattern or a comma-separated list of them. Like the input
+    formats, only the direct files of a directory are matched, unless
+    mapreduce.input.fileinputformat.input.dir.recursive is set. It is a digest of
+    the (path, size, modification time) of every matched file, optionally with the file system checksums, so any added, removed or
+    rewritten file changes it.
+"""
+
+
+class SmvInputFingerprints(object):
+    """Cache of input fingerprints for a single transaction
+
+        The files are listed once per path within a transaction, however many modules
+        read from that path. A new transaction starts with an empty cache, so changes
+        made between transactions are always picked up.
+    """
+    def __init__(self):
+        self._cache = {}
+
+    def fingerprint(self, smvApp, path, with_checksum=False):
+        """Return the fingerprint (hex string) of the files matched by the path
+
+            Args:
+                smvApp (SmvApp): the app, whose Hadoop configuration decides whether
+                    directories are listed recursively
+                path (str): file, directory, glob pattern or comma-separated list of them
+                with_checksum (bool): also digest the file system checksums of the files,
+                    which detects content changes that keep the size and modification
+                    time, at the cost of reading the checksums (from HDFS block metadata)
+        """
+        key = (path, with_checksum)
+        if (key not in self._cache):
+            conf = smvApp.sc._jsc.hadoopConfiguration()
+            self._cache[key] = smvApp._jvm.org.tresamigos.smv.SmvHDFS.fingerprint(
+                path, with_checksum, conf)
+        return self._cache[key]
@@ -0,0 +1,233 @@
+#
+# This file is licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""File system backends for small SMV bookkeeping files
+
+    Metadata (.meta, .hist), lock (.lock), semaphore (.semaphore) and schema
+    (.schema) files are tiny and touched many times per run. For paths on the
+    local file system (including NFS mounts) they are handled with native
+    Python file operations. Only paths which resolve to other file systems
+    (HDFS, S3, etc.) go through the JVM's SmvHDFS helper.
+"""
+import io
+import os
+import re
+import shutil
+import uuid
+
+# os.replace is atomic and overwrites on all platforms, but only exists in Python 3
+_atomic_rename = getattr(os, 'replace', os.rename)
+
+# scheme of the JVM's default Hadoop file system, looked up once per process
+_default_fs_scheme = None
+
+
+def _jvm_default_fs_scheme(_jvm):
+    global _default_fs_scheme
+    if (_default_fs_scheme is None):
+        _default_fs_scheme = _jvm.org.tresamigos.smv.SmvHDFS.defaultFsScheme()
+    return _default_fs_scheme
+
+
+def _local_path(_jvm, path):
+    """Return the local file system path of the given path, or None if the path
+        is not on the local file system
+
+        Paths without a scheme are resolved the same way Hadoop resolves them,
+        against the default file system (fs.defaultFS)
+    """
+    m = re.match(r"^([a-zA-Z][a-zA-Z0-9+.\-]*):(.*)$", path)
+    if (m is None):
+        return path if _jvm_default_fs_scheme(_jvm) == "file" else None
+    elif (m.group(1).lower() == "file"):
+        # file:///a/b and file:/a/b both refer to /a/b
+        return re.sub(r"^//(?=/)", "", m.group(2))
+    else:
+        return None
+
+
+class SmvJvmFsBackend(object):
+    """Small file operations through the JVM's Hadoop FileSystem"""
+    def __init__(self, _jvm):
+        self._jvm = _jvm
+
+    @property
+    def _hdfs(self):
+        return self._jvm.org.tresamigos.smv.SmvHDFS
+
+    def exists(self, path):
+        return self._hdfs.exists(path)
+
+    def createFileAtomic(self, path):
+        self._hdfs.createFileAtomic(path)
+
+    def deleteFile(self, path):
+        return self._hdfs.deleteFile(path)
+
+    def readFromFile(self, path):
+        return self._hdfs.readFromFile(path)
+
+    def writeToFile(self, contents, path):
+        self._hdfs.writeToFile(contents, path)
+
+    def copy(self, src, dst):
+        self._hdfs.copy(src, dst)
+
+
+class SmvLocalFsBackend(object):
+    """Small file operations on the local file system with native Python calls
+
+        Files written by Hadoop's LocalFileSystem have a hidden ".<name>.crc"
+        checksum sibling. It is removed whenever the file is replaced or deleted,
+        so that a later read through Hadoop does not fail the checksum.
+    """
+    def __init__(self, local_path):
+        self._local_path = local_path
+
+    @staticmethod
+    def _crc_path(path):
+        dirname, basename = os.path.split(path)
+        return os.path.join(dirname, ".{}.crc".format(basename))
+
+    def _remove_crc(self, path):
+        crc = self._crc_path(path)
+        if (os.path.exists(crc)):
+            os.remove(crc)
+
+    def _ensure_parent(self, path):
+        parent = os.path.dirname(path)
+        if (parent and not os.path.isdir(parent)):
+            try:
+                os.makedirs(parent)
+            except OSError:
+                # created concurrently by another process
+                if (not os.path.isdir(parent)):
+                    raise
+
+    def exists(self, path):
+        return os.path.exists(self._local_path(path))
+
+    def createFileAtomic(self, path):
+        """Create an empty file, fail if the file already exists"""
+        lpath = self._local_path(path)
+        self._ensure_parent(lpath)
+        fd = os.open(lpath, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        os.close(fd)
+
+    def deleteFile(self, path):
+        lpath = self._local_path(path)
+        if (os.path.isdir(lpath) and not os.path.islink(lpath)):
+            shutil.rmtree(lpath)
+        elif (os.path.lexists(lpath)):
+            os.remove(lpath)
+        else:
+            return False
+        self._remove_crc(lpath)
+        return True
+
+    def readFromFile(self, path):
+        with io.open(self._local_path(path), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def writeToFile(self, contents, path):
+        """Write the contents to a temp file in the same directory, then atomically
+            rename it onto the target, so readers never see a partial file
+        """
+        if (not isinstance(contents, type(u""))):
+            contents = contents.decode("utf-8")
+
+        lpath = self._local_path(path)
+        self._ensure_parent(lpath)
+        if (os.path.isdir(lpath)):
+            shutil.rmtree(lpath)
+
+        dirname, basename = os.path.split(lpath)
+        tmp_path = os.path.join(dirname, ".{}.{}.tmp".format(basename, uuid.uuid4().hex))
+        try:
+            with io.open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(contents)
+            _atomic_rename(tmp_path, lpath)
+        finally:
+            if (os.path.exists(tmp_path)):
+                os.remove(tmp_path)
+        self._remove_crc(lpath)
+
+    def _link_or_copy(self, src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            # different devices, or links not supported by the file system
+            shutil.copy2(src, dst)
+
+    def copy(self, src, dst):
+        """Copy a file or a directory tree, replacing the destination. Files are
+            hard linked when possible, which costs no data copy. The persisted
+            files are never modified in place, so sharing their content is safe.
+        """
+        lsrc = self._local_path(src)
+        ldst = self._local_path(dst)
+        self.deleteFile(dst)
+        self._ensure_parent(ldst)
+
+        if (os.path.isdir(lsrc)):
+            for (dirpath, _, filenames) in os.walk(lsrc):
+                target_dir = os.path.join(ldst, os.path.relpath(dirpath, lsrc))
+                if (not os.path.isdir(target_dir)):
+                    os.makedirs(target_dir)
+                for f in filenames:
+                    self._link_or_copy(os.path.join(dirpath, f), os.path.join(target_dir, f))
+        else:
+            self._link_or_copy(lsrc, ldst)
+
+
+class SmvFsBackend(object):
+    """Dispatch small file operations to the local or the JVM backend based on the path
+
+        Args:
+            _jvm: the py4j JVM view, only used for non-local paths and for looking up
+                the default file system once
+    """
+    def __init__(self, _jvm):
+        self._jvm = _jvm
+        self._jvm_backend = SmvJvmFsBackend(_jvm)
+        self._local_backend = SmvLocalFsBackend(self._to_local)
+
+    def _to_local(self, path):
+        return _local_path(self._jvm, path)
+
+    def _backend(self, path):
+        if (self._to_local(path) is not None):
+            return self._local_backend
+        else:
+            return self._jvm_backend
+
+    def exists(self, path):
+        return self._backend(path).exists(path)
+
+    def createFileAtomic(self, path):
+        self._backend(path).createFileAtomic(path)
+
+    def deleteFile(self, path):
+        return self._backend(path).deleteFile(path)
+
+    def readFromFile(self, path):
+        return self._backend(path).readFromFile(path)
+
+    def writeToFile(self, contents, path):
+        self._backend(path).writeToFile(contents, path)
+
+    def copy(self, src, dst):
+        """Copy a file or a directory tree without going through Spark"""
+        if (self._to_local(src) is not None and self._to_local(dst) is not None):
+            self._local_backend.copy(src, dst)
+        else:
+            self._jvm_backend.copy(src, dst)
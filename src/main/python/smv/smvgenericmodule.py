@@ -22,6 +22,7 @@ from smv.error import SmvRuntimeError, SmvMetadataValidationError
 from smv.modulesvisitor import ModulesVisitor
 from smv.smvmetadata import SmvMetaData
 from smv.smvlock import SmvLock, NonOpLock
+from smv.smvfingerprint import SmvInputFingerprints
 
 if sys.version_info >= (3, 4):
     ABC = abc.ABC
@@ -60,6 +61,7 @@ class SmvGenericModule(ABC):
 
         # Set when instant created and resolved
         self.timestamp = None
+        self.fingerprints = SmvInputFingerprints()
         self.resolvedRequiresDS = []
 
         # keep a reference to the result data
@@ -270,6 +272,18 @@ class SmvGenericModule(ABC):
     def setTimestamp(self, dt):
         self.timestamp = dt
 
+    # Set when resolving, shared by all the modules of a transaction
+    def setFingerprints(self, fingerprints):
+        self.fingerprints = fingerprints
+
+    def inputFingerprintHash(self, path, with_checksum=False):
+        """Hash of the fingerprint of the input files matched by the path,
+            see SmvInputFingerprints
+        """
+        fp = self.fingerprints.fingerprint(self.smvApp, path, with_checksum)
+        self.smvApp.log.debug("{} input {} fingerprint: {}".format(self.fqn(), path, fp))
+        return smvhash(fp)
+
     # Called by resolver, recursively resolve all dependencies. Use self.dependencies
     # instead of requiresDS to make sure model dependency also included
     def resolve(self, resolver):
@@ -143,17 +143,15 @@ class SmvInputFromFile(SmvInputBase):
 
     def dataSrcHash(self):
         """Hash computed on data source
-            Based on file's mtime, and file's full path
+            Based on the full path, and the paths, sizes and mtimes of all the
+            files it matches (directories are listed recursively, globs expanded)
         """
         full_path = self.fullPath()
         self.smvApp.log.debug("{} input path: {}".format(self.fqn(), full_path))
 
         path_hash = smvhash(full_path)
 
-        m_time = self.smvApp._jvm.SmvHDFS.modificationTime(full_path)
-        self.smvApp.log.debug("{} input m_time: {}".format(self.fqn(), m_time))
-
-        return m_time + path_hash
+        return self.inputFingerprintHash(full_path) + path_hash
 
     def schemaHash(self):
         """Hash computed from schema
@@ -187,6 +185,43 @@ class WithParser(SmvInputBase):
         else:
             return self.dqmValidator.createParserValidator()
 
+    def csvEngine(self):
+        """Engine to parse the csv data with. Available values:
+
+            - smv: SMV's own parser (default)
+            - spark: Spark's native CSV data source, which is faster on large
+                files. Requires Spark 2.2+ and does not support Map/Array fields
+
+            Parsing errors are reported the same way with both engines.
+
+            Returns:
+                (str)
+        """
+        return "smv"
+
+    def _readCsvFromFile(self, path, minPartitions=0, maxSplitSizeMB=0):
+        """Read the csv data at path with the configured csv engine"""
+        engine = self.csvEngine()
+        if (engine == "smv"):
+            jdf = self.smvApp.j_smvPyClient.readCsvFromFile(
+                path,
+                self.smvSchema(),
+                self.csvAttr(),
+                self.readerLogger(),
+                minPartitions,
+                maxSplitSizeMB
+            )
+        elif (engine == "spark"):
+            jdf = self.smvApp.j_smvPyClient.readCsvFromFileWithSparkEngine(
+                path,
+                self.smvSchema(),
+                self.csvAttr(),
+                self.readerLogger()
+            )
+        else:
+            raise SmvRuntimeError("Unknown csv engine {} in {}".format(engine, self.fqn()))
+        return DataFrame(jdf, self.smvApp.sqlContext)
+
     @abc.abstractmethod
     def smvSchema(self):
         """Returns SmvSchema, as the Scala SmvSchema class
@@ -244,13 +279,7 @@ class SmvCsvFile(WithParser, SmvInputFromFile):
 
 
     def readAsDF(self):
-        jdf = self.smvApp.j_smvPyClient.readCsvFromFile(
-            self.fullPath(),
-            self.smvSchema(),
-            self.csvAttr(),
-            self.readerLogger()
-        )
-        return DataFrame(jdf, self.smvApp.sqlContext)
+        return self._readCsvFromFile(self.fullPath())
 
 
 class SmvSqlCsvFile(SmvCsvFile):
@@ -288,31 +317,38 @@ class SmvMultiCsvFiles(SmvCsvFile):
     """Raw input from multiple csv files sharing single schema
 
         Instead of a single input file, specify a data dir with files which share
-        the same schema.
+        the same schema. The dir could also be a glob pattern or a comma-separated
+        list of paths.
     """
     def path(self):
         return self.dir()
 
-    def readAsDF(self):
-        flist = self.smvApp._jvm.SmvHDFS.dirList(self.fullPath()).array()
-        # ignore all hidden files in the data dir
-        filesInDir = ["{}/{}".format(self.fullPath(), n) for n in flist if not n.startswith(".")]
+    def minPartitions(self):
+        """Minimum number of partitions of the resulting DataFrame
 
-        if (not filesInDir):
-            raise SmvRuntimeError("There are no data files in {}".format(self.fullPath()))
+            Override this method to increase the read parallelism (optional).
+            Default is 0, which means Spark's default.
 
-        combinedJdf = None
-        reader_logger = self.readerLogger()
-        for filePath in filesInDir:
-            jdf = self.smvApp.j_smvPyClient.readCsvFromFile(
-                filePath,
-                self.smvSchema(),
-                self.csvAttr(),
-                reader_logger
-            )
-            combinedJdf = jdf if (combinedJdf is None) else combinedJdf.unionAll(jdf)
+            Returns:
+                (int)
+        """
+        return 0
+
+    def maxSplitSizeMB(self):
+        """Combine small files into partitions of up to this size (in MB)
+
+            Override this method when the dir has many small files (optional).
+            Default is 0, which means no combining: at least one partition per file.
+
+            Returns:
+                (int)
+        """
+        return 0
 
-        return DataFrame(combinedJdf, self.smvApp.sqlContext)
+    def readAsDF(self):
+        # all the files (hidden files ignored) are read in a single scan, and
+        # the header, if any, is dropped from each of them
+        return self._readCsvFromFile(self.fullPath(), self.minPartitions(), self.maxSplitSizeMB())
 
     def description(self):
         return "Input dir: @" + self.dir()
@@ -14,9 +14,14 @@ import abc
 import sys
 import re
 import binascii
+import json
+import uuid
 
 from pyspark.sql import DataFrame
-from smv.utils import scala_seq_to_list
+from pyspark.sql.types import StructType
+from smv.utils import scala_seq_to_list, smv_copy_array
+from smv.smvfsbackend import SmvFsBackend
+from smv.error import SmvRuntimeError
 
 if sys.version_info >= (3, 4):
     ABC = abc.ABC
@@ -80,6 +85,7 @@ class SmvFileOnHdfsPersistenceStrategy(SmvPersistenceStrategy):
     """
     def __init__(self, smvApp, fqn=None, ver_hex=None, postfix=None, file_path=None):
         self.smvApp = smvApp
+        self._fs = SmvFsBackend(smvApp._jvm)
         if (file_path is None):
             versioned_fqn = "{}_{}".format(fqn, ver_hex)
             output_dir = self.smvApp.all_data_dirs().outputDir
@@ -104,10 +110,10 @@ class SmvFileOnHdfsPersistenceStrategy(SmvPersistenceStrategy):
         self._write(dataframe)
 
     def isPersisted(self):
-        return self.smvApp._jvm.SmvHDFS.exists(self._file_path)
+        return self._fs.exists(self._file_path)
 
     def remove(self):
-        self.smvApp._jvm.SmvHDFS.deleteFile(self._file_path)
+        self._fs.deleteFile(self._file_path)
 
 
 class SmvCsvPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
@@ -130,8 +136,10 @@ class SmvCsvPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
 
     def _write(self, raw_data):
         jdf = raw_data._jdf
-        # this call creates both .csv and .schema file from the scala side
-        self.smvApp.j_smvPyClient.persistDF(self._file_path, jdf)
+        # this call creates both .csv and .schema file from the scala side. The codec
+        # is recorded in the schema, reads detect it from the part file extensions
+        compression = self.smvApp.py_smvconf.csv_persist_compression()
+        self.smvApp.j_smvPyClient.persistDF(self._file_path, jdf, compression)
 
     def _read(self):
         smvSchemaObj = self.smvApp.j_smvPyClient.getSmvSchema()
@@ -146,11 +154,21 @@ class SmvCsvPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
     def isPersisted(self):
         # since within the persistDF call on scala side, schema was written after
         # csv file, so we can use the schema file as a semaphore
-        return self.smvApp._jvm.SmvHDFS.exists(self._schema_path)
+        return self._fs.exists(self._schema_path)
 
     def remove(self):
-        self.smvApp._jvm.SmvHDFS.deleteFile(self._file_path)
-        self.smvApp._jvm.SmvHDFS.deleteFile(self._schema_path)
+        self._fs.deleteFile(self._file_path)
+        self._fs.deleteFile(self._schema_path)
+
+    def copyTo(self, file_path):
+        """Copy the persisted data and schema files to another csv path, which is
+            then readable the same way. No data is read or written through Spark.
+        """
+        schema_path = re.sub("\.csv$", ".schema", file_path)
+        # the schema is the semaphore, remove it first and copy it last
+        self._fs.deleteFile(schema_path)
+        self._fs.copy(self._file_path, file_path)
+        self._fs.copy(self._schema_path, schema_path)
 
 
 class SmvJsonOnHdfsPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
@@ -158,10 +176,10 @@ class SmvJsonOnHdfsPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
         super(SmvJsonOnHdfsPersistenceStrategy, self).__init__(smvApp, None, None, None, path)
 
     def _read(self):
-        return self.smvApp._jvm.SmvHDFS.readFromFile(self._file_path)
+        return self._fs.readFromFile(self._file_path)
 
     def _write(self, rawdata):
-        self.smvApp._jvm.SmvHDFS.writeToFile(rawdata, self._file_path)
+        self._fs.writeToFile(rawdata, self._file_path)
 
 
 class SmvPicklablePersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
@@ -170,7 +188,7 @@ class SmvPicklablePersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
 
     def _read(self):
         # reverses result of applying _write. see _write for explanation.
-        hex_encoded_pickle_as_str = self.smvApp._jvm.SmvHDFS.readFromFile(self._file_path)
+        hex_encoded_pickle_as_str = self._fs.readFromFile(self._file_path)
         pickled_res_as_str = binascii.unhexlify(hex_encoded_pickle_as_str)
         return pickle_lib.loads(pickled_res_as_str)
 
@@ -182,7 +200,7 @@ class SmvPicklablePersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
         # encoding will be a bytestring object if in Python 3, so need to convert it to string
         # str.decode converts string to utf8 in python 2 and bytes to str in Python 3
         hex_encoded_pickle_as_str = hex_encoded_pickle.decode()
-        self.smvApp._jvm.SmvHDFS.writeToFile(hex_encoded_pickle_as_str, self._file_path)
+        self._fs.writeToFile(hex_encoded_pickle_as_str, self._file_path)
 
 
 class SmvParquetPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
@@ -208,14 +226,14 @@ class SmvParquetPersistenceStrategy(SmvFileOnHdfsPersistenceStrategy):
 
     def _write(self, rawdata):
         rawdata.write.parquet(self._file_path)
-        self.smvApp._jvm.SmvHDFS.createFileAtomic(self._semaphore_path)
+        self._fs.createFileAtomic(self._semaphore_path)
 
     def remove(self):
-        self.smvApp._jvm.SmvHDFS.deleteFile(self._file_path)
-        self.smvApp._jvm.SmvHDFS.deleteFile(self._semaphore_path)
+        self._fs.deleteFile(self._file_path)
+        self._fs.deleteFile(self._semaphore_path)
 
     def isPersisted(self):
-        return self.smvApp._jvm.SmvHDFS.exists(self._semaphore_path)
+        return self._fs.exists(self._semaphore_path)
 
 
 class SmvJdbcIoStrategy(SmvIoStrategy):
@@ -226,79 +244,398 @@ class SmvJdbcIoStrategy(SmvIoStrategy):
             conn_info(SmvConnectionInfo): Jdbc connection info
             table_name(str): the table to read from/write to
             write_mode(str): spark df writer's SaveMode
+            query(str): custom query to read from instead of the table, pushed
+                down to the database as a sub-query
+            partition_column(str): integral column to split the read on
+            lower_bound(int): lower bound of the partition column, looked up with a
+                MIN query if not given
+            upper_bound(int): upper bound of the partition column, looked up with a
+                MAX query if not given
+            num_partitions(int): number of partitions (and connections) of a read on
+                partition_column
+            predicates(list(str)): WHERE clauses, one partition for each of them.
+                Exclusive with partition_column
+            fetch_size(int): number of rows fetched per round trip of a read
+            batch_size(int): number of rows inserted per round trip of a write
+            isolation_level(str): transaction isolation level of a write, one of
+                NONE, READ_UNCOMMITTED (Spark's default), READ_COMMITTED,
+                REPEATABLE_READ or SERIALIZABLE
+            num_writers(int): max number of concurrent connections of a write, the
+                data is coalesced to that many partitions
+            truncate(bool): with "overwrite" write mode, truncate the table instead of
+                dropping and re-creating it, which keeps its indexes and grants
+            upsert_keys(list(str)): when given, upsert the data by these keys: the data
+                is written to a staging table, then in a single transaction the rows of
+                the table with the same keys are deleted and the new rows inserted.
+                Rows with a null key are rejected. Write mode is ignored.
+
+        When not given, num_partitions, fetch_size, batch_size and num_writers default
+        to the connection's `numpartitions`, `fetchsize`, `batchsize` and `numwriters`
+        attributes.
     """
-    def __init__(self, smvApp, conn_info, table_name, write_mode="errorifexists"):
+    def __init__(self, smvApp, conn_info, table_name, write_mode="errorifexists",
+            query=None, partition_column=None, lower_bound=None, upper_bound=None,
+            num_partitions=None, predicates=None, fetch_size=None,
+            batch_size=None, isolation_level=None, num_writers=None, truncate=False,
+            upsert_keys=None):
         self.smvApp = smvApp
         self.conn = conn_info
         self.table = table_name
         self.write_mode = write_mode
-
-    def read(self):
-        conn = self.conn
+        self.query = query
+        self.partition_column = partition_column
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.num_partitions = num_partitions
+        self.predicates = predicates
+        self.fetch_size = fetch_size
+        self.batch_size = batch_size
+        self.isolation_level = isolation_level
+        self.num_writers = num_writers
+        self.truncate = truncate
+        self.upsert_keys = upsert_keys
+
+    def _conn_attr(self, name):
+        return getattr(self.conn, name, None)
+
+    def _properties(self):
+        """Connection properties shared by reads and writes"""
+        props = {}
+        for (k, v) in [('driver', self.conn.driver), ('user', self.conn.user), ('password', self.conn.password)]:
+            if (v is not None):
+                props[k] = v
+        return props
+
+    def _dbtable(self):
+        if (self.query is not None):
+            return "({}) smv_jdbc_query".format(self.query)
+        return self.table
+
+    def _reader(self, fetch_size):
         builder = self.smvApp.sqlContext.read\
             .format('jdbc')\
-            .option('url', conn.url)
+            .option('url', self.conn.url)
 
-        if (conn.driver is not None):
-            builder = builder.option('driver', conn.driver)
-        if (conn.user is not None):
-            builder = builder.option('user', conn.user)
-        if (conn.password is not None):
-            builder = builder.option('password', conn.password)
+        for (k, v) in self._properties().items():
+            builder = builder.option(k, v)
+        if (fetch_size is not None):
+            builder = builder.option('fetchsize', str(fetch_size))
 
-        return builder\
-            .option('dbtable', self.table)\
-            .load()
+        return builder
 
-    def write(self, raw_data):
-        conn = self.conn
-        builder = raw_data.write\
-            .format("jdbc") \
-            .mode(self.write_mode) \
-            .option('url', conn.url)
+    def _bounds(self, dbtable, fetch_size):
+        """Look up the MIN and MAX of the partition column, which are None for an empty table"""
+        bounds_query = "(SELECT MIN({0}), MAX({0}) FROM {1}) smv_jdbc_bounds"\
+            .format(self.partition_column, dbtable)
+        row = self._reader(fetch_size).option('dbtable', bounds_query).load().collect()[0]
+        return (row[0], row[1])
 
-        if (conn.driver is not None):
-            builder = builder.option('driver', conn.driver)
-        if (conn.user is not None):
-            builder = builder.option('user', conn.user)
-        if (conn.password is not None):
-            builder = builder.option('password', conn.password)
+    def read(self):
+        dbtable = self._dbtable()
+        fetch_size = self.fetch_size or self._conn_attr('fetchsize')
+
+        if (self.predicates is not None):
+            if (self.partition_column is not None):
+                raise SmvRuntimeError("JDBC read can't have both partition column and predicates")
+            props = self._properties()
+            if (fetch_size is not None):
+                props['fetchsize'] = str(fetch_size)
+            return self.smvApp.sqlContext.read.jdbc(
+                self.conn.url, dbtable, predicates=self.predicates, properties=props)
+
+        builder = self._reader(fetch_size).option('dbtable', dbtable)
+
+        if (self.partition_column is not None):
+            lower, upper = self.lower_bound, self.upper_bound
+            if (lower is None or upper is None):
+                (lo, hi) = self._bounds(dbtable, fetch_size)
+                lower = lo if lower is None else lower
+                upper = hi if upper is None else upper
+
+            # nothing to split on an empty table
+            if (lower is not None and upper is not None):
+                num_partitions = self.num_partitions or self._conn_attr('numpartitions') or \
+                    self.smvApp.sc.defaultParallelism
+                builder = builder\
+                    .option('partitionColumn', self.partition_column)\
+                    .option('lowerBound', str(int(lower)))\
+                    .option('upperBound', str(int(upper)))\
+                    .option('numPartitions', str(num_partitions))
+
+        return builder.load()
+
+    @property
+    def _jdbc_helper(self):
+        return self.smvApp._jvm.org.tresamigos.smv.jdbc.JdbcHelper
+
+    def _save(self, df, table, mode):
+        batch_size = self.batch_size or self._conn_attr('batchsize')
+
+        builder = df.write\
+            .format("jdbc") \
+            .mode(mode) \
+            .option('url', self.conn.url)
+
+        for (k, v) in self._properties().items():
+            builder = builder.option(k, v)
+        if (batch_size is not None):
+            builder = builder.option('batchsize', str(batch_size))
+        if (self.isolation_level is not None):
+            builder = builder.option('isolationLevel', self.isolation_level)
+        if (self.truncate):
+            builder = builder.option('truncate', 'true')
 
         builder \
-            .option("dbtable", self.table) \
+            .option("dbtable", table) \
             .save()
 
+    def _upsert(self, df):
+        conn = self.conn
+        helper = self._jdbc_helper
+        if (not helper.tableExists(conn.url, conn.driver, conn.user, conn.password, self.table)):
+            self._save(df, self.table, "errorifexists")
+            return
+
+        # unique, so that concurrent upserts of the same table do not share it
+        staging = "{}_smv_stage_{}".format(self.table, uuid.uuid4().hex)
+        self._save(df, staging, "overwrite")
+        sc = self.smvApp.sc
+        helper.mergeFromStaging(
+            conn.url, conn.driver, conn.user, conn.password,
+            self.table, staging,
+            smv_copy_array(sc, *self.upsert_keys),
+            smv_copy_array(sc, *df.columns)
+        )
+
+    def write(self, raw_data):
+        num_writers = self.num_writers or self._conn_attr('numwriters')
+        df = raw_data
+        if (num_writers is not None and df.rdd.getNumPartitions() > int(num_writers)):
+            df = df.coalesce(int(num_writers))
+
+        if (self.upsert_keys):
+            self._upsert(df)
+        else:
+            self._save(df, self.table, self.write_mode)
+
+
+def _sql_str(s):
+    """SQL string literal of the string"""
+    return "'{}'".format(s.replace("\\", "\\\\").replace("'", "\\'"))
+
 
 class SmvHiveIoStrategy(SmvIoStrategy):
     """Persist strategy for spark Hive IO
 
         Args:
             smvApp(SmvApp):
-            conn_info(SmvConnectionInfo): Hive connection info
+            conn_info(SmvConnectionInfo): Hive connection info, None for the
+                current database
             table_name(str): the table to read from/write to
             write_mode(str): spark df writer's SaveMode
+            partition_by(list(str)): partition columns of the table. With "overwrite"
+                write mode, only the partitions present in the data are replaced
+            atomic_swap(bool): with "overwrite" write mode, write the data to a new
+                table and swap it in with renames, so the table is never missing or
+                partially written while the data is written. With partition_by and an
+                existing table, each partition in the data is swapped in by a location
+                change, and a schema change is an error
+
+        With "overwrite" write mode, or when partition_by is given, the table is only
+        (re-)created when it does not exist or its schema (or partition columns)
+        changed. Otherwise the data is inserted into the existing table. Tables are
+        created as Hive tables stored as Parquet.
     """
-    def __init__(self, smvApp, conn_info, table_name, write_mode="errorifexists"):
+    def __init__(self, smvApp, conn_info, table_name, write_mode="errorifexists",
+            partition_by=None, atomic_swap=False):
         self.smvApp = smvApp
         self.conn = conn_info
         self.table = table_name
         self.write_mode = write_mode
+        self.partition_by = partition_by or []
+        self.atomic_swap = atomic_swap
 
-    def _table_with_schema(self):
+    def _table_with_schema(self, table=None):
+        table = table or self.table
         conn = self.conn
-        if (conn.schema is None):
-            return self.table
+        if (conn is None or conn.schema is None):
+            return table
         else:
-            return "{}.{}".format(conn.schema, self.table)
+            return "{}.{}".format(conn.schema, table)
+
+    @property
+    def _sql(self):
+        return self.smvApp.sqlContext.sql
 
     def read(self):
         query = "select * from {}".format(self._table_with_schema())
         return self.smvApp.sqlContext.sql(query)
 
+    def _ordered_columns(self, df):
+        """Data columns followed by partition columns, as Hive stores them"""
+        lower_parts = [p.lower() for p in self.partition_by]
+        data_cols = [c for c in df.columns if c.lower() not in lower_parts]
+        return data_cols + self.partition_by
+
+    def _table_columns(self, table):
+        """(name, type, is partition) of the columns of the table, None if there is no such table"""
+        catalog = self.smvApp.sparkSession.catalog
+        # table name could be qualified as "db.table"
+        full_name = self._table_with_schema(table)
+        if ("." in full_name):
+            db, name = full_name.split(".", 1)
+        else:
+            db, name = None, full_name
+        try:
+            cols = catalog.listColumns(name, db)
+        except Exception:
+            return None
+        return [(c.name.lower(), c.dataType, c.isPartition) for c in cols]
+
+    def _expected_columns(self, df):
+        types = dict((f.name, f.dataType.simpleString()) for f in df.schema.fields)
+        lower_parts = [p.lower() for p in self.partition_by]
+        return [(c.lower(), types[c], c.lower() in lower_parts) for c in self._ordered_columns(df)]
+
+    def _create_table(self, df, full_name, location=None):
+        """Create the table, as an external table at the given location if any"""
+        types = dict((f.name, f.dataType.simpleString()) for f in df.schema.fields)
+        def col_defs(cols):
+            return ", ".join("`{}` {}".format(c, types[c]) for c in cols)
+
+        lower_parts = [p.lower() for p in self.partition_by]
+        data_cols = [c for c in df.columns if c.lower() not in lower_parts]
+        ddl = "CREATE TABLE {} ({})".format(full_name, col_defs(data_cols))
+        if (self.partition_by):
+            ddl += " PARTITIONED BY ({})".format(col_defs(self.partition_by))
+        ddl += " STORED AS PARQUET"
+        if (location is not None):
+            ddl += " LOCATION {}".format(_sql_str(location))
+        self._sql(ddl)
+
+    def _insert(self, df, full_name, overwrite):
+        view = "_smv_hive_write"
+        df.createOrReplaceTempView(view)
+        partition = ""
+        if (self.partition_by):
+            # only the partitions which are in the data get replaced
+            self.smvApp.sqlContext.setConf("hive.exec.dynamic.partition", "true")
+            self.smvApp.sqlContext.setConf("hive.exec.dynamic.partition.mode", "nonstrict")
+            partition = " PARTITION ({})".format(", ".join("`{}`".format(p) for p in self.partition_by))
+        self._sql("INSERT {} TABLE {}{} SELECT {} FROM {}".format(
+            "OVERWRITE" if overwrite else "INTO",
+            full_name,
+            partition,
+            ", ".join("`{}`".format(c) for c in self._ordered_columns(df)),
+            view
+        ))
+        self.smvApp.sqlContext.dropTempTable(view)
+
+    def _location(self, full_name, spec=None):
+        """Location of the table, or of one of its partitions, from DESCRIBE FORMATTED"""
+        part = "" if spec is None else " PARTITION ({})".format(spec)
+        rows = self._sql("DESCRIBE FORMATTED {}{}".format(full_name, part)).collect()
+        # "Location:" in Spark 2.1, "Location" later. The partition section comes first
+        for r in rows:
+            if (r[0] is not None and r[0].strip().rstrip(":") == "Location"):
+                return r[1].strip()
+        raise SmvRuntimeError("Can not find the location of {}{}".format(full_name, part))
+
+    def _swap_in(self, df, existing):
+        """Write to a new table, then rename it to the target name. The target only
+            disappears between the two metastore renames.
+
+            With partition_by and an existing table, only the partitions in the data are
+            swapped, see _swap_partitions_in.
+        """
+        full_name = self._table_with_schema()
+        new_name = self._table_with_schema(self.table + "_smv_swap")
+        old_name = self._table_with_schema(self.table + "_smv_old")
+        exists = existing is not None
+
+        if (exists and self.partition_by):
+            self._swap_partitions_in(df, existing)
+            return
+
+        self._sql("DROP TABLE IF EXISTS {}".format(new_name))
+        self._create_table(df, new_name)
+        self._insert(df, new_name, True)
+
+        self._sql("DROP TABLE IF EXISTS {}".format(old_name))
+        if (exists):
+            self._sql("ALTER TABLE {} RENAME TO {}".format(full_name, old_name))
+        self._sql("ALTER TABLE {} RENAME TO {}".format(new_name, full_name))
+        self._sql("DROP TABLE IF EXISTS {}".format(old_name))
+
+    def _swap_partitions_in(self, df, existing):
+        """Write the partitions in the data to a staging table located under the target
+            table directory, then point the target partitions to the staging partition
+            locations, one metastore update each. The other partitions are not touched.
+            The previous locations of the replaced partitions are deleted afterwards.
+        """
+        full_name = self._table_with_schema()
+        if (existing != self._expected_columns(df)):
+            raise SmvRuntimeError(
+                "Schema of partitioned table {} changed, the partitions not in the data can not "
+                "be kept. Please drop the table, or write it without atomic_swap".format(full_name))
+
+        swap_id = uuid.uuid4().hex
+        stage_name = self._table_with_schema("{}_smv_swap_{}".format(self.table, swap_id))
+        stage_loc = "{}/_smv_swap_{}".format(self._location(full_name), swap_id)
+
+        # external table, since the target table takes over its partition directories
+        self._create_table(df, stage_name, stage_loc)
+        try:
+            self._insert(df, stage_name, True)
+            parts = self._sql("SELECT DISTINCT {} FROM {}".format(
+                ", ".join("`{}`".format(p) for p in self.partition_by), stage_name)).collect()
+
+            old_locs = []
+            for row in parts:
+                if (any(v is None for v in row)):
+                    raise SmvRuntimeError("Null partition values can not be swapped in {}".format(full_name))
+                spec = ", ".join("`{}`={}".format(p, _sql_str(str(v))) for (p, v) in zip(self.partition_by, row))
+                new_loc = self._location(stage_name, spec)
+                self._sql("ALTER TABLE {} ADD IF NOT EXISTS PARTITION ({})".format(full_name, spec))
+                old_locs.append(self._location(full_name, spec))
+                self._sql("ALTER TABLE {} PARTITION ({}) SET LOCATION {}".format(full_name, spec, _sql_str(new_loc)))
+        finally:
+            self._sql("DROP TABLE IF EXISTS {}".format(stage_name))
+
+        fs = SmvFsBackend(self.smvApp._jvm)
+        for loc in old_locs:
+            fs.deleteFile(loc)
+
     def write(self, raw_data):
-        raw_data.write\
-            .mode(self.write_mode)\
-            .saveAsTable(self._table_with_schema())
+        mode = self.write_mode.lower()
+        full_name = self._table_with_schema()
+
+        if (mode != "overwrite" and not self.partition_by):
+            raw_data.write\
+                .mode(self.write_mode)\
+                .saveAsTable(full_name)
+            return
+
+        existing = self._table_columns(self.table)
+        exists = existing is not None
+        if (exists and mode in ["error", "errorifexists", "default"]):
+            raise SmvRuntimeError("Table {} already exists".format(full_name))
+        if (exists and mode == "ignore"):
+            return
+
+        if (mode == "overwrite" and self.atomic_swap):
+            self._swap_in(raw_data, existing)
+            return
+
+        if (exists and mode == "overwrite" and existing != self._expected_columns(raw_data)):
+            self.smvApp.log.info("Schema of {} changed, re-creating it".format(full_name))
+            self._sql("DROP TABLE {}".format(full_name))
+            exists = False
+
+        if (not exists):
+            self._create_table(raw_data, full_name)
+
+        self._insert(raw_data, full_name, mode == "overwrite")
 
     # TODO: we should allow persisting intermidiate results in Hive also
     # For that case, however need to specify a convention to store semaphore
@@ -309,21 +646,58 @@ class SmvTextOnHdfsIoStrategy(SmvIoStrategy):
     def __init__(self, smvApp, path):
         self.smvApp = smvApp
         self._file_path = path
+        self._fs = SmvFsBackend(smvApp._jvm)
 
     def read(self):
-        return self.smvApp._jvm.SmvHDFS.readFromFile(self._file_path)
+        return self._fs.readFromFile(self._file_path)
 
     def write(self, rawdata):
-        self.smvApp._jvm.SmvHDFS.writeToFile(rawdata, self._file_path)
+        self._fs.writeToFile(rawdata, self._file_path)
 
 
 class SmvXmlOnHdfsIoStrategy(SmvIoStrategy):
-    """Read/write Xml file on Hdfs using Spark DF reader/writer"""
-    def __init__(self, smvApp, path, rowTag, schema=None):
+    """Read/write Xml file on Hdfs using Spark DF reader/writer
+
+        Args:
+            smvApp(SmvApp):
+            path(str): path of the xml data
+            rowTag(str): XML tag of a record
+            schema(StructType): schema of the data, inferred from the data if None
+            schema_cache_path(str): when the schema is inferred, a json file the
+                inferred schema is saved to, and read back from by later reads with
+                the same path, instead of inferring again
+            sampling_ratio(float): fraction of the records the schema is inferred from,
+                default 1.0 for all of them
+            schema_cache_glob(str): glob pattern of all the schema cache files of the
+                input, whichever the path. The others are removed when a new one is
+                written, so that outdated ones do not accumulate
+    """
+    def __init__(self, smvApp, path, rowTag, schema=None, schema_cache_path=None, sampling_ratio=None,
+            schema_cache_glob=None):
         self.smvApp = smvApp
         self._file_path = path
         self._rowTag = rowTag
         self._schema = schema
+        self._schema_cache_path = schema_cache_path
+        self._sampling_ratio = sampling_ratio
+        self._schema_cache_glob = schema_cache_glob
+        self._fs = SmvFsBackend(smvApp._jvm)
+
+    def _remove_stale_schema_caches(self):
+        if (self._schema_cache_glob is None):
+            return
+        cache_name = self._schema_cache_path.rstrip("/").rsplit("/", 1)[-1]
+        files = self.smvApp._jvm.org.tresamigos.smv.SmvHDFS.matchedFiles(self._schema_cache_glob, False)
+        for st in scala_seq_to_list(self.smvApp._jvm, files):
+            if (st.getPath().getName() != cache_name):
+                self._fs.deleteFile(st.getPath().toString())
+
+    def _cached_schema(self):
+        if (self._schema_cache_path is not None and self._fs.exists(self._schema_cache_path)):
+            s = self._fs.readFromFile(self._schema_cache_path)
+            return StructType.fromJson(json.loads(s))
+        else:
+            return None
 
     def read(self):
         # TODO: look for possibilities to feed to readerLogger
@@ -331,46 +705,113 @@ class SmvXmlOnHdfsIoStrategy(SmvIoStrategy):
             .read.format('com.databricks.spark.xml')\
             .options(rowTag=self._rowTag)
 
+        schema = self._schema if self._schema is not None else self._cached_schema()
+
         # If no schema specified, infer from data
-        if (self._schema is not None):
-            return reader.load(self._file_path, schema=self._schema)
+        if (schema is not None):
+            return reader.load(self._file_path, schema=schema)
         else:
-            return reader.load(self._file_path)
+            if (self._sampling_ratio is not None):
+                reader = reader.options(samplingRatio=self._sampling_ratio)
+            df = reader.load(self._file_path)
+            if (self._schema_cache_path is not None):
+                self._fs.writeToFile(df.schema.json(), self._schema_cache_path)
+                self._remove_stale_schema_caches()
+            return df
 
     def write(self, rawdata):
         raise NotImplementedError("SmvXmlOnHdfsIoStrategy's write method is not implemented")
 
 
+class SmvColumnarOnHdfsIoStrategy(SmvIoStrategy):
+    """Read files of a self-describing format (Parquet, ORC, Avro) on Hdfs
+
+        Args:
+            smvApp(SmvApp):
+            path(str): file, directory or glob pattern
+            format(str): Spark data source format
+            columns(list(str)): columns to keep, all of them if None
+            partition_filter(str|Column): filter applied at read time
+            merge_schema(bool): mergeSchema option of the reader, the Spark config
+                default if None
+    """
+    def __init__(self, smvApp, path, format, columns=None, partition_filter=None, merge_schema=None):
+        self.smvApp = smvApp
+        self._file_path = path
+        self._format = format
+        self._columns = columns
+        self._partition_filter = partition_filter
+        self._merge_schema = merge_schema
+
+    def read(self):
+        reader = self.smvApp.sqlContext.read.format(self._format)
+        if (self._merge_schema is not None):
+            reader = reader.option("mergeSchema", str(bool(self._merge_schema)).lower())
+
+        df = reader.load(self._file_path)
+
+        # filter first, so that it could use columns which are not selected. The
+        # optimizer prunes the columns and the partitions in the file scan
+        if (self._partition_filter is not None):
+            df = df.where(self._partition_filter)
+        if (self._columns is not None):
+            df = df.select(*self._columns)
+        return df
+
+    def write(self, rawdata):
+        raise NotImplementedError("SmvColumnarOnHdfsIoStrategy's write method is not implemented")
+
+
 class SmvSchemaOnHdfsIoStrategy(SmvIoStrategy):
     """Read/write of an SmvSchema file on Hdfs"""
     def __init__(self, smvApp, path):
         self.smvApp = smvApp
         self._file_path = path
+        self._fs = SmvFsBackend(smvApp._jvm)
 
     def read(self):
-        schema_file_str = self.smvApp._jvm.SmvHDFS.readFromFile(self._file_path)
+        schema_file_str = self._fs.readFromFile(self._file_path)
         smvSchemaObj = self.smvApp.j_smvPyClient.getSmvSchema()
         smv_schema = smvSchemaObj.fromString(";".join(schema_file_str.split("\n")))
         return smv_schema
 
     def write(self, smvSchema):
         schema_str = "\n".join(scala_seq_to_list(self.smvApp._jvm, smvSchema.toStringsWithMeta()))
-        self.smvApp._jvm.SmvHDFS.writeToFile(schema_str, self._file_path)
+        self._fs.writeToFile(schema_str, self._file_path)
 
 
 class SmvCsvOnHdfsIoStrategy(SmvIoStrategy):
     """Simply read/write of csv, given schema. Not for persisting,
-        which should be handled by SmvCsvPersistenceStrategy"""
-    def __init__(self, smvApp, path, smvSchema, logger):
+        which should be handled by SmvCsvPersistenceStrategy
+
+        The path could be a file, a dir, a glob or a comma-separated list of them,
+        which are read in a single scan.
+    """
+    def __init__(self, smvApp, path, smvSchema, logger, min_partitions=0, max_split_size_mb=0, engine="smv"):
         self.smvApp = smvApp
         self._file_path = path
         self._smv_schema = smvSchema
         self._logger = logger
+        self._min_partitions = min_partitions
+        self._max_split_size_mb = max_split_size_mb
+        self._engine = engine
 
     def read(self):
         handler = self.smvApp.j_smvPyClient.createFileIOHandler(self._file_path)
 
-        jdf = handler.csvFileWithSchema(None, self._smv_schema, self._logger)
+        if (self._engine == "smv"):
+            jdf = handler.csvFileWithSchema(
+                None,
+                self._smv_schema,
+                self._logger,
+                self._min_partitions,
+                self._max_split_size_mb
+            )
+        elif (self._engine == "spark"):
+            # Spark's native CSV data source sizes the partitions itself
+            jdf = handler.sparkCsvFileWithSchema(None, self._smv_schema, self._logger)
+        else:
+            raise SmvRuntimeError("Unknown csv engine {}".format(self._engine))
         return DataFrame(jdf, self.smvApp.sqlContext)
 
     def write(self, raw_data):
@@ -11,25 +11,63 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+from datetime import datetime
+
+from smv.error import SmvRuntimeError
+from smv.smvfsbackend import SmvFsBackend
+
+
 class SmvLock(object):
     """Create a lock context
+
+        Same file-based, non-reentrant lock protocol as the Scala SmvLock: the
+        lock is obtained by atomically creating the lock file, and released by
+        deleting it. The file operations go through SmvFsBackend, so locks on
+        a local data dir never cross the JVM gateway.
     """
-    def __init__(self, _jvm, _lock_path):
+    # poll interval while waiting for the lock, in seconds
+    PollInterval = 10
+
+    # default timeout of 1 hour, in seconds
+    def __init__(self, _jvm, _lock_path, timeout=3600):
         self._jvm = _jvm
         self._lock_path = _lock_path
-        self.slock = None
+        self._timeout = timeout
+        self._fs = SmvFsBackend(_jvm)
+        self.obtained = False
+
+    def lock(self):
+        if (self.obtained):
+            raise SmvRuntimeError("Non-reentrant lock already obtained")
+
+        start = time.time()
+        attempts = 0
+        while (not self.obtained):
+            attempts += 1
+            try:
+                self._fs.createFileAtomic(self._lock_path)
+                self.obtained = True
+            except Exception:
+                if (time.time() - start > self._timeout):
+                    raise SmvRuntimeError("Cannot obtain lock [{}] within {} seconds".format(
+                        self._lock_path, self._timeout))
+
+                if (attempts == 1):
+                    print("Found lock file [{}] created on {}".format(self._lock_path, datetime.now()))
+
+                time.sleep(self.PollInterval)
+
+    def unlock(self):
+        self._fs.deleteFile(self._lock_path)
+        self.obtained = False
 
     def __enter__(self):
-        # create a lock file with timeout as 1 hour
-        self.slock = self._jvm.org.tresamigos.smv.SmvLock(
-            self._lock_path,
-            3600 * 1000 
-        )
-        self.slock.lock()
+        self.lock()
         return None
 
     def __exit__(self, type, value, traceback):
-        self.slock.unlock()
+        self.unlock()
 
 class NonOpLock(object):
     def __enter__(self):
@@ -24,7 +24,7 @@ from datetime import datetime
 from smv.dqm import SmvDQM
 from smv.error import SmvRuntimeError
 from smv.utils import pickle_lib, lazy_property
-from smv.smviostrategy import SmvCsvPersistenceStrategy, SmvJsonOnHdfsPersistenceStrategy, SmvPicklablePersistenceStrategy, SmvParquetPersistenceStrategy
+from smv.smviostrategy import SmvCsvPersistenceStrategy, SmvJsonOnHdfsPersistenceStrategy, SmvPicklablePersistenceStrategy, SmvParquetPersistenceStrategy, SmvHiveIoStrategy
 from smv.smvgenericmodule import SmvProcessModule
 
 class SmvOutput(object):
@@ -107,6 +107,28 @@ class SmvSparkDfModule(SmvProcessModule):
         """
         return None
 
+    def publishHivePartitionBy(self):
+        """Optional partition columns of the table published with --publish-hive
+
+            When given, only the partitions present in the result of this module
+            are replaced when the module is published again. Ignored when
+            publishHiveSql is specified.
+
+            Returns:
+                (list(string))
+        """
+        return None
+
+    def publishHiveAtomicSwap(self):
+        """Whether --publish-hive writes to a new table which is then renamed to
+            tableName(), so that the table is never missing or partially written
+            during the publish. Ignored when publishHiveSql is specified.
+
+            Returns:
+                (bool)
+        """
+        return False
+
 
     @abc.abstractmethod
     def run(self, i):
@@ -214,12 +236,19 @@ class SmvSparkDfModule(SmvProcessModule):
         # if user provided a publish hive sql command, run it instead of default
         # table creation from data frame result.
         if (self.publishHiveSql() is None):
-            queries = [
-                "drop table if exists {}".format(self.tableName()),
-                "create table {} as select * from dftable".format(self.tableName())
-            ]
-        else:
-            queries = [l.strip() for l in self.publishHiveSql().split(";")]
+            strategy = SmvHiveIoStrategy(
+                self.smvApp,
+                None,
+                self.tableName(),
+                "overwrite",
+                partition_by=self.publishHivePartitionBy(),
+                atomic_swap=self.publishHiveAtomicSwap()
+            )
+            self.smvApp.log.info("Hive publish to table: {}".format(self.tableName()))
+            self._do_action_on_df(strategy.write, self.data, "PUBLISH TO HIVE")
+            return
+
+        queries = [l.strip() for l in self.publishHiveSql().split(";")]
 
         self.smvApp.log.info("Hive publish query: {}".format(";".join(queries)))
         def run_query(df):
@@ -233,7 +262,12 @@ class SmvSparkDfModule(SmvProcessModule):
     def publishThroughJDBC(self):
         url = self.smvApp.jdbcUrl()
         driver = self.smvApp.jdbcDriver()
-        self.smvApp.j_smvPyClient.writeThroughJDBC(self.data._jdf, url, driver, self.tableName())
+        props = self.smvApp.py_smvconf.merged_props()
+        batch_size = int(props.get('smv.jdbc.batchsize', 0))
+        isolation_level = props.get('smv.jdbc.isolationlevel')
+        num_writers = int(props.get('smv.jdbc.numwriters', 0))
+        self.smvApp.j_smvPyClient.writeThroughJDBC(
+            self.data._jdf, url, driver, self.tableName(), batch_size, isolation_level, num_writers)
 
 class SmvModule(SmvSparkDfModule):
     """SmvModule is the same as SmvSparkDfModule. Since it was used in all the
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 from smv.modulesvisitor import ModulesVisitor
 from smv.smviostrategy import SmvCsvPersistenceStrategy, SmvJsonOnHdfsPersistenceStrategy
 from smv.smvmetadata import SmvMetaHistory
@@ -85,11 +87,25 @@ class SmvModuleRunner(object):
             publish_meta_path = publish_base_path + ".meta"
             publish_hist_path = publish_base_path + ".hist"
 
-            SmvCsvPersistenceStrategy(m.smvApp, m.fqn(), None, publish_csv_path).write(m.data)
+            self._publish_csv(m, publish_csv_path)
             SmvJsonOnHdfsPersistenceStrategy(m.smvApp, publish_meta_path).write(m.module_meta.toJson())
             hist = self.smvApp._read_meta_hist(m)
             SmvJsonOnHdfsPersistenceStrategy(m.smvApp, publish_hist_path).write(hist.toJson())
 
+    def _publish_csv(self, m, publish_csv_path):
+        """Publish the module result as csv. When the same version of the module is
+            already persisted as csv, its files are copied (hard linked on the local
+            file system), otherwise the data is written as csv in a single pass.
+        """
+        strategy = m.persistStrategy()
+        if (not m.isEphemeral() and
+                isinstance(strategy, SmvCsvPersistenceStrategy) and
+                strategy.isPersisted()):
+            self.log.info("Publish {} by copying its persisted output".format(m.versioned_fqn))
+            strategy.copyTo(publish_csv_path)
+        else:
+            SmvCsvPersistenceStrategy(m.smvApp, m.fqn(), None, publish_csv_path).write(m.data)
+
     def publish_to_hive(self):
         # run before publish
         self.run()
@@ -106,9 +122,22 @@ class SmvModuleRunner(object):
     def publish_local(self, local_dir):
         self.run()
 
+        compression = self.smvApp.py_smvconf.export_csv_compression()
+        parallel = self.smvApp.py_smvconf.export_csv_parallel()
+        ext = self.smvApp._jvm.org.tresamigos.smv.SmvReportIO.codecExtension(
+            compression, self.smvApp.sc._jsc.hadoopConfiguration())
+
         for m in self.roots:
-            csv_path = "{}/{}".format(local_dir, m.versioned_fqn)
-            m.data.smvExportCsv(csv_path)
+            csv_path = "{}/{}{}".format(local_dir, m.versioned_fqn, ext)
+            part_dir = None
+            if (parallel):
+                part_dir = "{}/.{}.export".format(self.smvApp.all_data_dirs().outputDir, m.versioned_fqn)
+
+            start = time.time()
+            n = m.data.smvExportCsv(csv_path, compression=compression, partDir=part_dir)
+            elapsed = max(time.time() - start, 1e-3)
+            self.log.info("Exported {} rows of {} to {} in {:.1f}s ({:.0f} rows/s)".format(
+                n, m.fqn(), csv_path, elapsed, n / elapsed))
 
     def purge_persisted(self):
         def cleaner(m, state):
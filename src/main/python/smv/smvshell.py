@@ -187,17 +187,24 @@ def now():
     """
     print(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-def smvDiscoverSchemaToFile(path, n=100000, ca=None):
+def smvDiscoverSchemaToFile(path, n=100000, ca=None, sampling="head", seed=23):
     """Try best to discover Schema from raw Csv file
 
         Will save a schema file with postfix ".toBeReviewed" in local directory.
 
         Args:
-            path (str): Path to the CSV file
+            path (str): Path to the CSV file, could also be a directory, a glob pattern
+                or a comma-separated list of them
             n (int): Number of records to check for schema discovery, default 100k
             ca (CsvAttributes): Defaults to CsvWithHeader
+            sampling (str): How the records are chosen. "head" (default) uses the first n
+                records, "random" a uniform random sample of about n records of all the
+                files, "stratified" about the same number of random records from every
+                file split. "random" and "stratified" infer the types on the executors.
+            seed (int): random seed of the "random" and "stratified" samplings
     """
-    SmvApp.getInstance()._jvm.SmvPythonHelper.smvDiscoverSchemaToFile(path, n, ca or SmvApp.getInstance().defaultCsvWithHeader())
+    SmvApp.getInstance()._jvm.SmvPythonHelper.smvDiscoverSchemaToFile(
+        path, n, ca or SmvApp.getInstance().defaultCsvWithHeader(), sampling, seed)
 
 def run_test(test_name):
     """Run a test with the given name without creating new Spark context
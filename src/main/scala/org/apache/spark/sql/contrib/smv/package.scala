@@ -53,6 +53,12 @@ package object smv {
     rowRDD.map(converter(_).asInstanceOf[InternalRow])
   }
 
+  /** converter of InternalRows of the given schema to Rows */
+  def toScalaRowConverter(schema: StructType): InternalRow => Row = {
+    val converter = CatalystTypeConverters.createToScalaConverter(schema)
+    r => converter(r).asInstanceOf[Row]
+  }
+
   def convertToScala(rowRDD: Iterable[InternalRow], schema: StructType) = {
     val converter = CatalystTypeConverters.createToScalaConverter(schema)
     rowRDD.map(converter(_).asInstanceOf[Row])
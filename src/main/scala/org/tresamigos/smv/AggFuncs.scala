@@ -25,6 +25,11 @@ import org.apache.spark.sql.catalyst.expressions._
  to this implementation, if UserDefinedAggregateFunction doesn't provide the flexiblity in the
  future. For now, we will convert to use UserDefinedAggregateFunction and separate the histogram
  function
+
+ The EDD histograms are counted by a native groupBy plan instead (see EddTaskGroup). These
+ Column functions keep their map buffer: a histogram as a single aggregate Column can not be
+ written as a native plan, and UserDefinedAggregateFunction is the only aggregate extension
+ point which works on all the supported Spark versions.
  */
 private[smv] class Histogram(inputDT: DataType) extends UserDefinedAggregateFunction {
   def inputSchema = new StructType().add("v", inputDT)
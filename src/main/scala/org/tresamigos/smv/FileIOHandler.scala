@@ -15,8 +15,14 @@
 package org.tresamigos.smv
 
 import scala.reflect.ClassTag
+import org.apache.hadoop.conf.Configuration
+import org.apache.hadoop.io.compress.{CompressionCodec, CompressionCodecFactory}
+import org.apache.hadoop.io.{LongWritable, Text}
+import org.apache.hadoop.mapred.{FileInputFormat, InputFormat, JobConf, TextInputFormat}
+import org.apache.hadoop.mapred.lib.CombineTextInputFormat
 import org.apache.spark.rdd.RDD
 import org.apache.spark.sql._
+import org.apache.spark.sql.catalyst.expressions.GenericRow
 import org.tresamigos.smv.dqm._
 
 /**
@@ -31,22 +37,105 @@ private[smv] class FileIOHandler(
    * If CSV attributes are null, then they are extracted from the schema directly.
    * Schema can be specified explicitly via schemaOpt; otherwise it will be read
    * from file.
+   *
+   * The data path could be a single file, a directory, a glob pattern or a
+   * comma-separated list of them. All the matched files are read in a single
+   * scan, and the header (if any) is dropped from each file.
+   *
+   * @param minPartitions minimum number of partitions, 0 for Spark's default
+   * @param maxSplitSizeMB when positive, combine small files into splits up to
+   *        this size (in MB) instead of having at least one partition per file
    */
   private[smv] def csvFileWithSchema(
       csvAttributes: CsvAttributes,
       schema: SmvSchema,
-      parserValidator: ParserLogger
+      parserValidator: ParserLogger,
+      minPartitions: Int,
+      maxSplitSizeMB: Int
   ): DataFrame = {
-    val sc     = sparkSession.sparkContext
-
     val ca = if (csvAttributes == null) schema.extractCsvAttributes() else csvAttributes
 
-    val strRDD    = sc.textFile(dataPath)
-    val noHeadRDD = if (ca.hasHeader) CsvAttributes.dropHeader(strRDD) else strRDD
+    // the input format picks the codec from the file extensions, only make sure the
+    // codec the data was written with is available here
+    FileIOHandler.compressionCodec(schema.compression.orNull, sparkSession.sparkContext.hadoopConfiguration)
+
+    // part files are written by saveAsCsv (or a similar writer), which may only write the
+    // header in the first one
+    val recursive = SmvHDFS.inputDirRecursive(sparkSession.sparkContext.hadoopConfiguration)
+    val partFiles =
+      SmvHDFS.matchedFiles(dataPath, recursive).forall(_.getPath.getName.startsWith("part-"))
+    val expectedHeader = if (partFiles) Some(FileIOHandler.csvHeader(schema, ca)) else None
+
+    val noHeadRDD = readLines(ca.hasHeader, minPartitions, maxSplitSizeMB, expectedHeader)
 
     csvStringRDDToDF(noHeadRDD, schema, ca, parserValidator)
   }
 
+  private[smv] def csvFileWithSchema(
+      csvAttributes: CsvAttributes,
+      schema: SmvSchema,
+      parserValidator: ParserLogger
+  ): DataFrame = csvFileWithSchema(csvAttributes, schema, parserValidator, 0, 0)
+
+  /**
+   * Create a DataFrame from the given data path through Spark's native CSV data
+   * source instead of the opencsv parser. See `SparkCsvEngine` for the differences.
+   */
+  private[smv] def sparkCsvFileWithSchema(
+      csvAttributes: CsvAttributes,
+      schema: SmvSchema,
+      parserValidator: ParserLogger
+  ): DataFrame =
+    new SparkCsvEngine(sparkSession, dataPath).csvFileWithSchema(csvAttributes, schema, parserValidator)
+
+  /**
+   * Read the lines of all the files matched by the data path as a single RDD.
+   *
+   * Lines are keyed by their byte offset in their file, so the header of a file is the
+   * line at offset 0. This holds for each file in a combined split as well, and avoids
+   * the extra jobs `CsvAttributes.dropHeader` needs to locate the first line.
+   *
+   * Without an `expectedHeader`, every file has a header, which is dropped. Data written
+   * by `saveAsCsv` only has the header in its first part file, so with an `expectedHeader`
+   * only the first lines of the files which are equal to it are dropped.
+   */
+  private[smv] def readLines(
+      hasHeader: Boolean,
+      minPartitions: Int,
+      maxSplitSizeMB: Int,
+      expectedHeader: Option[String] = None
+  ): RDD[String] = {
+    val sc      = sparkSession.sparkContext
+    val jobConf = new JobConf(sc.hadoopConfiguration)
+    FileInputFormat.setInputPaths(jobConf, dataPath)
+    jobConf.setInt(FileIOHandler.ListStatusThreadsKey, FileIOHandler.ListStatusThreads)
+
+    val inputFormat: Class[_ <: InputFormat[LongWritable, Text]] =
+      if (maxSplitSizeMB > 0) {
+        jobConf.setLong(FileIOHandler.MaxSplitSizeKey, maxSplitSizeMB.toLong * 1024 * 1024)
+        classOf[CombineTextInputFormat]
+      } else {
+        classOf[TextInputFormat]
+      }
+
+    val nParts = if (minPartitions > 0) minPartitions else sc.defaultMinPartitions
+    val lines =
+      sc.hadoopRDD(jobConf, inputFormat, classOf[LongWritable], classOf[Text], nParts)
+
+    // no split at all means no file matched (hidden files are ignored by the input format)
+    if (lines.partitions.isEmpty)
+      throw new SmvRuntimeException(s"There are no data files in ${dataPath}")
+
+    val bodyLines =
+      if (!hasHeader) lines
+      else
+        expectedHeader match {
+          case Some(h) => lines.filter { case (offset, line) => offset.get != 0L || line.toString != h }
+          case None    => lines.filter { case (offset, _) => offset.get != 0L }
+        }
+    bodyLines.map { case (_, line) => line.toString }
+  }
+
   private def seqStringRDDToDF(
       rdd: RDD[Seq[String]],
       schema: SmvSchema,
@@ -57,13 +146,21 @@ private[smv] class FileIOHandler(
       parserV.addWithReason(e, r.mkString(",")); None
     }
     val rowRdd = rdd.mapPartitions { iterator =>
+      // converters keep per-partition state (formatters, parse buffers)
+      val converters = schema.valueConverters()
+      val size       = converters.length
       iterator
         .map[Option[Row]] { r =>
           try {
-            require(r.size == schema.getSize)
+            require(r.size == size)
             // use the schema to parse string into expected type
-            val parsed = r.zipWithIndex map { case (elem, i) => schema.toValue(i, elem) }
-            Some(Row.fromSeq(parsed))
+            val parsed = new Array[Any](size)
+            var i      = 0
+            while (i < size) {
+              parsed(i) = converters(i)(r(i))
+              i += 1
+            }
+            Some(new GenericRow(parsed))
           } catch {
             case e: IllegalArgumentException => add(e, r);
             case e: NumberFormatException    => add(e, r);
@@ -94,12 +191,9 @@ private[smv] class FileIOHandler(
     schema: SmvSchema
   ) {
     val csvAttributes = schema.extractCsvAttributes()
-    val qc = csvAttributes.quotechar
 
     //Adding the header to the saved file if ca.hasHeader is true.
-    val fieldNames = schema.toStructType.fieldNames
-    val headerStr =
-      fieldNames.map(_.trim).map(fn => qc + fn + qc).mkString(csvAttributes.delimiter.toString)
+    val headerStr = FileIOHandler.csvHeader(schema, csvAttributes)
 
     val csvHeaderRDD = df.sqlContext.sparkContext.parallelize(Array(headerStr), 1)
     val csvBodyRDD   = df.rdd.map(schema.rowToCsvString(_, csvAttributes))
@@ -112,18 +206,26 @@ private[smv] class FileIOHandler(
       else csvBodyRDD
 
     //Need to save schema last, because the schema file is treated as a success marker
-    csvRDD.saveAsTextFile(dataPath)
+    FileIOHandler.compressionCodec(schema.compression.orNull, df.sqlContext.sparkContext.hadoopConfiguration) match {
+      case Some(codec) => csvRDD.saveAsTextFile(dataPath, codec.getClass)
+      case None        => csvRDD.saveAsTextFile(dataPath)
+    }
   }
 
   // Since on Linux, when file stored on local file system, the partitions are not
   // guaranteed in order when read back in, we need to only store the body w/o the header
+  //
+  // When a compression codec is given, the part files are compressed with it and the
+  // codec is recorded in the schema "compression" attribute.
   private[smv] def saveAsCsvWithSchema(
       df: DataFrame,
       csvAttributes: CsvAttributes = CsvAttributes.defaultCsv,
-      strNullValue: String = ""
+      strNullValue: String = "",
+      compression: String = null
   ) {
 
-    val schema = SmvSchema.fromDataFrame(df, strNullValue, Some(csvAttributes))
+    val schema =
+      SmvSchema.fromDataFrame(df, strNullValue, Some(csvAttributes)).withCompression(compression)
     saveAsCsv(df, schema)
 
     val fullSchemaPath = SmvSchema.dataPathToSchemaPath(dataPath)
@@ -132,6 +234,34 @@ private[smv] class FileIOHandler(
 
 }
 
+private[smv] object FileIOHandler {
+  /** Hadoop key for the number of threads used to list the input files */
+  val ListStatusThreadsKey = "mapreduce.input.fileinputformat.list-status.num-threads"
+  val ListStatusThreads    = 16
+
+  /** Hadoop key for the max split size of the combined file input format */
+  val MaxSplitSizeKey = "mapreduce.input.fileinputformat.split.maxsize"
+
+  /** The header line `saveAsCsv` writes: the quoted field names */
+  def csvHeader(schema: SmvSchema, ca: CsvAttributes): String = {
+    val qc = ca.quotechar
+    schema.toStructType.fieldNames.map(_.trim).map(fn => qc + fn + qc).mkString(ca.delimiter.toString)
+  }
+
+  /**
+   * The Hadoop compression codec with the given name (e.g. "gzip", "bzip2", "snappy",
+   * "zstd"), None if the name is null or empty. The codecs are looked up in the given
+   * (SparkContext's) Hadoop configuration, so that configured codecs are found.
+   */
+  def compressionCodec(name: String, conf: Configuration): Option[CompressionCodec] =
+    if (name == null || name.isEmpty) None
+    else {
+      val codec = new CompressionCodecFactory(conf).getCodecByName(name)
+      if (codec == null) throw new SmvRuntimeException(s"Unknown compression codec ${name}")
+      Some(codec)
+    }
+}
+
 /**
  * A non-generic wrapper class of opencsv.CSVParser.
  */
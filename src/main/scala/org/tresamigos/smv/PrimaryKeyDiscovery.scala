@@ -15,6 +15,7 @@
 package org.tresamigos.smv
 
 import org.apache.spark.sql.DataFrame
+import org.apache.spark.sql.functions.{approx_count_distinct, countDistinct, rand, struct}
 import smvfuncs.smvCountDistinctWithNull
 
 private[smv] class PrimaryKeyDiscovery(val debug: Boolean) {
@@ -78,4 +79,95 @@ private[smv] class PrimaryKeyDiscovery(val debug: Boolean) {
     workingSet.unpersist
     res
   }
+
+  /**
+   * Find PKs from HyperLogLog estimates of the unique-counts.
+   *
+   * A random sample of `n` rows is taken in one pass. The unique-counts of the rows and of
+   * every column combination up to `maxArity` columns are estimated in a single aggregation.
+   * The combinations whose estimate reaches the row estimate (within the estimation error)
+   * are proposed, smallest first, and verified with exact unique-counts in a second
+   * aggregation. If no proposal is verified, fall back to the one by one search on the sample.
+   *
+   * The number of combinations grows quickly with the number of columns. When there are more
+   * than `MaxCandidates` columns, the single column unique-counts are estimated first, and only
+   * the `MaxCandidates` columns with the largest estimates are combined. More than `MaxCombos`
+   * combinations (with a large `maxArity`) is an error.
+   *
+   * @param maxArity max number of columns of the proposed keys
+   * @param rsd max relative standard deviation of the estimates
+   *
+   * @return (keys, unique-count)
+   **/
+  def discoverPKApprox(df: DataFrame,
+                       n: Integer,
+                       maxArity: Int = 3,
+                       rsd: Double = 0.02): (Seq[String], Long) = {
+    val workingSet = df.orderBy(rand(23)).limit(n).cache
+
+    val pool = workingSet.columns.toSeq
+
+    // struct is never null, so null values are counted as a distinct value
+    def combo(keys: Seq[String]) = struct(keys.map(workingSet(_)): _*)
+
+    val candidates = if (pool.size <= MaxCandidates) {
+      pool
+    } else {
+      val colExprs = pool.map { c => approx_count_distinct(combo(Seq(c)), rsd) as c }
+      val colEst   = workingSet.agg(colExprs.head, colExprs.tail: _*).collect.head.toSeq.map(_.asInstanceOf[Long])
+      pool.zip(colEst).sortBy { case (_, e) => -e }.take(MaxCandidates).map(_._1)
+    }
+    if (candidates.size < pool.size)
+      debugMessage(s"candidate columns: ${candidates.mkString(",")}")
+
+    val combos = (1 to math.min(maxArity, candidates.size)).flatMap(candidates.combinations)
+    if (combos.size > MaxCombos) {
+      workingSet.unpersist
+      throw new SmvRuntimeException(
+        s"Too many column combinations to estimate: ${combos.size}, more than ${MaxCombos}. Please use a smaller maxArity")
+    }
+
+    val estExprs = (pool +: combos).zipWithIndex.map {
+      case (keys, i) => approx_count_distinct(combo(keys), rsd) as s"_est_${i}"
+    }
+    val est     = workingSet.agg(estExprs.head, estExprs.tail: _*).collect.head.toSeq.map(_.asInstanceOf[Long])
+    val rowsEst = est.head
+
+    val proposed = combos
+      .zip(est.tail)
+      .filter { case (_, e) => e >= rowsEst * (1 - 3 * rsd) }
+      .sortBy { case (keys, e) => (keys.size, -e) }
+      .take(MaxVerified)
+      .map(_._1)
+    debugMessage(s"estimated unique-count: ${rowsEst};    proposed: ${proposed.map(_.mkString(",")).mkString("; ")}")
+
+    val res = if (proposed.isEmpty) {
+      oneByOnePK(workingSet, pool, Nil, 0l)
+    } else {
+      val exactExprs = (pool +: proposed).zipWithIndex.map {
+        case (keys, i) => countDistinct(combo(keys)) as s"_cnt_${i}"
+      }
+      val exact   = workingSet.agg(exactExprs.head, exactExprs.tail: _*).collect.head.toSeq.map(_.asInstanceOf[Long])
+      val rowsCnt = exact.head
+
+      proposed.zip(exact.tail).find { case (_, c) => c == rowsCnt } match {
+        case Some(keysNCnt) => keysNCnt
+        case None =>
+          debugMessage("no proposed key verified, searching one by one")
+          oneByOnePK(workingSet, pool, Nil, 0l)
+      }
+    }
+
+    workingSet.unpersist
+    res
+  }
+
+  /** max number of proposed keys verified exactly, each one is a distinct aggregation */
+  private val MaxVerified = 10
+
+  /** max number of columns combined into proposed keys, 298 combinations with arity 3 */
+  private val MaxCandidates = 12
+
+  /** max number of column combinations estimated in the single aggregation */
+  private val MaxCombos = 1000
 }
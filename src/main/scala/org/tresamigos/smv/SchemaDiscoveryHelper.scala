@@ -18,9 +18,10 @@ import org.apache.spark.rdd.RDD
 import org.apache.spark.sql.{DataFrame, SQLContext}
 import org.tresamigos.smv.util.StringConversion._
 
-import scala.util.Try
+import scala.util.{Random, Try}
 
 class SchemaDiscoveryHelper(sqlContext: SQLContext) {
+  import SchemaDiscoveryHelper._
 
   /**
    * Extract the column names from the csv header if it has one. In case of multi-line header the last header line is
@@ -49,6 +50,182 @@ class SchemaDiscoveryHelper(sqlContext: SQLContext) {
     }
   }
 
+  private[smv] def getTypeFormat(curTypeFormat: TypeFormat, valueStr: String): TypeFormat =
+    SchemaDiscoveryHelper.getTypeFormat(curTypeFormat, valueStr)
+
+  /**
+   * Discover the schema associated with a csv file that was converted to RDD[String]. If the csv file have a header,
+   * the column names will be what the header specify, in case of multi-line header, the last line in the header is
+   * considered the one that specify the column names. If there is no header the column names will be f1, f2, ... fn.
+   * @param strRDD the content of the csv file read as RDD[String]. This should include the header if the csv file has one.
+   * @param numLines the number of rows to process to discover the type of the columns
+   * @param ca  the csv file attributes
+   * @param sampling how the rows are selected, one of `SampleHead`, `SampleRandom` or `SampleStratified`
+   * @param seed random seed of the random and stratified samplings
+   */
+  private[smv] def discoverSchema(strRDD: RDD[String],
+                                  numLines: Int,
+                                  ca: CsvAttributes,
+                                  sampling: String = SampleHead,
+                                  seed: Int = DefaultSeed): SmvSchema = {
+    val columns   = getColumnNames(strRDD, ca)
+    val noHeadRDD = if (ca.hasHeader) CsvAttributes.dropHeader(strRDD) else strRDD
+    discoverSchemaFromLines(columns, noHeadRDD, numLines, ca, sampling, seed)
+  }
+
+  /**
+   * Discover the column types from the data lines (without header) of a csv file.
+   *
+   * The rows are type-inferred where they live, one `ColumnTypes` summary per partition,
+   * and the summaries are merged on the driver in partition order. Only with the
+   * `SampleHead` sampling the rows are brought to the driver.
+   */
+  private[smv] def discoverSchemaFromLines(columns: Array[String],
+                                           noHeadRDD: RDD[String],
+                                           numLines: Int,
+                                           ca: CsvAttributes,
+                                           sampling: String,
+                                           seed: Int): SmvSchema = {
+    val nCols = columns.length
+
+    val summary = sampling match {
+      case SampleHead =>
+        ColumnTypes(nCols, ca.delimiter, noHeadRDD.take(numLines).iterator)
+      case SampleRandom =>
+        val total    = noHeadRDD.count()
+        val fraction = if (numLines <= 0 || total <= numLines) 1.0 else numLines.toDouble / total
+        val sampled  = if (fraction >= 1.0) noHeadRDD else noHeadRDD.sample(false, fraction, seed)
+        summarize(sampled, nCols, ca.delimiter)
+      case SampleStratified =>
+        val nParts     = noHeadRDD.partitions.length
+        val perPartMax = if (numLines <= 0) Int.MaxValue else math.ceil(numLines.toDouble / nParts).toInt
+        val sampled = noHeadRDD.mapPartitionsWithIndex { (i, it) =>
+          reservoirSample(it, perPartMax, seed + i)
+        }
+        summarize(sampled, nCols, ca.delimiter)
+      case _ =>
+        throw new SmvRuntimeException(
+          s"Unsupported schema discovery sampling ${sampling}, expect one of ${SampleHead}, ${SampleRandom}, ${SampleStratified}")
+    }
+
+    // handle case where we were not able to parse a single valid data line.
+    if (summary.validCount == 0) {
+      throw new IllegalStateException("Unable to find a single valid data line")
+    }
+
+    //Now we should set the null schema entries to the Default StringSchemaEntry. This should be the case when the
+    //sampled values for a given column happen to be all missing.
+    val typeFmts = summary.typeFmts.map(t => if (t == null) StringTypeFormat() else t)
+
+    val res =
+      new SmvSchema(columns.zip(typeFmts).zip(summary.firstValues).map {
+        case ((n, t), r) => SchemaEntry(n, t, SmvKeys.createMetaWithDesc(r))
+      }, Map.empty)
+
+    res.addCsvAttributes(ca)
+  }
+
+  /**
+   * Discover schema from file
+   *
+   * The data path could be a single file, a directory, a glob pattern or a comma-separated
+   * list of them. The column names are taken from the first line, and the header (if any)
+   * is dropped from every file before sampling.
+   *
+   * @param dataPath the path to the csv file (a schema file should be a sister file of the csv)
+   * @param numLines the number of rows to process in order to discover the column types
+   * @param sampling how the rows are selected, one of `SampleHead`, `SampleRandom` or `SampleStratified`
+   * @param seed random seed of the random and stratified samplings
+   * @param ca the csv file attributes
+   */
+  def discoverSchemaFromFile(dataPath: String,
+                             numLines: Int = 1000,
+                             sampling: String = SampleHead,
+                             seed: Int = DefaultSeed)(implicit ca: CsvAttributes): SmvSchema = {
+    val columns   = getColumnNames(sqlContext.sparkContext.textFile(dataPath), ca)
+    val noHeadRDD = new FileIOHandler(sqlContext.sparkSession, dataPath).readLines(ca.hasHeader, 0, 0)
+    discoverSchemaFromLines(columns, noHeadRDD, numLines, ca, sampling, seed)
+  }
+}
+
+private[smv] object SchemaDiscoveryHelper {
+  /** Use the first lines of the data, in file order */
+  val SampleHead = "head"
+  /** Use a uniform random sample of the lines of all the files */
+  val SampleRandom = "random"
+  /** Use the same number of randomly chosen lines from every partition (file split) */
+  val SampleStratified = "stratified"
+
+  val DefaultSeed = 23
+
+  /**
+   * Per-column discovered types and first non-empty values of a set of rows.
+   * Rows which do not have the expected number of fields are ignored.
+   */
+  case class ColumnTypes(typeFmts: Array[TypeFormat], firstValues: Array[String], validCount: Long) {
+
+    /** Merge with the summary of the rows which follow these ones */
+    def merge(that: ColumnTypes): ColumnTypes =
+      ColumnTypes(
+        typeFmts.zip(that.typeFmts).map { case (a, b) => mergeTypeFormat(a, b) },
+        firstValues.zip(that.firstValues).map { case (a, b) => if (a.isEmpty) b else a },
+        validCount + that.validCount
+      )
+  }
+
+  object ColumnTypes {
+    def apply(nCols: Int, delimiter: Char, rows: Iterator[String]): ColumnTypes = {
+      val parser      = new CSVParser(delimiter)
+      val typeFmts    = Array.fill[TypeFormat](nCols)(null)
+      val firstValues = Array.fill[String](nCols)("")
+      var validCount  = 0L
+
+      for (rowStr <- rows) {
+        val rowValues = Try { parser.parseLine(rowStr) }.getOrElse(Array[String]())
+        if (rowValues.length == nCols) {
+          validCount += 1
+          var index = 0
+          while (index < nCols) {
+            val colVal = rowValues(index)
+            if (colVal.nonEmpty) {
+              typeFmts(index) = getTypeFormat(typeFmts(index), colVal)
+              if (firstValues(index).isEmpty) firstValues(index) = colVal
+            }
+            index += 1
+          }
+        }
+      }
+
+      ColumnTypes(typeFmts, firstValues, validCount)
+    }
+  }
+
+  /** Type-infer every partition of the rdd and merge the results in partition order */
+  private def summarize(rdd: RDD[String], nCols: Int, delimiter: Char): ColumnTypes =
+    rdd
+      .mapPartitions(it => Iterator(ColumnTypes(nCols, delimiter, it)))
+      .collect()
+      .foldLeft(ColumnTypes(nCols, delimiter, Iterator.empty))(_ merge _)
+
+  /** Uniformly choose up to `k` elements of the iterator (Algorithm R), keeping their order */
+  private[smv] def reservoirSample[T](it: Iterator[T], k: Int, seed: Long): Iterator[T] = {
+    if (k == Int.MaxValue) return it
+
+    val rand      = new Random(seed)
+    val reservoir = new scala.collection.mutable.ArrayBuffer[(Long, T)](math.min(k, 1024))
+    var n         = 0L
+    for (x <- it) {
+      if (n < k) {
+        reservoir += ((n, x))
+      } else {
+        val j = (rand.nextDouble() * (n + 1)).toLong
+        if (j < k) reservoir(j.toInt) = (n, x)
+      }
+      n += 1
+    }
+    reservoir.sortBy(_._1).iterator.map(_._2)
+  }
+
   private def canConvertToyyyyMMddDate(str: String): Boolean = {
     if (str.length == 8) {
       val monthVal = str.substring(4, 6).toInt
@@ -68,7 +245,7 @@ class SchemaDiscoveryHelper(sqlContext: SQLContext) {
    * accommodate all the possible values.
    * TODO: should consider using Decimal for large integer/float values (more than what can fit in long/double)
    */
-  private[smv] def getTypeFormat(curTypeFormat: TypeFormat, valueStr: String): TypeFormat = {
+  def getTypeFormat(curTypeFormat: TypeFormat, valueStr: String): TypeFormat = {
     if (valueStr.isEmpty)
       return curTypeFormat
 
@@ -129,76 +306,33 @@ class SchemaDiscoveryHelper(sqlContext: SQLContext) {
   }
 
   /**
-   * Discover the schema associated with a csv file that was converted to RDD[String]. If the csv file have a header,
-   * the column names will be what the header specify, in case of multi-line header, the last line in the header is
-   * considered the one that specify the column names. If there is no header the column names will be f1, f2, ... fn.
-   * @param strRDD the content of the csv file read as RDD[String]. This should include the header if the csv file has one.
-   * @param numLines the number of rows to process to discover the type of the columns
-   * @param ca  the csv file attributes
+   * The least type which accommodates the values of both types, i.e. the type `getTypeFormat`
+   * promotes to when the values of one type are followed by the values of the other one.
+   * Date/Timestamp of different formats, and Boolean mixed with anything else become String.
    */
-  private[smv] def discoverSchema(strRDD: RDD[String],
-                                  numLines: Int,
-                                  ca: CsvAttributes): SmvSchema = {
-    val parser = new CSVParser(ca.delimiter)
-
-    val columns = getColumnNames(strRDD, ca)
-
-    val noHeadRDD = if (ca.hasHeader) CsvAttributes.dropHeader(strRDD) else strRDD
-
-    var typeFmts = new scala.collection.mutable.ArrayBuffer[TypeFormat]
-    for (i <- 0 until columns.length) typeFmts += null
-
-    //TODO: What if the numLines is so big that rowsToParse will not fit in memory
-    // An alternative is to use the mapPartitionWithIndex
-    val rowsToParse = noHeadRDD.take(numLines)
-
-    var validCount = 0
-    //extract first valid value for each field to be used in the discovered schema as the columne description
-    var firstValidFields = Array.fill[String](columns.length)("")
-    for (rowStr <- rowsToParse) {
-      val rowValues = Try { parser.parseLine(rowStr) }.getOrElse(Array[String]())
-      if (rowValues.length == columns.length) {
-        validCount += 1
-        for (index <- 0 until columns.length) {
-          val colVal = rowValues(index)
-          if (colVal.nonEmpty) {
-            typeFmts(index) = getTypeFormat(typeFmts(index), colVal)
-            if(firstValidFields(index).isEmpty) firstValidFields(index) = colVal 
-          }
-        }
-      }
-    }
-
-    // handle case where we were not able to parse a single valid data line.
-    if (validCount == 0) {
-      throw new IllegalStateException("Unable to find a single valid data line")
+  def mergeTypeFormat(a: TypeFormat, b: TypeFormat): TypeFormat = {
+    def numRank(t: TypeFormat): Int = t match {
+      // a yyyyMMdd date is an Integer which happens to look like a date
+      case DateTypeFormat("yyyyMMdd") => 0
+      case IntegerTypeFormat(_)       => 1
+      case LongTypeFormat(_)          => 2
+      case FloatTypeFormat(_)         => 3
+      case DoubleTypeFormat(_)        => 4
+      case _                          => -1
     }
 
-    //Now we should set the null schema entries to the Default StringSchemaEntry. This should be the case when the first
-    //numLines values for a given column happen to be missing.
-    for (index <- 0 until columns.length) {
-      if (typeFmts(index) == null) {
-        typeFmts(index) = StringTypeFormat()
-      }
+    (a, b) match {
+      case (null, _)                   => b
+      case (_, null)                   => a
+      case _ if a == b                 => a
+      case (StringTypeFormat(_, _), _) => a
+      case (_, StringTypeFormat(_, _)) => b
+      // Long and Float can only both hold the values as Double
+      case (LongTypeFormat(_), FloatTypeFormat(_)) | (FloatTypeFormat(_), LongTypeFormat(_)) =>
+        DoubleTypeFormat()
+      case _ if numRank(a) >= 0 && numRank(b) >= 0 =>
+        if (numRank(a) >= numRank(b)) a else b
+      case _ => StringTypeFormat()
     }
-
-    val res =
-      new SmvSchema(columns.zip(typeFmts).zip(firstValidFields).map { 
-        case ((n, t), r) => SchemaEntry(n, t, SmvKeys.createMetaWithDesc(r))
-      }, Map.empty)
-
-    res.addCsvAttributes(ca)
-  }
-
-  /**
-   * Discover schema from file
-   * @param dataPath the path to the csv file (a schema file should be a sister file of the csv)
-   * @param numLines the number of rows to process in order to discover the column types
-   * @param ca the csv file attributes
-   */
-  def discoverSchemaFromFile(dataPath: String, numLines: Int = 1000)(
-      implicit ca: CsvAttributes): SmvSchema = {
-    val strRDD = sqlContext.sparkContext.textFile(dataPath)
-    discoverSchema(strRDD, numLines, ca)
   }
 }
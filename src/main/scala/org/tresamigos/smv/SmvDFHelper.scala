@@ -18,8 +18,8 @@ import org.apache.spark.rdd.RDD
 import org.apache.spark.sql.{DataFrame, Row, Column}
 import org.apache.spark.sql.expressions.Window
 import org.apache.spark.sql.functions._
-import org.apache.spark.sql.types.{StructType, StringType, StructField, LongType}
-import org.apache.spark.sql.catalyst.expressions.{NamedExpression, GenericRow}
+import org.apache.spark.sql.types.{StructType, StringType, StructField, LongType, DataType, MapType, ArrayType}
+import org.apache.spark.sql.catalyst.expressions.{NamedExpression, GenericRow, Murmur3Hash}
 import org.apache.spark.annotation.Experimental
 import org.apache.spark.util.LongAccumulator
 import edd.{Edd, Hist}
@@ -400,8 +400,9 @@ class SmvDFHelper(df: DataFrame) {
   }
 
   /**
-   * Remove duplicate records from the `DataFrame` by arbitrarly selecting the first record
-   * from a set of records with same primary key or key combo.
+   * Remove duplicate records from the `DataFrame` by keeping, from a set of records with the
+   * same primary key or key combo, the first one in input order. The first record is chosen
+   * by an aggregation, without an RDD groupBy, so a large group is never held in memory.
    * For example, given the following input DataFrame:
    * {{{
    * | id  | product | Company |
@@ -439,35 +440,44 @@ class SmvDFHelper(df: DataFrame) {
    * }}}
    */
   def dedupByKey(k1: String, krest: String*): DataFrame = {
-    import df.sqlContext.implicits._
     val keys = k1 +: krest
     /* Should call dropDuplicates, but that method has bug as if the first record has null
     df.dropDuplicates(keys)*/
 
-    val selectExpressions = df.columns.diff(keys).map {
-      //using smvFirst instead of first, since `first` return the first non-null of each field
-      fn =>
-        smvfuncs.smvFirst($"$fn") as fn
-    }
+    val others = df.columns.diff(keys)
 
-    if (selectExpressions.isEmpty) {
-      df.select(k1, krest: _*).distinct()
-    } else {
-      val ordinals = df.schema.getIndices(keys: _*)
-      val rowToKeys: Row => Seq[Any] = { row =>
-        ordinals.map { i =>
-          row(i)
-        }
-      }
+    // The first record of a key is the one with the smallest row id
+    val ordCol  = "_smv_dedup_ord"
+    val withOrd = df.withColumn(ordCol, monotonically_increasing_id())
 
-      val rdd = df.rdd.groupBy(rowToKeys).values.map { i =>
-        i.head
-      }
+    if (others.isEmpty) {
+      df.select(k1, krest: _*).distinct()
+    } else if (others.exists { c => hasMapType(df.schema(c).dataType) }) {
+      // A struct with a map field can not be ordered, so the min below does not apply.
+      // Keep the record with the smallest row id by reduceByKey, which is also combined
+      // before the shuffle.
+      val ordIdx = withOrd.schema.fieldIndex(ordCol)
+      val keyIdx = keys.map(withOrd.schema.fieldIndex)
+      val rdd = withOrd.rdd
+        .map { r => (keyIdx.map(r.get), r) }
+        .reduceByKey { (a, b) => if (a.getLong(ordIdx) <= b.getLong(ordIdx)) a else b }
+        .values
+        .map { r => Row.fromSeq(r.toSeq.take(ordIdx)) }
       df.sqlContext.createDataFrame(rdd, df.schema)
-      /* although above code pased all test cases. keep the original code here just in-case
-      df.groupBy(keys.map{k => $"$k"}: _*).agg(selectExpressions(0), selectExpressions.tail: _*).
-        select(df.columns.head, df.columns.tail: _*)
-     */
+    } else {
+      // Taking the min of a struct led by the row id keeps the whole record (nulls
+      // included) and is partially aggregated before the shuffle, so a group is never
+      // materialized. The row id is unique, so the other struct fields never decide
+      // the ordering.
+      val firstCol = "_smv_dedup_first"
+
+      withOrd
+        .groupBy(keys.map(withOrd(_)): _*)
+        .agg(min(struct((ordCol +: others).map(withOrd(_)): _*)) as firstCol)
+        .select(df.schema.fields.map { f =>
+          if (keys.contains(f.name)) col(f.name)
+          else col(firstCol).getField(f.name).as(f.name, f.metadata)
+        }: _*)
     }
   }
 
@@ -477,6 +487,14 @@ class SmvDFHelper(df: DataFrame) {
     dedupByKey(names(0), names.tail: _*)
   }
 
+  /** whether the type is or contains a map, which can not be ordered */
+  private def hasMapType(dt: DataType): Boolean = dt match {
+    case _: MapType    => true
+    case a: ArrayType  => hasMapType(a.elementType)
+    case s: StructType => s.fields.exists { f => hasMapType(f.dataType) }
+    case _             => false
+  }
+
   /**
    * Remove duplicated records by selecting the first record regarding a given ordering
    * For example, given the following input DataFrame:
@@ -501,8 +519,8 @@ class SmvDFHelper(df: DataFrame) {
    * | 2   | B       | C3      |
    * }}}
    *
-   * Same as the `dedupByKey` method, we use RDD groupBy in the implementation of this
-   * method to make sure we can handel large key space.
+   * The first record is chosen by a window ranking within each key, without an RDD
+   * groupBy. Records tied on the ordering are picked arbitrarily.
    **/
   def dedupByKeyWithOrder(keyCol: Column*)(orderCol: Column*): DataFrame = {
     val keys = keyCol.map { c =>
@@ -831,13 +849,8 @@ class SmvDFHelper(df: DataFrame) {
    * }}}
    * Will keep the 3 largest amt records
    **/
-  def smvTopNRecs(maxElems: Int, orders: Column*) = {
-    val w       = Window.orderBy(orders: _*)
-    val rankcol = mkUniq(df.columns, "rank")
-    val rownum  = mkUniq(df.columns, "rownum")
-    val r1      = df.smvSelectPlus(rank() over w as rankcol, row_number() over w as rownum)
-    r1.where(r1(rankcol) <= maxElems && r1(rownum) <= maxElems).smvSelectMinus(rankcol, rownum)
-  }
+  def smvTopNRecs(maxElems: Int, orders: Column*) =
+    TopNRecs(df, Nil, maxElems, orders)
 
   /*
    * Create single-columned dataframe whose values are the top N for the specified
@@ -877,11 +890,8 @@ class SmvDFHelper(df: DataFrame) {
                        joinType: String,
                        skewVals: Seq[Any],
                        key: String): DataFrame = {
-    val skewDf1     = df.where(df(key).isin(skewVals: _*))
-    val balancedDf1 = df.where(!df(key).isin(skewVals: _*))
-
-    val skewDf2     = df2.where(df2(key).isin(skewVals: _*))
-    val balancedDf2 = df2.where(!df2(key).isin(skewVals: _*))
+    val (skewDf1, balancedDf1) = splitBySkewVals(df, key, skewVals)
+    val (skewDf2, balancedDf2) = splitBySkewVals(df2, key, skewVals)
 
     val skewRes     = skewDf1.joinByKey(skewDf2, Seq(key), joinType, broadcastOther = true)
     val balancedRes = balancedDf1.joinByKey(balancedDf2, Seq(key), joinType)
@@ -889,6 +899,96 @@ class SmvDFHelper(df: DataFrame) {
     balancedRes.smvUnion(skewRes)
   }
 
+  /** Join with automatic detection of the skewed (high-frequency) key values
+   *
+   *  A sample of each side is taken, and the key values which have at least `threshold`
+   *  share of the sampled rows of either side are considered skewed. The detected values
+   *  are reported in the "smv" log.
+   *
+   *  Rows keyed by skewed values are joined on the key plus a salt: one side gets a random
+   *  salt in `[0, numBuckets)` and the rows of the other side are replicated for every salt
+   *  value, so that each skewed key is spread over `numBuckets` tasks, even when it is
+   *  heavy on both sides. Remaining rows are joined with a normal join, and the result is
+   *  the union of both joins.
+   *
+   *  The right side is salted for right outer joins, the left side for all other join types.
+   *  Full outer joins can not be salted without duplicating the unmatched rows of the
+   *  replicated side, so their skewed values are joined with a normal join.
+   *
+   *  Example:
+   *  {{{
+   *    df.smvSkewJoinByKey(df2, SmvJoinType.Inner, "cid")
+   *  }}}
+   *
+   *  @param threshold min share of the sampled rows of a key value to be considered skewed
+   *  @param numBuckets number of salt values each skewed key is spread over
+   *  @param sampleRate fraction of rows sampled for the detection
+   */
+  def smvSkewJoinByKey(df2: DataFrame,
+                       joinType: String,
+                       key: String,
+                       threshold: Double = 0.01,
+                       numBuckets: Int = 16,
+                       sampleRate: Double = 0.1): DataFrame = {
+    val log = org.apache.log4j.LogManager.getLogger("smv")
+
+    val skewVals =
+      (heavyKeyVals(df, key, threshold, sampleRate) ++ heavyKeyVals(df2, key, threshold, sampleRate)).distinct
+
+    if (skewVals.isEmpty) {
+      log.info(s"smvSkewJoinByKey: no skewed values of ${key} detected")
+      df.joinByKey(df2, Seq(key), joinType)
+    } else {
+      log.info(s"smvSkewJoinByKey: detected ${skewVals.size} skewed values of ${key}: " +
+        skewVals.take(20).mkString(", ") + (if (skewVals.size > 20) ", ..." else ""))
+
+      val (skewDf1, balancedDf1) = splitBySkewVals(df, key, skewVals)
+      val (skewDf2, balancedDf2) = splitBySkewVals(df2, key, skewVals)
+
+      val salt     = mkUniq(df.columns ++ df2.columns, "smv_salt")
+      val saltVals = array((0 until numBuckets).map(i => lit(i)): _*)
+      def salted(d: DataFrame)     = d.withColumn(salt, (rand(23) * numBuckets).cast("int"))
+      def replicated(d: DataFrame) = d.withColumn(salt, explode(saltVals))
+
+      val skewRes = joinType.toLowerCase.replace("_", "") match {
+        case "outer" | "full" | "fullouter" =>
+          log.warn(s"smvSkewJoinByKey: ${joinType} join can not be salted, skewed values use a normal join")
+          skewDf1.joinByKey(skewDf2, Seq(key), joinType)
+        case "rightouter" | "right" =>
+          replicated(skewDf1).joinByKey(salted(skewDf2), Seq(key, salt), joinType).smvSelectMinus(salt)
+        case _ =>
+          salted(skewDf1).joinByKey(replicated(skewDf2), Seq(key, salt), joinType).smvSelectMinus(salt)
+      }
+      val balancedRes = balancedDf1.joinByKey(balancedDf2, Seq(key), joinType)
+
+      balancedRes.smvUnion(skewRes)
+    }
+  }
+
+  /** split the rows of `d` into the ones with a key in `skewVals` and the others, including null keys */
+  private def splitBySkewVals(d: DataFrame, key: String, skewVals: Seq[Any]): (DataFrame, DataFrame) = {
+    val isSkewed = coalesce(d(key).isin(skewVals: _*), lit(false))
+    (d.where(isSkewed), d.where(!isSkewed))
+  }
+
+  /** key values of `d` with at least `threshold` share of the rows, estimated on a sample */
+  private def heavyKeyVals(d: DataFrame, key: String, threshold: Double, sampleRate: Double): Seq[Any] = {
+    val freq   = mkUniq(Seq(key), "freq")
+    val counts = d.select(d(key)).sample(false, sampleRate, 23).groupBy(key).agg(count(lit(1)) as freq).cache
+    try {
+      // sum is null on an empty sample
+      val total = Option(counts.agg(sum(freq)).head.get(0)).fold(0L)(_.asInstanceOf[Long])
+      counts
+        .where(col(key).isNotNull && col(freq) >= lit(math.max(threshold * total, 1.0)))
+        .select(key)
+        .collect
+        .map(_.get(0))
+        .toSeq
+    } finally {
+      counts.unpersist()
+    }
+  }
+
   /**
    * Create an Edd on DataFrame.
    * See [[org.tresamigos.smv.edd.Edd]] for details.
@@ -956,32 +1056,33 @@ class SmvDFHelper(df: DataFrame) {
    * {{{
    *   df1.smvOverlapCheck("key")(df2, df3).smvHist("flag")
    * }}}
+   *
+   * There is one output row per distinct key: a key which appears several times in a
+   * DF is only reported once. Null keys never overlap: there is a null key row for each
+   * DF which has null keys, flagged as only present in that DF.
+   *
+   * All the keys are tagged with the index of their DF and unioned, then a single
+   * aggregation by key, partially aggregated before its shuffle, builds the flag.
+   * The `partition` parameter is no longer used, and kept for source compatibility.
    **/
   def smvOverlapCheck(key: String, partition: Int = 4)(dfother: DataFrame*) = {
-    import df.sqlContext.implicits._
+    val srcCol = mkUniq(df.columns, "src")
+    val dfs    = df +: dfother
 
-    val dfSimple = df.select($"${key}", $"${key}" as s"${key}_0").repartition(partition)
-    val otherSimple = dfother.zipWithIndex.map {
-      case (df, i) =>
-        val newkey = s"${key}_${i + 1}"
-        (newkey, df.select($"${key}" as newkey).repartition(partition))
-    }
+    val tagged = dfs.zipWithIndex
+      .map { case (d, i) => d.select(d(key) as key, lit(i) as srcCol) }
+      .reduce(_ union _)
 
-    val joined = otherSimple.foldLeft(dfSimple) { (c, p) =>
-      val newkey = p._1
-      val r      = p._2
-      c.join(r, $"${key}" === $"${newkey}", SmvJoinType.Outer)
-        .smvSelectPlus(coalesce($"${key}", $"${newkey}") as "tmp")
-        .smvSelectMinus(key)
-        .smvRenameField("tmp" -> key)
+    val hasCols = dfs.indices.map { i =>
+      max(when(col(srcCol) === i, "1").otherwise("0"))
     }
 
-    val hasCols = Range(0, otherSimple.size + 1).map { i =>
-      val newkey = s"${key}_${i}"
-      when($"${newkey}".isNull, "0").otherwise("1")
-    }
-
-    joined.select($"${key}", smvfuncs.smvStrCat(hasCols: _*) as "flag")
+    // null keys are grouped by their DF, so that they never overlap
+    val nullSrcCol = mkUniq(Seq(key, srcCol), "nullSrc")
+    tagged
+      .groupBy(col(key), when(col(key).isNull, col(srcCol)) as nullSrcCol)
+      .agg(smvfuncs.smvStrCat(hasCols: _*) as "flag")
+      .select(key, "flag")
   }
 
   /**
@@ -992,18 +1093,72 @@ class SmvDFHelper(df: DataFrame) {
    *  df.smvHashSample($"key", rate=0.1, seed=123)
    * }}}
    *
+   * The hash is Spark's native `Murmur3Hash` expression (same as the `hash` function,
+   * but with the given seed), so the membership of a key only depends on its value,
+   * its type and the seed. Earlier versions hashed the string representation of
+   * the key with a UDF, so a sample taken with the same rate and seed now contains
+   * a different set of keys.
+   *
    * @param key column to sample on.
    * @param rate sample rate in range (0, 1] with a default of 0.01 (1%)
    * @param seed random generator integer seed with a default of 23.
    **/
-  def smvHashSample(key: Column, rate: Double = 0.01, seed: Int = 23) = {
-    import scala.util.hashing.{MurmurHash3 => MH3}
-    val cutoff = Int.MaxValue * rate
-    val getHash = { s: Any =>
-      MH3.stringHash(s.toString, seed) & Int.MaxValue
+  def smvHashSample(key: Column, rate: Double = 0.01, seed: Int = 23): DataFrame =
+    smvHashSample(Seq(key), rate, seed)
+
+  /**
+   * Sample the df according to the combined hash of multiple columns.
+   *
+   * {{{
+   *  df.smvHashSample(Seq($"k1", $"k2"), 0.1, 123)
+   * }}}
+   *
+   * Null key values are skipped by the hash, so they do not make a row fail.
+   **/
+  def smvHashSample(keys: Seq[Column], rate: Double, seed: Int): DataFrame =
+    hashSampleBy(keys, lit(rate), seed)
+
+  /**
+   * Stratified sample of the df according to the hash of a column.
+   * Rows of each stratum (value of `strataCol`) are sampled with the rate given for
+   * that stratum. Rows of the strata which are not in `rates` are dropped.
+   *
+   * {{{
+   *  df.smvStratifiedHashSample($"key", $"state", Map("CA" -> 0.01, "NV" -> 0.5))
+   * }}}
+   *
+   * Since the same hash as `smvHashSample` is used, a stratum sampled at rate `r`
+   * contains the same keys as `smvHashSample(key, r, seed)` restricted to that stratum.
+   *
+   * @param key column to sample on.
+   * @param strataCol column which defines the strata.
+   * @param rates map from stratum value to sample rate in range [0, 1]
+   * @param seed random generator integer seed with a default of 23.
+   **/
+  def smvStratifiedHashSample(key: Column,
+                              strataCol: Column,
+                              rates: Map[Any, Double],
+                              seed: Int = 23): DataFrame =
+    smvStratifiedHashSample(Seq(key), strataCol, rates, seed)
+
+  /** Stratified sample of the df according to the combined hash of multiple columns */
+  def smvStratifiedHashSample(keys: Seq[Column],
+                              strataCol: Column,
+                              rates: Map[Any, Double],
+                              seed: Int): DataFrame = {
+    // null safe equal, so that a rate can also be given to the null stratum
+    val rateCol = rates.foldLeft(lit(0.0)) {
+      case (c, (stratum, rate)) => when(strataCol <=> lit(stratum), lit(rate)).otherwise(c)
     }
-    val hashUdf = udf(getHash)
-    df.where(hashUdf(key) < lit(cutoff))
+    hashSampleBy(keys, rateCol, seed)
+  }
+
+  /** keep the rows whose non-negative key hash is below rate * Int.MaxValue */
+  private def hashSampleBy(keys: Seq[Column], rate: Column, seed: Int): DataFrame = {
+    require(keys.nonEmpty, "smvHashSample requires at least one key column")
+
+    val hashCol = new Column(Murmur3Hash(keys.map(_.expr), seed)).bitwiseAND(Int.MaxValue)
+    df.where(hashCol < rate * lit(Int.MaxValue.toDouble))
   }
 
   /**
@@ -1082,15 +1237,21 @@ class SmvDFHelper(df: DataFrame) {
    *
    * @param n number of rows the PK discovery algorithm will run on.
    * @param debug if true printout debug info
+   * @param approx if true, run on a random sample of n rows (instead of the first n rows)
+   *        and propose keys of up to 3 columns from HyperLogLog estimates computed in one
+   *        pass, then verify them exactly
    * @return (list_of_keys, unique-count)
    *
    * Please note the algorithm only look for a set of keys which uniquely
    * identify the row, there could be more key combinations which can also
    * be the primary key.
    */
-  def smvDiscoverPK(n: Integer = 10000, debug: Boolean = false): (Seq[String], Long) = {
+  def smvDiscoverPK(n: Integer = 10000,
+                    debug: Boolean = false,
+                    approx: Boolean = false): (Seq[String], Long) = {
     val discoverer = new PrimaryKeyDiscovery(debug)
-    discoverer.discoverPK(df, n)
+    if (approx) discoverer.discoverPKApprox(df, n)
+    else discoverer.discoverPK(df, n)
   }
 
   /**
@@ -1103,7 +1264,22 @@ class SmvDFHelper(df: DataFrame) {
    * have to be launched as either local or yar-client mode. Also it is user's responsibility
    * to make sure that the DF is small enough to fit into local file system.
    **/
-  def smvExportCsv(path: String, n: Integer = null) {
+  def smvExportCsv(path: String, n: Integer = null): Unit = smvExportCsv(path, n, null, null)
+
+  /**
+   * Export DF to a csv file on the local file system, with a schema file next to it.
+   *
+   * By default the records are streamed to the driver one partition at a time. When
+   * `partDir` is given, the partitions are first written in parallel as part files
+   * under that (HDFS) directory, then concatenated into the local file.
+   *
+   * @param path path on local file system
+   * @param n number of records to be exported, null to export every records
+   * @param codec compression codec name ("gzip", "bzip2", "zstd", ...), null for no compression
+   * @param partDir temporary directory of the part files, null to stream the partitions
+   * @return number of records exported
+   **/
+  def smvExportCsv(path: String, n: Integer, codec: String, partDir: String): Long = {
     val schema = SmvSchema.fromDataFrame(df)
     val ca     = CsvAttributes.defaultCsv
 
@@ -1112,7 +1288,6 @@ class SmvDFHelper(df: DataFrame) {
 
     val qc        = ca.quotechar
     val headerStr = df.columns.map(_.trim).map(fn => qc + fn + qc).mkString(ca.delimiter.toString)
-    val headerRdd = df.sqlContext.sparkContext.makeRDD(Seq(headerStr))
 
     val bodyRdd = if (n == null) {
       df.map(schema.rowToCsvString(_, ca)).rdd
@@ -1120,7 +1295,8 @@ class SmvDFHelper(df: DataFrame) {
       df.limit(n).map(schema.rowToCsvString(_, ca)).rdd
     }
 
-    SmvReportIO.saveLocalReportFromRdd(headerRdd ++ bodyRdd, path)
+    if (partDir == null) SmvReportIO.exportLocal(headerStr, bodyRdd, path, codec)
+    else SmvReportIO.exportLocalFromParts(headerStr, bodyRdd, path, codec, partDir)
   }
 
   /**
@@ -1314,6 +1490,8 @@ class SmvDFHelper(df: DataFrame) {
   /* Shared private method */
   private[smv] def _smvEdd(cols: String*) = df.edd.summary(cols: _*)
 
+  private[smv] def _smvEddSketch(cols: String*) = df.edd.sketch(cols: _*)
+
   private[smv] def _smvHist(cols: String*) =
     df.edd.histogram(cols.head, cols.tail: _*)
 
@@ -1377,6 +1555,11 @@ class SmvDFHelper(df: DataFrame) {
    **/
   def smvEdd(cols: String*) = println(_smvEdd(cols: _*).createReport())
 
+  /**
+   * Print EDD sketch summary: approx quantiles, distinct counts and frequent items
+   **/
+  def smvEddSketch(cols: String*) = println(_smvEddSketch(cols: _*).createReport())
+
   /**
    * Print EDD histogram (each col's histogram prints separately)
    **/
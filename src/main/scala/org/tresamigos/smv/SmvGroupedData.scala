@@ -23,7 +23,6 @@ import org.apache.spark.sql.catalyst.analysis.UnresolvedAttribute
 import org.apache.spark.sql.catalyst.expressions._
 import org.apache.spark.sql.catalyst.expressions.aggregate._
 import org.apache.spark.sql.catalyst.InternalRow
-import org.apache.spark.Partitioner
 import org.apache.spark.annotation.Experimental
 
 import edd.Edd
@@ -491,13 +490,8 @@ class SmvGroupedDataFunc(smvGD: SmvGroupedData) {
    * }}}
    * Will keep the 3 largest amt records for each id
    **/
-  def smvTopNRecs(maxElems: Int, orders: Column*) = {
-    val w       = winspec.orderBy(orders: _*)
-    val rankcol = mkUniq(df.columns, "rank")
-    val rownum  = mkUniq(df.columns, "rownum")
-    val r1      = df.smvSelectPlus(rank() over w as rankcol, row_number() over w as rownum)
-    r1.where(r1(rankcol) <= maxElems && r1(rownum) <= maxElems).smvSelectMinus(rankcol, rownum)
-  }
+  def smvTopNRecs(maxElems: Int, orders: Column*) =
+    TopNRecs(df, keys, maxElems, orders)
 
   /**
    * RunAgg will sort the records in the each group according to the specified ordering (syntax is the same
@@ -849,30 +843,9 @@ class SmvGroupedDataFunc(smvGD: SmvGroupedData) {
     }
   }
 
-  private[smv] def smvRePartition(partitioner: Partitioner): SmvGroupedData = {
-    val fields = df.columns
-
-    val keyColsStr = keys.map { k =>
-      df(k).cast("string")
-    }
-    val keyDf = df.selectPlusPrefix(smvfuncs.smvStrCat(keyColsStr: _*) as "_smvRePartition_key_")
-
-    val resRdd = keyDf.rdd
-      .keyBy({ r =>
-        r(0)
-      })
-      .partitionBy(partitioner)
-      .values
-    val resDf = df.sqlContext.createDataFrame(resRdd.map { r =>
-      Row.fromSeq(r.toSeq)
-    }, keyDf.schema)
-
-    resDf.select(fields.head, fields.tail: _*).smvGroupBy(keys.head, keys.tail: _*)
-  }
-
   /**
-   * Repartition SmvGroupedData using specified partitioner on the keys. A
-   * HashPartitioner with the specified number of partitions will be used.
+   * Repartition SmvGroupedData by the hash of the keys into the specified number
+   * of partitions.
    *
    * This method is used in the cases that the key-space is very large. In the
    * current Spark DF's groupBy method, the entire key-space is actually loaded
@@ -881,16 +854,17 @@ class SmvGroupedDataFunc(smvGD: SmvGroupedData) {
    * repartition will not guaranteed to reduce the key-space on each executor.
    * In that case we need to use this function to linearly reduce the key-space.
    *
+   * The output is hash partitioned by the keys with Spark's own `repartition`, so
+   * that a following aggregation or join on the same keys reuses the partitioning
+   * instead of adding another shuffle.
+   *
    * Example:
    * {{{
    *      df.smvGroupBy("k1", "k2").smvRePartition(32).aggWithKeys(sum($"v") as "v")
    * }}}
    **/
-  def smvRePartition(numParts: Int): SmvGroupedData = {
-    import org.apache.spark.HashPartitioner
-    val hashPart = new HashPartitioner(numParts)
-    smvRePartition(hashPart)
-  }
+  def smvRePartition(numParts: Int): SmvGroupedData =
+    df.repartition(numParts, keys.map(k => df(k)): _*).smvGroupBy(keys.head, keys.tail: _*)
 
   /**
    * Create an Edd on SmvGroupedData.
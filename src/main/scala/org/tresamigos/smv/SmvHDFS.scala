@@ -41,6 +41,9 @@ private[smv] object SmvHDFS {
     FileSystem.get(uri, hadoopConf)
   }
 
+  /** Scheme of the default file system, which is used to resolve paths without a scheme */
+  def defaultFsScheme(): String = FileSystem.getDefaultUri(hadoopConf).getScheme
+
   def exists(fileName: String): Boolean = getFileSystem(fileName).exists(new Path(fileName))
 
   /** Atomically creates a file in the hadoop fs, useful for creating a lockfile */
@@ -102,11 +105,33 @@ private[smv] object SmvHDFS {
     FileUtil.copyMerge(hdfs, pathHdfsPath, lfs, pathLocalPath, false, hadoopConf, "")
   }
 
+  /**
+   * Copy a file, or a directory and its files, replacing the destination.
+   * The bytes are streamed from the source to the destination file system, the
+   * files of a directory are copied concurrently.
+   */
+  def copy(srcName: String, dstName: String): Unit = {
+    val srcFs = getFileSystem(srcName)
+    val dstFs = getFileSystem(dstName)
+    val src   = new Path(srcName)
+    val dst   = new Path(dstName)
+
+    if (dstFs.exists(dst)) dstFs.delete(dst, true)
+
+    if (srcFs.getFileStatus(src).isDirectory) {
+      dstFs.mkdirs(dst)
+      srcFs.listStatus(src).toSeq.par.foreach { st =>
+        FileUtil.copy(srcFs, st.getPath, dstFs, new Path(dst, st.getPath.getName), false, hadoopConf)
+      }
+    } else {
+      FileUtil.copy(srcFs, src, dstFs, dst, false, hadoopConf)
+    }
+  }
+
   /**
    * get modification time of a HDFS file.
    * If the file path contains a "*" glob pattern, 0 is returned.
-   * TODO: should come up with a hash of all modification times for which the
-   * glob patten matchs (and rename this method)
+   * Use `fingerprint` to detect changes of directories and glob patterns.
    **/
   def modificationTime(fileName: String): Long = {
     if (fileName contains "*") {
@@ -119,6 +144,126 @@ private[smv] object SmvHDFS {
     }
   }
 
+  /** Hidden files (starting with "_" or ".") are ignored by the input formats */
+  private def isHidden(name: String): Boolean = name.startsWith("_") || name.startsWith(".")
+
+  /**
+   * Hadoop configuration key of the input formats to also read the files under the
+   * sub-directories of an input directory
+   */
+  val InputDirRecursiveKey = "mapreduce.input.fileinputformat.input.dir.recursive"
+
+  /** Whether the input formats read input directories recursively under the given configuration */
+  def inputDirRecursive(conf: org.apache.hadoop.conf.Configuration): Boolean =
+    conf.getBoolean(InputDirRecursiveKey, false)
+
+  /**
+   * Split a comma-separated list of paths the way FileInputFormat.setInputPaths does:
+   * commas inside the braces of a glob pattern (e.g. `data/{a,b}/*.csv`) do not
+   * separate paths, and escaped characters are unescaped.
+   */
+  def splitPaths(commaSeparatedPaths: String): Seq[String] = {
+    val paths     = scala.collection.mutable.ArrayBuffer.empty[String]
+    var curlyOpen = 0
+    var pathStart = 0
+
+    commaSeparatedPaths.zipWithIndex.foreach {
+      case ('{', _)                   => curlyOpen += 1
+      case ('}', _) if curlyOpen > 0  => curlyOpen -= 1
+      case (',', i) if curlyOpen == 0 =>
+        paths += commaSeparatedPaths.substring(pathStart, i)
+        pathStart = i + 1
+      case _ =>
+    }
+    paths += commaSeparatedPaths.substring(pathStart)
+
+    paths.filter(_.nonEmpty).map(org.apache.hadoop.util.StringUtils.unEscapeString)
+  }
+
+  /**
+   * All the non-hidden files matched by the given path, which could be a file, a
+   * directory, a glob pattern or a comma-separated list of them (see `splitPaths`).
+   * Only the direct files of a directory are matched, unless `recursive` is true, in
+   * which case the directories are listed recursively, with a single (batched)
+   * recursive listing each, skipping the files under hidden sub-directories.
+   */
+  def matchedFiles(pathPattern: String, recursive: Boolean): Seq[FileStatus] =
+    splitPaths(pathPattern).flatMap { pattern =>
+      val fs      = getFileSystem(pattern)
+      val matched = Option(fs.globStatus(new Path(pattern))).getOrElse(Array.empty[FileStatus])
+
+      matched.toSeq.filterNot(st => isHidden(st.getPath.getName)).flatMap { st =>
+        if (st.isDirectory && recursive) {
+          val root  = st.getPath.toUri.getPath.stripSuffix("/") + "/"
+          val iter  = fs.listFiles(st.getPath, true)
+          val files = scala.collection.mutable.ArrayBuffer.empty[FileStatus]
+          while (iter.hasNext) {
+            val f = iter.next
+            if (!f.getPath.toUri.getPath.stripPrefix(root).split("/").exists(isHidden)) files += f
+          }
+          files
+        } else if (st.isDirectory) {
+          fs.listStatus(st.getPath).toSeq.filter(f => f.isFile && !isHidden(f.getPath.getName))
+        } else {
+          Seq(st)
+        }
+      }
+    }
+
+  /** The files matched by the given path, as the input formats see them by default */
+  def matchedFiles(pathPattern: String): Seq[FileStatus] =
+    matchedFiles(pathPattern, inputDirRecursive(hadoopConf))
+
+  /**
+   * Fingerprint of the files matched by the given path (see `matchedFiles`): the MD5
+   * hex digest of the sorted (path, size, modification time) of the files, and
+   * their file system checksums when `withChecksum` is true. File systems without
+   * checksums (e.g. the local one) only contribute the other fields. Directories are
+   * listed recursively only if `conf` makes the input formats read them recursively,
+   * so the fingerprint covers the same files as the read.
+   */
+  def fingerprint(
+      pathPattern: String,
+      withChecksum: Boolean,
+      conf: org.apache.hadoop.conf.Configuration): String = {
+    val md    = java.security.MessageDigest.getInstance("MD5")
+    val files = matchedFiles(pathPattern, inputDirRecursive(conf)).sortBy(_.getPath.toString)
+
+    files.foreach { st =>
+      val checksum =
+        if (!withChecksum) ""
+        else
+          Option(getFileSystem(st.getPath.toString).getFileChecksum(st.getPath))
+            .map(_.getBytes.map("%02x".format(_)).mkString)
+            .getOrElse("")
+      md.update(
+        s"${st.getPath}|${st.getLen}|${st.getModificationTime}|${checksum}\n"
+          .getBytes(StandardCharsets.UTF_8))
+    }
+
+    md.digest.map("%02x".format(_)).mkString
+  }
+
+  def fingerprint(pathPattern: String, withChecksum: Boolean): String =
+    fingerprint(pathPattern, withChecksum, hadoopConf)
+
+  def fingerprint(pathPattern: String): String = fingerprint(pathPattern, false)
+
+  /** Total size in bytes of the files matched by the given path, sub-directories included */
+  def totalSize(pathPattern: String): Long = matchedFiles(pathPattern, true).map(_.getLen).sum
+
+  /** Number of the files matched by the given path, sub-directories included */
+  def fileCount(pathPattern: String): Int = matchedFiles(pathPattern, true).size
+
+  /** Rename a file or a directory, replacing the destination */
+  def rename(srcName: String, dstName: String): Boolean = {
+    val fs  = getFileSystem(srcName)
+    val dst = new Path(dstName)
+    if (fs.exists(dst)) fs.delete(dst, true)
+    fs.mkdirs(dst.getParent)
+    fs.rename(new Path(srcName), dst)
+  }
+
   /**
    * Return a list of files in the given directory.
    * Note that we don't use hdfs.listFiles as it was not available in earlier
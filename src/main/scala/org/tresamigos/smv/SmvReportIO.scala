@@ -15,7 +15,13 @@
 package org.tresamigos.smv
 
 import org.apache.spark.rdd.RDD
-import java.io.{PrintWriter, File}
+import java.io.{BufferedWriter, ByteArrayOutputStream, File, FileOutputStream, OutputStream, OutputStreamWriter, PrintWriter}
+import java.nio.charset.StandardCharsets
+
+import org.apache.hadoop.conf.Configuration
+import org.apache.hadoop.fs.Path
+import org.apache.hadoop.io.IOUtils
+import org.apache.hadoop.io.compress.CompressionCodec
 
 /**
  * Output handler for writing reports on the local file system. Verifies that
@@ -48,4 +54,97 @@ private[smv] object SmvReportIO {
     report.toLocalIterator foreach (s => rw.write(s + "\n"))
     rw.close
   }
+
+  /** File extension of the named codec, e.g. ".gz", empty for no compression */
+  def codecExtension(name: String, conf: Configuration): String =
+    FileIOHandler.compressionCodec(name, conf).map(_.getDefaultExtension).getOrElse("")
+
+  private def localOutput(path: String): OutputStream = {
+    val outFile = new File(path)
+    val parent  = outFile.getParentFile
+    if (parent != null && !parent.isDirectory)
+      throw new SmvRuntimeException(s"Cannot write to ${path}: directory ${parent} does not exist")
+    new FileOutputStream(outFile)
+  }
+
+  private def compress(bytes: Array[Byte], codec: Option[CompressionCodec]): Array[Byte] =
+    codec match {
+      case None => bytes
+      case Some(c) =>
+        val buf = new ByteArrayOutputStream()
+        val out = c.createOutputStream(buf)
+        out.write(bytes)
+        out.close()
+        buf.toByteArray
+    }
+
+  /**
+   * Stream the header and the lines to a local file, one partition at a time, so that
+   * the driver never holds more than a partition. Returns the number of lines written.
+   */
+  def exportLocal(header: String, lines: RDD[String], path: String, codecName: String): Long = {
+    val raw = localOutput(path)
+    val out = FileIOHandler
+      .compressionCodec(codecName, lines.sparkContext.hadoopConfiguration)
+      .map(_.createOutputStream(raw))
+      .getOrElse(raw)
+    val w   = new BufferedWriter(new OutputStreamWriter(out, StandardCharsets.UTF_8), 1 << 20)
+    var n   = 0L
+    try {
+      w.write(header)
+      w.write('\n')
+      lines.toLocalIterator.foreach { l =>
+        w.write(l)
+        w.write('\n')
+        n += 1
+      }
+    } finally w.close()
+    n
+  }
+
+  /**
+   * Write the lines as (compressed) part files under `partDir` in parallel with the
+   * executors, then concatenate the header and the part files into a local file.
+   *
+   * The part files are appended as they are, without decompression: gzip, bzip2 and
+   * zstd streams can be concatenated into a valid stream, so the header is written
+   * as its own compressed stream. `partDir` is removed afterwards.
+   * Returns the number of lines written.
+   */
+  def exportLocalFromParts(header: String,
+                           lines: RDD[String],
+                           path: String,
+                           codecName: String,
+                           partDir: String): Long = {
+    val codec = FileIOHandler.compressionCodec(codecName, lines.sparkContext.hadoopConfiguration)
+    val count = lines.sparkContext.longAccumulator("smvExportCsv rows")
+    val counted = lines.map { l =>
+      count.add(1); l
+    }
+
+    SmvHDFS.deleteFile(partDir)
+    codec match {
+      case Some(c) => counted.saveAsTextFile(partDir, c.getClass)
+      case None    => counted.saveAsTextFile(partDir)
+    }
+
+    val conf = lines.sparkContext.hadoopConfiguration
+    val dir  = new Path(partDir)
+    val fs   = dir.getFileSystem(conf)
+    val parts =
+      fs.listStatus(dir).map(_.getPath).filter(_.getName.startsWith("part-")).sortBy(_.getName)
+
+    val out = localOutput(path)
+    try {
+      out.write(compress((header + "\n").getBytes(StandardCharsets.UTF_8), codec))
+      parts.foreach { p =>
+        val in = fs.open(p)
+        try IOUtils.copyBytes(in, out, conf, false)
+        finally in.close()
+      }
+    } finally out.close()
+
+    SmvHDFS.deleteFile(partDir)
+    count.value
+  }
 }
@@ -0,0 +1,195 @@
+/*
+ * This file is licensed under the Apache License, Version 2.0
+ * (the "License"); you may not use this file except in compliance with
+ * the License.  You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package org.tresamigos.smv
+
+import org.apache.spark.sql._
+import org.apache.spark.sql.functions._
+import org.apache.spark.sql.types._
+import org.tresamigos.smv.dqm._
+
+/**
+ * Read CSV files with Spark's native CSV data source, driven by an SmvSchema.
+ *
+ * This is an alternative to the opencsv + `SmvSchema.toValue` path of `FileIOHandler`.
+ * Lines are tokenized by the native reader, which also parses timestamp and date
+ * columns when all the columns of that type share the same format. All the other
+ * columns are read as strings and converted with Catalyst expressions, so that
+ * per-column formats and string null values follow the SmvSchema.
+ *
+ * Malformed lines (reported by the reader in the corrupt record column) and values
+ * which fail to convert are sent to the ParserLogger and dropped, same as the
+ * default parser. Like the default parser, the rejects are logged in a pass over the
+ * rows, never from an expression which Catalyst could evaluate more than once.
+ * Integral fields are checked to be integers before the cast, since the cast
+ * truncates decimals (e.g. "1.5" to 1), which the default parser rejects.
+ *
+ * Differences from the default parser:
+ *  - Map and Array columns are not supported
+ *  - empty fields are read as null for String columns with a non-empty null value
+ *  - timestamps/dates in a non-shared format are parsed with second precision
+ *  - the native timestamp/date parsing falls back to ISO formats when the value
+ *    does not match the format
+ *
+ * Requires Spark 2.2 or later for the corrupt record column.
+ */
+private[smv] class SparkCsvEngine(sparkSession: SparkSession, dataPath: String) {
+  import SparkCsvEngine._
+
+  def csvFileWithSchema(
+      csvAttributes: CsvAttributes,
+      schema: SmvSchema,
+      parserValidator: ParserLogger
+  ): DataFrame = {
+    assertSupported(schema)
+
+    val ca = if (csvAttributes == null) schema.extractCsvAttributes() else csvAttributes
+
+    val tsFormat   = sharedFormat(schema) { case TimestampTypeFormat(f) => f }
+    val dateFormat = sharedFormat(schema) { case DateTypeFormat(f) => f }
+
+    // types the native reader produces for each field
+    val readFields = schema.entries.map { e =>
+      val readType = e.typeFormat match {
+        case TimestampTypeFormat(f) if tsFormat == Some(f) => TimestampType
+        case DateTypeFormat(f) if dateFormat == Some(f)    => DateType
+        case _                                             => StringType
+      }
+      StructField(e.field.name, readType, true)
+    }
+    val readSchema = StructType(readFields :+ StructField(CorruptRecordCol, StringType, true))
+
+    val options = Map(
+      "sep"                       -> ca.delimiter.toString,
+      "quote"                     -> ca.quotechar.toString,
+      // Excel CSV escapes the quote char by doubling it, otherwise backslash escapes
+      "escape"                    -> (if (ca.isExcelCSV) ca.quotechar.toString else "\\"),
+      "header"                    -> ca.hasHeader.toString,
+      "mode"                      -> "PERMISSIVE",
+      "columnNameOfCorruptRecord" -> CorruptRecordCol
+    ) ++ tsFormat.map("timestampFormat" -> _) ++ dateFormat.map("dateFormat" -> _)
+
+    val raw = sparkSession.read
+      .options(options)
+      .schema(readSchema)
+      .csv(SmvHDFS.splitPaths(dataPath): _*)
+
+    val converted = schema.entries.zip(readFields).map {
+      case (e, f) =>
+        val rawCol = raw(e.field.name)
+        if (f.dataType == StringType) convert(rawCol, e.typeFormat) else (rawCol, lit(false))
+    }
+
+    val failReason = coalesce(
+      (when(raw(CorruptRecordCol).isNotNull, lit("malformed record")) +:
+        schema.entries.zip(converted).map {
+          case (e, (_, failed)) =>
+            when(failed, lit(s"cannot convert to ${e.typeFormat} for field ${e.field.name}"))
+        }): _*
+    )
+
+    // the record for the log is only assembled for the rejected rows
+    val rec = when(failReason.isNotNull,
+                   coalesce(raw(CorruptRecordCol),
+                            concat_ws(",", readFields.map(f => raw(f.name).cast(StringType)): _*)))
+
+    val outCols = schema.entries.zip(converted).map {
+      case (e, (c, _)) => c.as(e.field.name, e.field.metadata)
+    }
+    val withReason = raw.select(outCols :+ failReason.as(ReasonCol) :+ rec.as(RecCol): _*)
+
+    val size    = outCols.size
+    val parserV = parserValidator
+    val rowRdd = withReason.rdd.mapPartitions { iterator =>
+      iterator.flatMap { r =>
+        if (r.isNullAt(size)) {
+          Some(Row.fromSeq(r.toSeq.take(size)))
+        } else {
+          parserV.addWithReason(new IllegalArgumentException(r.getString(size)), r.getString(size + 1))
+          None
+        }
+      }
+    }
+    sparkSession.createDataFrame(rowRdd, StructType(withReason.schema.fields.take(size)))
+  }
+}
+
+private[smv] object SparkCsvEngine {
+  val CorruptRecordCol = "_smv_corrupt_record"
+  private val ReasonCol = "_smv_fail_reason"
+  private val RecCol    = "_smv_fail_record"
+
+  private def assertSupported(schema: SmvSchema): Unit = {
+    val Array(major, minor) = org.apache.spark.SPARK_VERSION.split("\\.").take(2).map(_.toInt)
+    if (major < 2 || (major == 2 && minor < 2))
+      throw new SmvRuntimeException(
+        s"Spark CSV engine requires Spark 2.2 or later, current version is ${org.apache.spark.SPARK_VERSION}")
+
+    val unsupported = schema.entries.filter { e =>
+      e.typeFormat match {
+        case MapTypeFormat(_, _) | ArrayTypeFormat(_) => true
+        case _                                        => false
+      }
+    }
+    if (unsupported.nonEmpty)
+      throw new SmvUnsupportedType(
+        s"Spark CSV engine does not support fields: ${unsupported.mkString(", ")}")
+  }
+
+  /** The format shared by all the entries matched by `pf`, if there is a single one */
+  private def sharedFormat(schema: SmvSchema)(pf: PartialFunction[TypeFormat, String]): Option[String] = {
+    val formats = schema.entries.map(_.typeFormat).collect(pf).distinct
+    if (formats.size == 1) Some(formats.head) else None
+  }
+
+  /**
+   * Convert a raw string column to the type of the given TypeFormat.
+   * Returns the converted column and a column which is true when a non-null value
+   * failed to convert.
+   */
+  private def convert(rawCol: Column, typeFormat: TypeFormat): (Column, Column) = {
+    def castNonEmpty(s: Column, dt: DataType) = {
+      // Catalyst casts "1.5" to the integral 1, the default parser rejects it
+      val valid = dt match {
+        case ByteType | ShortType | IntegerType | LongType => s =!= "" && s.rlike("^[+-]?\\d+$")
+        case _                                             => s =!= ""
+      }
+      val v = when(valid, s.cast(dt))
+      (v, s =!= "" && v.isNull)
+    }
+
+    typeFormat match {
+      case StringTypeFormat(_, nullValue) =>
+        val v = if (nullValue.isEmpty) rawCol else when(rawCol =!= nullValue, rawCol)
+        (v, lit(false))
+      case _: NumericTypeFormat =>
+        // same as NumericTypeFormat.trim: only blanks are trimmed
+        castNonEmpty(trim(rawCol), typeFormat.dataType)
+      case ByteTypeFormat(_) | ShortTypeFormat(_) =>
+        castNonEmpty(rawCol, typeFormat.dataType)
+      case BooleanTypeFormat(_) =>
+        val lowered = lower(rawCol)
+        val v       = when(lowered === "true", true).when(lowered === "false", false)
+        (v, rawCol =!= "" && v.isNull)
+      case TimestampTypeFormat(f) =>
+        val v = unix_timestamp(rawCol, f).cast(TimestampType)
+        (v, rawCol =!= "" && v.isNull)
+      case DateTypeFormat(f) =>
+        val v = unix_timestamp(rawCol, f).cast(TimestampType).cast(DateType)
+        (v, rawCol =!= "" && v.isNull)
+      case t =>
+        throw new SmvUnsupportedType(s"Spark CSV engine does not support type: ${t}")
+    }
+  }
+}
@@ -0,0 +1,76 @@
+/*
+ * This file is licensed under the Apache License, Version 2.0
+ * (the "License"); you may not use this file except in compliance with
+ * the License.  You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package org.tresamigos.smv
+
+import org.apache.spark.sql.{Column, DataFrame}
+import org.apache.spark.sql.catalyst.InternalRow
+import org.apache.spark.sql.catalyst.expressions.{BindReferences, InterpretedOrdering, UnsafeProjection}
+import org.apache.spark.sql.catalyst.plans.logical.Sort
+import org.apache.spark.sql.contrib.smv.toScalaRowConverter
+import org.apache.spark.sql.functions.lit
+
+/**
+ * Top N records per group, according to an ordering.
+ *
+ * Each group keeps its first N records in a `BoundedPriorityQueue`, which is filled
+ * on the map side before the shuffle, so at most N records per group and per
+ * partition are shuffled and no group is ever sorted or held in memory as a whole.
+ * Exactly min(N, group size) records are kept, ties at the N-th position are
+ * broken arbitrarily, same as `row_number` over a window.
+ *
+ * The records of a group are returned in order, so with no keys (a single group)
+ * the result is sorted.
+ */
+private[smv] object TopNRecs {
+  def apply(df: DataFrame, keys: Seq[String], maxElems: Int, orders: Seq[Column]): DataFrame = {
+    if (maxElems <= 0) return df.where(lit(false))
+
+    val output = df.queryExecution.analyzed.output
+
+    // let the analyzer resolve the orders (asc by default), then bind them to the rows
+    val sortOrders = df.orderBy(orders: _*).queryExecution.analyzed match {
+      case Sort(order, _, _) => order.map(BindReferences.bindReference(_, output))
+      case _ =>
+        throw new SmvRuntimeException(s"can not resolve ordering ${orders.mkString(", ")}")
+    }
+    val keyExprs = keys.map(k => BindReferences.bindReference(df(k).expr, output))
+    val schema   = df.schema
+    val n        = maxElems
+
+    val ordering = new InterpretedOrdering(sortOrders)
+
+    val keyed = df.queryExecution.toRdd.mapPartitions { it =>
+      val keyProj = UnsafeProjection.create(keyExprs)
+      val rowProj = UnsafeProjection.create(schema)
+      it.map { r =>
+        (keyProj(r).copy(), rowProj(r).copy())
+      }
+    }
+
+    // the bounded queue keeps the largest elements, reverse to keep the first ones
+    val zero = BoundedPriorityQueue[InternalRow](n)(ordering.reverse)
+    val top = keyed.aggregateByKey(zero)(
+      (q, r) => q += r,
+      (q1, q2) => q1 ++= q2
+    )
+
+    val rows = top.mapPartitions { it =>
+      val toRow = toScalaRowConverter(schema)
+      it.flatMap { case (_, q) => q.toSeq.sorted(ordering).map(toRow) }
+    }
+
+    df.sparkSession.createDataFrame(rows, schema)
+  }
+}
@@ -22,7 +22,7 @@ import org.apache.spark.sql.types.Metadata
 /**
  * Implement the `edd` method of DFHelper
  *
- * Provides `summary` and `histogram` methods
+ * Provides `summary`, `sketch` and `histogram` methods
  **/
 class Edd(val df: DataFrame, val keys: Seq[String] = Seq()) {
 
@@ -46,6 +46,28 @@ class Edd(val df: DataFrame, val keys: Seq[String] = Seq()) {
     EddResultFunctions(res)
   }
 
+  /**
+   * For all the columns with the name in the parameters, run a group of sketch based statistics
+   *
+   * NumericType => count, null count, approx distinct count, approx quantiles (q01 to q99)
+   * StringType, DateType, TimestampType => count, null count, approx distinct count,
+   *   20 most frequent values
+   *
+   * The results are small and can be saved (e.g. in module metadata) and compared with later
+   * runs without scanning the old data again.
+   *
+   * If the parameter list is empty, the sketches will run on all the columns.
+   * {{{
+   * scala> df.edd.sketch("v", "s").eddShow
+   * }}}
+   *
+   * @return [[org.tresamigos.smv.edd.EddResultFunctions]]
+   **/
+  def sketch(colNames: String*): EddResultFunctions = {
+    val res = (new EddSketch(df, keys)(colNames: _*)).run
+    EddResultFunctions(res)
+  }
+
   /**
    * Perform histogram calculation on a given set of `HistColumn`s
    *
@@ -15,7 +15,7 @@
 package org.tresamigos.smv
 package edd
 
-import org.apache.spark.sql.types.{LongType, DoubleType, StringType}
+import org.apache.spark.sql.types.{BooleanType, LongType, DoubleType, StringType}
 import org.apache.spark.sql.functions.{stddev=>_, _}
 import org.apache.spark.sql.Column
 
@@ -26,29 +26,24 @@ private[smv] abstract class EddTask {
   val taskType: String
   val taskName: String
   val taskDesc: String
-  val statOp: Column
-
-  def aggColName: String = col.getName + "_" + taskName
 
-  val toJUdf = udf(EddTask.toJFunc)
+  /** JSON string of the collected aggregation value **/
+  def toJSON(value: Any): String = EddTask.toJFunc(value)
 
-  /** the aggregation expression **/
-  def aggCol(): Column = statOp.as(aggColName)
-
-  private def toJSONCol(): Column = toJUdf(new Column(aggColName)).as(aggColName)
-
-  /** edd result columns **/
-  def resultCols(): Seq[Column] = Seq(
-    lit(col.getName) as "colName",
-    lit(taskType) as "taskType",
-    lit(taskName) as "taskName",
-    lit(taskDesc) as "taskDesc",
-    toJSONCol as "valueJSON"
+  /** edd result fields: colName, taskType, taskName, taskDesc, valueJSON **/
+  def resultFields(value: Any): Seq[String] = Seq(
+    col.getName,
+    taskType,
+    taskName,
+    taskDesc,
+    toJSON(value)
   )
+
+  /** edd result rows of the task, most tasks have a single one **/
+  def results(value: Any): Seq[Seq[String]] = Seq(resultFields(value))
 }
 
-/** need to be Serializable to make it udf **/
-private object EddTask extends Serializable {
+private object EddTask {
   import org.json4s.JsonDSL._
 
   /** Spark map catalyst Decimal to java.math.BigDecimal, while
@@ -70,22 +65,51 @@ private object EddTask extends Serializable {
 
 private[smv] abstract class EddStatTask extends EddTask {
   override val taskType = "stat"
+  val statOp: Column
+
+  def aggColName: String = col.getName + "_" + taskName
+
+  /** the aggregation expression **/
+  def aggCol(): Column = statOp.as(aggColName)
 }
 
+/**
+ * Histogram tasks are not aggregation expressions, the values of `histValue` are counted
+ * by a native groupBy count plan, see [[EddTaskGroup]]
+ **/
 private[smv] abstract class EddHistTask extends EddTask {
   import org.json4s.JsonDSL._
   override val taskType = "hist"
   def sortByFreq        = false
 
+  /** the values to count **/
+  val histValue: Column
+
+  /** max number of distinct values in the histogram **/
+  def maxDistinct: Int = EddHistTask.MaxDistinct
+
+  /**
+   * Key of the bucket which counts the values beyond the `maxDistinct` most frequent ones.
+   * Without it, more distinct values than `maxDistinct` is an error.
+   **/
+  def otherKey: Option[Any] = None
+
+  /** keep only the `maxDistinct` most frequent values, the others are ignored **/
+  def topOnly: Boolean = false
+
   /** both `sortByFreq` and the histogram map itself are coded in the JSON string **/
-  override val toJUdf = udf({
-    val s = sortByFreq;
-    v: Map[Any, Long] =>
-      compact(
-        ("histSortByFreq" -> s) ~
-          ("hist"         -> render(v.map { case (k, n: Long) => (EddTask.toJFunc(k), n) }))
-      )
-  })
+  override def toJSON(value: Any): String = {
+    val v = Option(value.asInstanceOf[scala.collection.Map[Any, Long]]).getOrElse(Map.empty[Any, Long])
+    compact(
+      ("histSortByFreq" -> sortByFreq) ~
+        ("hist"         -> render(v.map { case (k, n: Long) => (EddTask.toJFunc(k), n) }.toMap))
+    )
+  }
+}
+
+private[smv] object EddHistTask {
+  val MaxDistinct = 1000
+  val OtherKey    = "(other)"
 }
 
 private[smv] case class AvgTask(override val col: Column) extends EddStatTask {
@@ -154,74 +178,105 @@ private[smv] case class TimeMaxTask(col: Column) extends EddStatTask {
   override val statOp   = max(col).cast(StringType)
 }
 
-private[smv] case class StringDistinctCountTask(col: Column) extends EddStatTask {
+private[smv] case class DistinctCountTask(col: Column) extends EddStatTask {
   override val taskName  = "dct"
   override val taskDesc  = "Approx Distinct Count"
   private val relativeSD = 0.01
   override val statOp    = approx_count_distinct(col, relativeSD).cast(LongType)
 }
 
+/**
+ * Approximate quantiles from a single percentile sketch of the column.
+ * Each quantile is reported as a separate "stat" result, e.g. "q50" for the median.
+ **/
+private[smv] case class QuantilesTask(col: Column) extends EddStatTask {
+  override val taskName = "qnt"
+  override val taskDesc = "Approx Quantiles"
+  override val statOp = callUDF(
+    "percentile_approx",
+    col.cast(DoubleType),
+    array(QuantilesTask.Ranks.map { r => lit(r) }: _*),
+    lit(QuantilesTask.Accuracy))
+
+  override def results(value: Any): Seq[Seq[String]] = {
+    val qs = Option(value.asInstanceOf[Seq[Any]]).getOrElse(QuantilesTask.Ranks.map { _ => null })
+    QuantilesTask.Ranks.zip(qs).map {
+      case (r, q) =>
+        val pct = math.round(r * 100)
+        Seq(col.getName, taskType, f"q${pct}%02d", s"Approx ${pct}% Quantile", toJSON(q))
+    }
+  }
+}
+
+private[smv] object QuantilesTask {
+  val Ranks = Seq(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+  /** relative rank error of the sketch is 1.0/Accuracy */
+  val Accuracy = 1000
+}
+
 private[smv] case class AmountHistogram(col: Column) extends EddHistTask {
-  override val taskName = "amt"
-  override val taskDesc = "as Amount"
-  override val statOp   = histDouble(col.cast(DoubleType).smvAmtBin)
+  override val taskName  = "amt"
+  override val taskDesc  = "as Amount"
+  override val histValue = col.cast(DoubleType).smvAmtBin.cast(DoubleType)
 }
 
 private[smv] case class BinNumericHistogram(col: Column, bin: Double) extends EddHistTask {
-  override val taskName = "bnh"
-  override val taskDesc = s"with BIN size $bin"
-  override val statOp   = histDouble(col.cast(DoubleType).smvCoarseGrain(bin))
+  override val taskName  = "bnh"
+  override val taskDesc  = s"with BIN size $bin"
+  override val histValue = col.cast(DoubleType).smvCoarseGrain(bin).cast(DoubleType)
 }
 
 private[smv] case class NumericByKeyHistogram(col: Column) extends EddHistTask {
-  override val taskName = "nkh"
-  override val taskDesc = "Numeric sort by Key"
-  override val statOp   = histDouble(col.cast(DoubleType))
+  override val taskName  = "nkh"
+  override val taskDesc  = "Numeric sort by Key"
+  override val histValue = col.cast(DoubleType)
 }
 
 private[smv] case class NumericByFreqHistogram(col: Column) extends EddHistTask {
-  override val taskName = "nfh"
-  override val taskDesc = "Numeric sort by Frequency"
+  override val taskName   = "nfh"
+  override val taskDesc   = "Numeric sort by Frequency"
   override def sortByFreq = true
-  override val statOp   = histDouble(col.cast(DoubleType))
+  override val histValue  = col.cast(DoubleType)
 }
 
 private[smv] case class YearHistogram(col: Column) extends EddHistTask {
-  override val taskName = "yea"
-  override val taskDesc = "Year"
-  override val statOp   = histStr(format_string("%04d", col.smvYear))
+  override val taskName  = "yea"
+  override val taskDesc  = "Year"
+  override val histValue = format_string("%04d", col.smvYear)
 }
 
 private[smv] case class MonthHistogram(col: Column) extends EddHistTask {
-  override val taskName = "mon"
-  override val taskDesc = "Month"
-  override val statOp   = histStr(format_string("%02d", col.smvMonth))
+  override val taskName  = "mon"
+  override val taskDesc  = "Month"
+  override val histValue = format_string("%02d", col.smvMonth)
 }
 
 private[smv] case class DoWHistogram(col: Column) extends EddHistTask {
-  override val taskName = "dow"
-  override val taskDesc = "Day of Week"
-  override val statOp   = histStr(format_string("%1d", col.smvDayOfWeek))
+  override val taskName  = "dow"
+  override val taskDesc  = "Day of Week"
+  override val histValue = format_string("%1d", col.smvDayOfWeek)
 }
 
 private[smv] case class HourHistogram(col: Column) extends EddHistTask {
-  override val taskName = "hou"
-  override val taskDesc = "Hour"
-  override val statOp   = histStr(format_string("%02d", col.smvHour))
+  override val taskName  = "hou"
+  override val taskDesc  = "Hour"
+  override val histValue = format_string("%02d", col.smvHour)
 }
 
 private[smv] case class BooleanHistogram(col: Column) extends EddHistTask {
-  override val taskName = "boo"
-  override val taskDesc = "Boolean"
-  override val statOp   = histBoolean(col)
+  override val taskName  = "boo"
+  override val taskDesc  = "Boolean"
+  override val histValue = col.cast(BooleanType)
 }
 
 private[smv] case class StringByKeyHistogram(col: Column) extends EddHistTask {
-  override val taskName = "key"
-  override val taskDesc = "String sort by Key"
+  override val taskName  = "key"
+  override val taskDesc  = "String sort by Key"
   /* Input col type can be string, date and timestamp,
      for date and timestamp fields, cast to string to do string by key histogram */
-  override val statOp   = histStr(col.cast("string"))
+  override val histValue = col.cast(StringType)
+  override def otherKey  = Some(EddHistTask.OtherKey)
 }
 
 private[smv] case class StringByFreqHistogram(col: Column) extends EddHistTask {
@@ -230,5 +285,20 @@ private[smv] case class StringByFreqHistogram(col: Column) extends EddHistTask {
   override def sortByFreq = true
   /* Input col type can be string, date and timestamp,
      for date and timestamp fields, cast to string to do string by frequency histogram */
-  override val statOp     = histStr(col.cast("string"))
+  override val histValue  = col.cast(StringType)
+  override def otherKey   = Some(EddHistTask.OtherKey)
+}
+
+private[smv] case class FrequentItemsTask(col: Column) extends EddHistTask {
+  override val taskName    = "fqi"
+  override val taskDesc    = "Frequent Items"
+  override def sortByFreq  = true
+  /* Input col type can be string, date and timestamp, cast to string as the histograms */
+  override val histValue   = col.cast(StringType)
+  override def maxDistinct = FrequentItemsTask.MaxItems
+  override def topOnly     = true
+}
+
+private[smv] object FrequentItemsTask {
+  val MaxItems = 20
 }
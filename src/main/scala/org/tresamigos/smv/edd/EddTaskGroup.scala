@@ -15,9 +15,12 @@
 package org.tresamigos.smv
 package edd
 
-import org.apache.spark.sql.{DataFrame}
+import scala.collection.JavaConverters._
+
+import org.apache.spark.sql.{Column, DataFrame, Row}
+import org.apache.spark.sql.expressions.Window
+import org.apache.spark.sql.functions._
 import org.apache.spark.sql.types._
-import org.apache.spark.rdd.UnionRDD
 
 private[smv] abstract class EddTaskGroup {
   val df: DataFrame
@@ -26,92 +29,180 @@ private[smv] abstract class EddTaskGroup {
 
   val taskList: Seq[edd.EddTask]
 
-  def run(): DataFrame = {
-    import df.sqlContext.implicits._
-
-    /* Have to separate tasks to "old" aggregations and "new" aggregations, since
-      till 1.5.1 there are 2 types of aggregations, and they can't be mixed */
-    val aggCols: Seq[Either[EddTask, EddTask]] = taskList.map { t =>
-      t match {
-        case CntTask(_) | AvgTask(_) | MinTask(_) | MaxTask(_) | TimeMinTask(_) | TimeMaxTask(_) |
-            StringMinLenTask(_) | StringMaxLenTask(_) | StringDistinctCountTask(_) =>
-          Left(t)
-        case _ => Right(t)
-      }
-    }
+  private def hasKey = !keys.isEmpty
 
-    val aggOlds = aggCols
-      .flatMap { e =>
-        e.left.toOption
-      }
-      .map { t =>
-        t.aggCol
-      }
-    val aggNews = aggCols
-      .flatMap { e =>
-        e.right.toOption
-      }
-      .map { t =>
-        t.aggCol
-      }
-
-    val resultCols = taskList.map { t =>
-      t.resultCols
-    }
-    val hasKey = !keys.isEmpty
-
-    val res = if (!hasKey) {
-      // this DF only has 1 row
-      if (aggOlds.isEmpty) df.agg(aggNews.head, aggNews.tail: _*).coalesce(1)
-      else if (aggNews.isEmpty) df.agg(aggOlds.head, aggOlds.tail: _*).coalesce(1)
-      else
-        df.agg(aggNews.head, aggNews.tail: _*)
-          .coalesce(1)
-          .crossJoin(df.agg(aggOlds.head, aggOlds.tail: _*).coalesce(1))
-    } else {
-      // on row per group
-      val dfGd = df
-        .smvSelectPlus(smvfuncs.smvStrCat("_", keys.map { c =>
-          $"$c"
-        }: _*) as "groupKey")
-        .groupBy("groupKey")
-      if (aggOlds.isEmpty) dfGd.agg(aggNews.head, aggNews.tail: _*).coalesce(1)
-      else if (aggNews.isEmpty) dfGd.agg(aggOlds.head, aggOlds.tail: _*).coalesce(1)
-      else
-        dfGd
-          .agg(aggNews.head, aggNews.tail: _*)
-          .coalesce(1)
-          .smvJoinByKey(dfGd.agg(aggOlds.head, aggOlds.tail: _*).coalesce(1),
-                        Seq("groupKey"),
-                        SmvJoinType.Inner)
-    }
-
-    val resCached = res.cache
+  private def groupKey: Column =
+    smvfuncs.smvStrCat("_", keys.map { c =>
+      df(c)
+    }: _*) as "groupKey"
 
+  /**
+   * The stat tasks are aggregated together in a single aggregation (by group when there are
+   * keys), and the histogram tasks are counted together in a single groupBy count plan. Each
+   * is collected in one job, and the collected values are reshaped on the driver into the
+   * result rows of the tasks (and groups).
+   *
+   * The histograms which fail with more than `maxDistinct` values are checked first, with
+   * approximate distinct counts in the stat aggregation, so that a clearly failing histogram
+   * fails before it is counted.
+   **/
+  def run(): DataFrame = {
     val schemaStr = (if (hasKey) "groupKey: String;" else "") +
       "colName: String;" +
       "taskType: String;" +
       "taskName: String;" +
       "taskDesc: String;" +
       "valueJSON: String"
+    val schema = SmvSchema.fromString(schemaStr).toStructType
+
+    val values = statValues() ++ histValues()
 
-    /* since DF unionAll operation on a lot small DFs may build a large tree.
-       The schema comparison on a large tree could introduce significant overhead.
-       Here we convert each small DF to RDD first, then create UnionRDD, which
-       is a very cheap operation */
-    /* collect here before unpersist resCached */
-    val resRdds = resultCols.map { rcols =>
-      val cols     = if (hasKey) $"groupKey" +: rcols else rcols
-      val rddArray = resCached.select(cols: _*).rdd.collect
-      df.sqlContext.sparkContext.makeRDD(rddArray, 1)
+    val resRows = taskList.zipWithIndex.flatMap {
+      case (t, i) =>
+        // without keys, an empty histogram has no count row
+        val tValues = values.getOrElse(i, if (hasKey) Seq() else Seq((null, Map.empty[Any, Long])))
+        tValues.flatMap {
+          case (k, v) =>
+            t.results(v).map { fields =>
+              Row.fromSeq(if (hasKey) k +: fields else fields)
+            }
+        }
     }
-    resCached.unpersist()
 
-    val resRdd = new UnionRDD(df.sqlContext.sparkContext, resRdds)
+    df.sparkSession.createDataFrame(resRows.asJava, schema)
+  }
+
+  private def tooManyValues(t: EddHistTask) =
+    new SmvRuntimeException(
+      s"Too many values in column ${t.col.getName}, more than ${t.maxDistinct}. " +
+        "Please try `smvBinHist` for numeric column or filter column values first.")
+
+  /**
+   * (groupKey, value) pairs of the stat tasks, by task index.
+   * Fails if the estimated distinct count of a histogram without other bucket is clearly
+   * above its `maxDistinct`.
+   **/
+  private def statValues(): Map[Int, Seq[(Any, Any)]] = {
+    val tasks = taskList.zipWithIndex.collect { case (t: EddStatTask, i) => (t, i) }
+    val checks = taskList.collect {
+      case t: EddHistTask if t.otherKey.isEmpty && !t.topOnly => t
+    }
+    if (tasks.isEmpty && checks.isEmpty) Map()
+    else {
+      val checkCols = checks.map { t =>
+        approx_count_distinct(t.histValue, EddTaskGroup.CheckRsd)
+      }
+      val aggCols = tasks.map { case (t, _) => t.aggCol } ++ checkCols
+      val aggRows: Seq[Row] =
+        if (!hasKey) {
+          // this DF only has 1 row
+          df.agg(aggCols.head, aggCols.tail: _*).collect.toSeq
+        } else {
+          // one row per group, with the groupKey as the first column
+          df.groupBy(groupKey).agg(aggCols.head, aggCols.tail: _*).collect.toSeq
+        }
+
+      val offset = if (hasKey) 1 else 0
+      checks.zipWithIndex.foreach {
+        case (t, j) =>
+          val limit = t.maxDistinct * (1 + 3 * EddTaskGroup.CheckRsd)
+          if (aggRows.exists { r => r.getLong(offset + tasks.size + j) > limit }) throw tooManyValues(t)
+      }
 
-    df.sqlContext.createDataFrame(resRdd, SmvSchema.fromString(schemaStr).toStructType)
+      tasks.zipWithIndex.map {
+        case ((_, i), j) =>
+          i -> aggRows.map { r =>
+            (if (hasKey) r.get(0) else null, r.get(j + offset))
+          }
+      }.toMap
+    }
   }
 
+  /**
+   * (groupKey, histogram) pairs of the histogram tasks, by task index.
+   *
+   * Each row is exploded into one (task, value) pair per histogram task, and the pairs are
+   * counted by group, task and value with a native groupBy count. Only the `maxDistinct`
+   * most frequent values of each histogram are collected, the other values are summed
+   * into one row per histogram.
+   **/
+  private def histValues(): Map[Int, Seq[(Any, Any)]] = {
+    val tasks = taskList.zipWithIndex.collect { case (t: EddHistTask, i) => (t, i) }
+    if (tasks.isEmpty) Map()
+    else {
+      // values are counted as strings and converted back to their type on the driver
+      val valueTypes = df.select(tasks.map { case (t, _) => t.histValue }: _*).schema.map { _.dataType }
+
+      val pairs = explode(array(tasks.map {
+        case (t, i) =>
+          struct(lit(i) as "task", lit(t.maxDistinct) as "cap", t.histValue.cast(StringType) as "value")
+      }: _*)) as "p"
+
+      val keyCols = if (hasKey) Seq(col("groupKey")) else Seq()
+      val counts = df
+        .select((if (hasKey) Seq(groupKey) else Seq()) :+ pairs: _*)
+        .select(keyCols ++ Seq(col("p.task") as "task", col("p.cap") as "cap", col("p.value") as "value"): _*)
+        .groupBy(keyCols ++ Seq(col("task"), col("cap"), col("value")): _*)
+        .agg(count(lit(1)) as "n")
+
+      val byFreq  = Window.partitionBy(keyCols :+ col("task"): _*).orderBy(col("n").desc)
+      val isOther = row_number().over(byFreq) > col("cap")
+      val rows = counts
+        .withColumn("isOther", isOther)
+        .groupBy(keyCols ++ Seq(col("task"), col("isOther"), when(!col("isOther"), col("value")) as "value"): _*)
+        .agg(sum("n") as "n")
+        .collect
+
+      val offset    = if (hasKey) 1 else 0
+      val taskTypes = tasks.map { _._2 }.zip(valueTypes).toMap
+      val taskByIdx = tasks.map { case (t, i) => (i, t) }.toMap
+
+      rows
+        .groupBy { r =>
+          r.getInt(offset)
+        }
+        .map {
+          case (i, tRows) =>
+            val t = taskByIdx(i)
+            val hists = tRows.groupBy { r =>
+              if (hasKey) r.get(0) else null
+            }.toSeq.map {
+              case (k, gRows) =>
+                val (others, kept) = gRows.partition { r =>
+                  r.getBoolean(offset + 1)
+                }
+                val hist = kept.map { r =>
+                  EddTaskGroup.fromString(r.getString(offset + 2), taskTypes(i)) -> r.getLong(offset + 3)
+                }.toMap
+                val otherCount = others.map { _.getLong(offset + 3) }.sum
+                (k, if (otherCount == 0 || t.topOnly) hist else {
+                  val key = t.otherKey.getOrElse(throw tooManyValues(t))
+                  // a real value equal to the other key is counted in the bucket too
+                  hist + (key -> (hist.getOrElse(key, 0L) + otherCount))
+                })
+            }
+            i -> hists
+        }
+    }
+  }
+}
+
+private[smv] object EddTaskGroup {
+
+  /** relative standard deviation of the distinct counts which check the histogram sizes **/
+  val CheckRsd = 0.05
+
+  /** convert a histogram value, counted as a string, back to the type of the histogram **/
+  def fromString(s: String, dt: DataType): Any =
+    if (s == null) null
+    else
+      dt match {
+        case StringType  => s
+        case DoubleType  => s.toDouble
+        case LongType    => s.toLong
+        case BooleanType => s.toBoolean
+        case t           => throw new SmvUnsupportedType(s"histogram of data type: ${t} is not supported")
+      }
 }
 
 private[smv] class EddSummary(
@@ -156,7 +247,7 @@ private[smv] class EddSummary(
           NulCntTask(s),
           StringMinLenTask(s),
           StringMaxLenTask(s),
-          StringDistinctCountTask(s)
+          DistinctCountTask(s)
         )
       case ArrayType(_,_) => {
         println("Column \"" + df.schema(l).name + "\" has dataType ArrayType, no EDD will be built for it.")
@@ -167,6 +258,37 @@ private[smv] class EddSummary(
 
 }
 
+/**
+ * Sketch based summary: approximate quantiles for numeric columns, most frequent
+ * values for string, date and timestamp columns, plus counts and approximate distinct count.
+ * The results are small. The most frequent values are counted by the same native groupBy
+ * count plan as the EDD histograms.
+ **/
+private[smv] class EddSketch(
+    override val df: DataFrame,
+    override val keys: Seq[String] = Seq()
+)(colNames: String*)
+    extends EddTaskGroup {
+
+  val listSeq =
+    if (colNames.isEmpty) {
+      df.columns.diff(keys).toSeq
+    } else {
+      colNames.toSet.toSeq
+    }
+
+  override val taskList = listSeq.flatMap { l =>
+    val s = df(l)
+    df.schema(l).dataType match {
+      case _: NumericType =>
+        Seq(CntTask(s), NulCntTask(s), DistinctCountTask(s), QuantilesTask(s))
+      case StringType | DateType | TimestampType =>
+        Seq(CntTask(s), NulCntTask(s), DistinctCountTask(s), FrequentItemsTask(s))
+      case _ => Seq()
+    }
+  }
+}
+
 private[smv] class NullRate(
     override val df: DataFrame,
     override val keys: Seq[String] = Seq()
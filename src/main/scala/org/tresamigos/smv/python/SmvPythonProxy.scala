@@ -99,24 +99,39 @@ object SmvPythonHelper {
   def smvIsAnyIn(col: Column, values: Any*): Column = col.smvIsAnyIn(values: _*)
 
   //case class DiscoveredPK(pks: ArrayList[String], cnt: Long)
-  def smvDiscoverPK(df: DataFrame, n: Int): (ArrayList[String], Long) = {
-    val res = df.smvDiscoverPK(n, false)
+  def smvDiscoverPK(df: DataFrame, n: Int): (ArrayList[String], Long) =
+    smvDiscoverPK(df, n, false)
+
+  def smvDiscoverPK(df: DataFrame, n: Int, approx: Boolean): (ArrayList[String], Long) = {
+    val res = df.smvDiscoverPK(n, false, approx)
     (new ArrayList(res._1), res._2)
   }
 
-  def smvDiscoverSchemaToFile(path: String, nsamples: Int, csvattr: CsvAttributes): Unit = {
-    implicit val csvAttributes = csvattr
-    val helper                 = new SchemaDiscoveryHelper(SmvApp.app.sqlContext)
-    val schema                 = helper.discoverSchemaFromFile(path, nsamples)
-    val outpath                = SmvSchema.dataPathToSchemaPath(path) + ".toBeReviewed"
-    val outFileName            = (new File(outpath)).getName
+  def smvDiscoverSchemaToFile(path: String, nsamples: Int, csvattr: CsvAttributes): Unit =
+    smvDiscoverSchemaToFile(path, nsamples, csvattr, SchemaDiscoveryHelper.SampleHead, SchemaDiscoveryHelper.DefaultSeed)
+
+  def smvDiscoverSchemaToFile(path: String,
+                              nsamples: Int,
+                              csvattr: CsvAttributes,
+                              sampling: String,
+                              seed: Int): Unit = {
+    val schema      = discoverSchemaAsSmvSchema(path, nsamples, csvattr, sampling, seed)
+    val outpath     = SmvSchema.dataPathToSchemaPath(path) + ".toBeReviewed"
+    val outFileName = (new File(outpath)).getName
     schema.saveToLocalFile(outFileName)
     println(s"Discovered schema file saved as ${outFileName}, please review and make changes.")
   }
 
-  def discoverSchemaAsSmvSchema(path: String, nsamples: Int, csvattr: CsvAttributes): SmvSchema = {
+  def discoverSchemaAsSmvSchema(path: String, nsamples: Int, csvattr: CsvAttributes): SmvSchema =
+    discoverSchemaAsSmvSchema(path, nsamples, csvattr, SchemaDiscoveryHelper.SampleHead, SchemaDiscoveryHelper.DefaultSeed)
+
+  def discoverSchemaAsSmvSchema(path: String,
+                                nsamples: Int,
+                                csvattr: CsvAttributes,
+                                sampling: String,
+                                seed: Int): SmvSchema = {
     implicit val csvAttributes = csvattr
-    new SchemaDiscoveryHelper(SmvApp.app.sqlContext).discoverSchemaFromFile(path, nsamples)
+    new SchemaDiscoveryHelper(SmvApp.app.sqlContext).discoverSchemaFromFile(path, nsamples, sampling, seed)
   }
 
   /**
@@ -197,6 +212,9 @@ object SmvPythonHelper {
 
   def getEddJsonArray(df: DataFrame): java.util.List[String] =
     df.edd.summary().toDF.toJSON.collect().toSeq
+
+  def getEddSketchJsonArray(df: DataFrame, cols: Array[String]): java.util.List[String] =
+    df.edd.sketch(cols: _*).toDF.toJSON.collect().toSeq
 }
 
 class SmvGroupedDataAdaptor(grouped: SmvGroupedData) {
@@ -268,6 +286,28 @@ class SmvPyClient(val j_smvApp: SmvApp) {
     handler.csvFileWithSchema(csvAttr, schema, parserLogger)
   }
 
+  def readCsvFromFile(
+    fullPath: String,
+    schema: SmvSchema,
+    csvAttr: CsvAttributes,
+    parserLogger: ParserLogger,
+    minPartitions: Int,
+    maxSplitSizeMB: Int
+  ) = {
+    val handler = new FileIOHandler(j_smvApp.sparkSession, fullPath)
+    handler.csvFileWithSchema(csvAttr, schema, parserLogger, minPartitions, maxSplitSizeMB)
+  }
+
+  def readCsvFromFileWithSparkEngine(
+    fullPath: String,
+    schema: SmvSchema,
+    csvAttr: CsvAttributes,
+    parserLogger: ParserLogger
+  ) = {
+    val handler = new FileIOHandler(j_smvApp.sparkSession, fullPath)
+    handler.sparkCsvFileWithSchema(csvAttr, schema, parserLogger)
+  }
+
   /**
    * Map the data file path to schema file path,
    * and then try to read the schema from schema file.
@@ -288,23 +328,45 @@ class SmvPyClient(val j_smvApp: SmvApp) {
   def createFileIOHandler(path: String) =
     new FileIOHandler(j_smvApp.sparkSession, path)
 
-  def persistDF(path: String, dataframe: DataFrame): Unit = {
+  def persistDF(path: String, dataframe: DataFrame): Unit =
+    persistDF(path, dataframe, null)
+
+  /** Persist as SMV csv, with part files compressed by the given codec if it is not null */
+  def persistDF(path: String, dataframe: DataFrame, compression: String): Unit = {
     val counter = j_smvApp.sparkSession.sparkContext.longAccumulator
 
     val df      = dataframe.smvPipeCount(counter)
     val handler = new FileIOHandler(j_smvApp.sparkSession, path)
 
-    handler.saveAsCsvWithSchema(df, strNullValue = "_SmvStrNull_")
+    handler.saveAsCsvWithSchema(df, strNullValue = "_SmvStrNull_", compression = compression)
     j_smvApp.log.info(f"Output path: ${path}")
 
     val n       = counter.value
     j_smvApp.log.info(f"N: ${n}")
   }
 
-  private[smv] def writeThroughJDBC(df: DataFrame, url: String, driver: String, tableName: String) = {
+  private[smv] def writeThroughJDBC(df: DataFrame, url: String, driver: String, tableName: String): Unit =
+    writeThroughJDBC(df, url, driver, tableName, 0, null, 0)
+
+  /**
+   * @param batchSize rows inserted per round trip, 0 for Spark's default
+   * @param isolationLevel transaction isolation level, null for Spark's default
+   * @param numWriters max number of concurrent connections, 0 for no limit
+   */
+  private[smv] def writeThroughJDBC(df: DataFrame,
+                                    url: String,
+                                    driver: String,
+                                    tableName: String,
+                                    batchSize: Int,
+                                    isolationLevel: String,
+                                    numWriters: Int): Unit = {
     val connectionProperties = new java.util.Properties()
     connectionProperties.put("driver", driver)
-    df.write.mode(SaveMode.Append).jdbc(url, tableName, connectionProperties)
+    if (batchSize > 0) connectionProperties.put("batchsize", batchSize.toString)
+    if (isolationLevel != null) connectionProperties.put("isolationLevel", isolationLevel)
+
+    val data = if (numWriters > 0 && df.rdd.getNumPartitions > numWriters) df.coalesce(numWriters) else df
+    data.write.mode(SaveMode.Append).jdbc(url, tableName, connectionProperties)
   }
 }
 
@@ -69,29 +69,18 @@ object smvfuncs {
     udf(boolsToBitmap).apply(struct(headColumnName, tailColumnNames: _*))
   }
 
-  /** Spark 1.6 will have collect_set aggregation function.*/
+  /**
+   * Set of the distinct values of a column, including null, as a sorted array.
+   * Unlike Spark's `collect_set`, null is kept as a value (first in the array).
+   */
   def smvCollectSet(c: Column, dt: DataType): Column = {
-
     dt match {
-      case StringType => {
-        val toKeys = udf((m: Map[String, Long]) => m.keys.toSeq)
-        toKeys(histStr(c)) as s"collectSet($c)"
-      }
-
-      case IntegerType => {
-        val toKeys = udf((m: Map[Integer, Long]) => m.keys.toSeq)
-        toKeys(histInt(c)) as s"collectSet($c)"
-      }
-
-      case BooleanType => {
-        val toKeys = udf((m: Map[Boolean, Long]) => m.keys.toSeq)
-        toKeys(histBoolean(c)) as s"collectSet($c)"
-      }
-
-      case DoubleType => {
-        val toKeys = udf((m: Map[Double, Long]) => m.keys.toSeq)
-        toKeys(histDouble(c)) as s"collectSet($c)"
-      }
+      case StringType | IntegerType | BooleanType | DoubleType =>
+        // collect_set drops the nulls, add it back when there is any
+        val withNull = udf({ (s: Seq[Any], hasNull: Boolean) =>
+          if (hasNull) null +: s else s
+        }, ArrayType(dt))
+        withNull(sort_array(collect_set(c.cast(dt))), max(c.isNull)) as s"collectSet($c)"
       case _ => {
         throw new SmvUnsupportedType("collectSet unsupported type: " + dt.typeName)
       }
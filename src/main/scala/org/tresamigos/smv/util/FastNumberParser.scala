@@ -0,0 +1,106 @@
+/*
+ * This file is licensed under the Apache License, Version 2.0
+ * (the "License"); you may not use this file except in compliance with
+ * the License.  You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package org.tresamigos.smv
+package util
+
+/**
+ * Allocation-free helpers for parsing numbers in the CSV read path.
+ *
+ * The fast paths only handle "plain" numbers, `[+-]digits[.digits]` with at most
+ * 18 digits. Anything else is left to the regular JDK/Spark parsers by the callers.
+ */
+private[smv] object FastNumberParser {
+
+  /** Strip leading and trailing blanks (spaces only, tabs are kept) */
+  def trimBlanks(s: String): String = {
+    var start = 0
+    var end   = s.length
+    while (start < end && s.charAt(start) == ' ') start += 1
+    while (end > start && s.charAt(end - 1) == ' ') end -= 1
+    if (start == 0 && end == s.length) s else s.substring(start, end)
+  }
+
+  /** Max number of digits which always fit in a Long */
+  val MaxLongDigits = 18
+
+  /** Max number of digits whose value is exactly representable in a Double */
+  val MaxExactDoubleDigits = 15
+
+  val LongPow10: Array[Long]     = Array.iterate(1L, MaxLongDigits + 1)(_ * 10)
+  val DoublePow10: Array[Double] = Array.iterate(1.0, 23)(_ * 10)
+
+  /**
+   * Mutable result of parsing a plain decimal number.
+   * Not thread-safe: use one instance per converter.
+   */
+  final class PlainDecimal {
+    /** absolute value of the number without the decimal point */
+    var magnitude: Long = 0L
+    var negative        = false
+    /** number of digits after the decimal point */
+    var scale = 0
+    /** total number of digits, including leading zeros */
+    var digits = 0
+
+    def unscaled: Long = if (negative) -magnitude else magnitude
+
+    /** Parse `s`, returns false if it is not a plain number with at most 18 digits */
+    def parse(s: String): Boolean = {
+      val len = s.length
+      var i   = 0
+      negative = false
+      if (len > 0 && (s.charAt(0) == '-' || s.charAt(0) == '+')) {
+        negative = s.charAt(0) == '-'
+        i = 1
+      }
+
+      var m       = 0L
+      var nDigits = 0
+      var dotAt   = -1
+      var ok      = i < len
+      while (ok && i < len) {
+        val c = s.charAt(i)
+        if (c >= '0' && c <= '9') {
+          nDigits += 1
+          if (nDigits > MaxLongDigits) ok = false
+          else m = m * 10 + (c - '0')
+        } else if (c == '.' && dotAt < 0) {
+          dotAt = i
+        } else {
+          ok = false
+        }
+        i += 1
+      }
+
+      if (!ok || nDigits == 0) false
+      else {
+        magnitude = m
+        digits = nDigits
+        scale = if (dotAt < 0) 0 else len - dotAt - 1
+        true
+      }
+    }
+
+    /** The parsed value as a Double, when it is exactly computable, else NaN */
+    def exactDouble: Double = {
+      if (digits > MaxExactDoubleDigits || scale >= DoublePow10.length) Double.NaN
+      else {
+        // both operands are exact, so the IEEE division is correctly rounded
+        val d = magnitude.toDouble / DoublePow10(scale)
+        if (negative) -d else d
+      }
+    }
+  }
+}
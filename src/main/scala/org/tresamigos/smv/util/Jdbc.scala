@@ -16,12 +16,120 @@ package org.tresamigos.smv.jdbc
 
 import org.apache.spark.sql.types._
 import org.apache.spark.sql.jdbc._
-import java.sql.Types
+import java.sql.{Connection, DriverManager, Types}
+
+import scala.util.Try
+
+import org.tresamigos.smv.SmvRuntimeException
 
 private[smv] object JdbcDialectHelper {
   def registerDerby() = JdbcDialects.registerDialect(DerbyDialect)
 }
 
+/**
+ * Plain JDBC statements which the Spark JDBC data source does not provide.
+ */
+private[smv] object JdbcHelper {
+  private def connect(url: String, driver: String, user: String, password: String): Connection = {
+    if (driver != null) Class.forName(driver)
+    val props = new java.util.Properties()
+    if (user != null) props.put("user", user)
+    if (password != null) props.put("password", password)
+    DriverManager.getConnection(url, props)
+  }
+
+  private def withConnection[T](url: String, driver: String, user: String, password: String)(
+      f: Connection => T): T = {
+    val conn = connect(url, driver, user, password)
+    try f(conn)
+    finally conn.close()
+  }
+
+  /** Same check as Spark's JdbcUtils.tableExists: a query on the table does not fail */
+  def tableExists(url: String, driver: String, user: String, password: String, table: String): Boolean =
+    withConnection(url, driver, user, password) { conn =>
+      Try {
+        val stmt = conn.prepareStatement(s"SELECT 1 FROM ${table} WHERE 1=0")
+        try stmt.executeQuery().close()
+        finally stmt.close()
+      }.isSuccess
+    }
+
+  /**
+   * Upsert the rows of the staging table into the target table by key: in a single
+   * transaction, the target rows with a key in the staging table are deleted and all
+   * the staging rows are inserted. The staging table is dropped afterwards.
+   *
+   * Delete + insert is used instead of MERGE since MERGE is not supported (or has a
+   * different syntax) on many databases. The target table is not aliased in the DELETE,
+   * since some databases (e.g. PostgreSQL, Derby) do not support a DELETE alias.
+   *
+   * The keys are matched with `=`, which is never true for nulls, so a staging row with
+   * a null key would be inserted again on every upsert instead of replacing the target
+   * row. Such rows are rejected: the merge fails and the target table is left as is.
+   *
+   * A failure to drop the staging table is logged, so that it never hides the error
+   * of the merge itself.
+   *
+   * @return number of rows inserted
+   */
+  def mergeFromStaging(url: String,
+                       driver: String,
+                       user: String,
+                       password: String,
+                       target: String,
+                       staging: String,
+                       keys: Array[String],
+                       columns: Array[String]): Int =
+    withConnection(url, driver, user, password) { conn =>
+      val dialect = JdbcDialects.get(url)
+      def q(c: String) = dialect.quoteIdentifier(c)
+
+      val keyMatch = keys.map(k => s"s.${q(k)} = ${target}.${q(k)}").mkString(" AND ")
+      val colList  = columns.map(q).mkString(", ")
+      val nullKeySql =
+        s"SELECT 1 FROM ${staging} WHERE " + keys.map(k => s"${q(k)} IS NULL").mkString(" OR ")
+      val deleteSql =
+        s"DELETE FROM ${target} WHERE EXISTS (SELECT 1 FROM ${staging} s WHERE ${keyMatch})"
+      val insertSql = s"INSERT INTO ${target} (${colList}) SELECT ${colList} FROM ${staging}"
+
+      val autoCommit = conn.getAutoCommit
+      conn.setAutoCommit(false)
+      try {
+        val stmt = conn.createStatement()
+        val inserted =
+          try {
+            val nullKeys = stmt.executeQuery(nullKeySql)
+            try {
+              if (nullKeys.next())
+                throw new SmvRuntimeException(
+                  s"mergeFromStaging: ${staging} has rows with a null key (${keys.mkString(", ")})")
+            } finally nullKeys.close()
+            stmt.executeUpdate(deleteSql)
+            stmt.executeUpdate(insertSql)
+          } finally stmt.close()
+        conn.commit()
+        inserted
+      } catch {
+        case e: Exception =>
+          conn.rollback()
+          throw e
+      } finally {
+        try {
+          conn.setAutoCommit(autoCommit)
+          val stmt = conn.createStatement()
+          try stmt.executeUpdate(s"DROP TABLE ${staging}")
+          finally stmt.close()
+        } catch {
+          case e: Exception =>
+            org.apache.log4j.LogManager
+              .getLogger("smv")
+              .warn(s"mergeFromStaging: failed to drop staging table ${staging}", e)
+        }
+      }
+    }
+}
+
 /**
  * Tells spark how to create queries for Derby. This dialect is copied over from
  * Spark 2.1, as it is not available in 1.5. When we move to 2.1, we should
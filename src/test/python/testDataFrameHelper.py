@@ -37,13 +37,25 @@ class DfHelperTest(SmvBaseTest):
     def test_smvHashSample_with_string(self):
         df = self.createDF("k:String", "a;b;c;d;e;f;g;h;i;j;k")
         r1 = df.unionAll(df).smvHashSample('k', 0.3)
-        expect = self.createDF("k:String", "a;g;i;a;g;i")
+        expect = self.createDF("k:String", "e;g;h;k;e;g;h;k")
         self.should_be_same(expect, r1)
 
     def test_smvHashSample_with_column(self):
         df = self.createDF("k:String", "a;b;c;d;e;f;g;h;i;j;k")
         r1 = df.unionAll(df).smvHashSample(col('k'), 0.3)
-        expect = self.createDF("k:String", "a;g;i;a;g;i")
+        expect = self.createDF("k:String", "e;g;h;k;e;g;h;k")
+        self.should_be_same(expect, r1)
+
+    def test_smvHashSample_with_multiple_keys(self):
+        df = self.createDF("k:String;n:Integer", "a,0;b,1;c,2;d,3;e,4;f,5;g,6;h,7;i,8;j,9;k,10")
+        r1 = df.smvHashSample(["k", col("n")], 0.3)
+        expect = self.createDF("k:String;n:Integer", "d,3;e,4;g,6")
+        self.should_be_same(expect, r1)
+
+    def test_smvStratifiedHashSample(self):
+        df = self.createDF("k:String;s:String", "a,x;b,x;c,x;d,x;e,x;f,x;g,x;h,x;i,x;j,x;k,x;l,y;m,y;n,z")
+        r1 = df.smvStratifiedHashSample("k", "s", {"x": 0.3, "y": 1})
+        expect = self.createDF("k:String;s:String", "e,x;g,x;h,x;k,x;l,y;m,y")
         self.should_be_same(expect, r1)
 
     def test_smvDedupByKey_with_string(self):
@@ -163,6 +175,22 @@ class DfHelperTest(SmvBaseTest):
         res = self.df("stage.modules.T")
         self.should_be_same(df, res)
 
+    def test_smvExportCsv_parallel_gzip(self):
+        import gzip
+        self.mkTmpTestDir()
+        path = self.tmpTestDir() + "/export.csv.gz"
+        df = self.createDF("k:String;v:Integer", "a,1;b,2;c,3").repartition(3)
+
+        n = df.smvExportCsv(path, compression="gzip", partDir=self.tmpTestDir() + "/parts")
+        self.assertEqual(n, 3)
+        self.assertFalse(os.path.exists(self.tmpTestDir() + "/parts"))
+
+        with gzip.open(path, "rb") as f:
+            lines = f.read().decode("utf-8").splitlines()
+        self.assertEqual(lines[0], '"k","v"')
+        self.assertEqual(sorted(lines[1:]), ['"a",1', '"b",2', '"c",3'])
+        self.assertTrue(os.path.exists(self.tmpTestDir() + "/export.schema"))
+
     def test_smvJoinByKey(self):
         df1 = self.createDF(
             "a:Integer; b:Double; c:String",
@@ -238,6 +266,13 @@ class DfHelperTest(SmvBaseTest):
         dfSkewJoin = df1.smvSkewJoinByKey(df2, "inner", [4], "a")
         self.should_be_same(dfNormalJoin, dfSkewJoin)
 
+    def test_smvSkewJoinByKey_detected(self):
+        df1 = self.createDF("a:Integer;b:String", """1,foo;2,foo;3,foo;4,bar;4,bar;4,bar;4,baz""")
+        df2 = self.createDF("a:Integer;c:String", """2,foo;3,foo;4,bar;4,bar;5,baz""")
+        dfNormalJoin = df1.smvJoinByKey(df2, ["a"], "leftouter")
+        dfSkewJoin = df1.smvSkewJoinByKey(df2, "leftouter", None, "a", threshold=0.3, numBuckets=3, sampleRate=1.0)
+        self.should_be_same(dfNormalJoin, dfSkewJoin)
+
     def test_smvUnion(self):
         schema       = "a:Integer; b:Double; c:String"
         schema2      = "c:String; a:Integer; d:Double"
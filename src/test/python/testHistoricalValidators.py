@@ -0,0 +1,51 @@
+#
+# This file is licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from test_support.smvbasetest import SmvBaseTest
+from smv import SmvEddDriftValidator
+
+class SmvEddDriftValidatorTest(SmvBaseTest):
+    def test_metadata_numeric(self):
+        df = self.createDF("v:Integer", "1;2;3;4;")
+        meta = SmvEddDriftValidator("v").metadata(df)
+        self.assertEqual(meta['cnt'], 4)
+        self.assertEqual(meta['nct'], 1)
+        self.assertEqual(meta['dct'], 4)
+        self.assertEqual(sorted(k for k in meta if k.startswith('q')),
+            ['q01', 'q05', 'q25', 'q50', 'q75', 'q95', 'q99'])
+
+    def test_metadata_string(self):
+        df = self.createDF("k:String", "a;a;a;b")
+        meta = SmvEddDriftValidator("k").metadata(df)
+        self.assertEqual(meta['fqi'], {'"a"': 3, '"b"': 1})
+
+    def test_validate_quantile_shift(self):
+        v = SmvEddDriftValidator("v", 0.1)
+        hist = {'cnt': 100, 'nct': 0, 'dct': 100, 'q01': 0.0, 'q50': 50.0, 'q99': 100.0}
+        same = {'cnt': 100, 'nct': 0, 'dct': 102, 'q01': 1.0, 'q50': 52.0, 'q99': 99.0}
+        moved = {'cnt': 100, 'nct': 0, 'dct': 100, 'q01': 0.0, 'q50': 70.0, 'q99': 100.0}
+
+        self.assertIsNone(v.validateMetadata(same, []))
+        self.assertIsNone(v.validateMetadata(same, [hist]))
+        res = v.validateMetadata(moved, [hist])
+        self.assertTrue("quantiles drift = 0.2" in res)
+
+    def test_validate_frequent_items_and_null_rate(self):
+        v = SmvEddDriftValidator("k", 0.1)
+        hist = {'cnt': 10, 'nct': 0, 'dct': 2, 'fqi': {'"a"': 5, '"b"': 5}}
+        cur = {'cnt': 8, 'nct': 2, 'dct': 2, 'fqi': {'"a"': 4, '"b"': 4, 'null': 2}}
+
+        res = v.validateMetadata(cur, [hist])
+        self.assertTrue("null rate drift = 0.2" in res)
+        self.assertTrue("frequent items drift = 0.2" in res)
+        self.assertFalse("distinct count" in res)
@@ -13,6 +13,8 @@
 
 from test_support.smvbasetest import SmvBaseTest
 from smv.smvmodulerunner import SmvModuleRunner
+from smv.smviostrategy import SmvHiveIoStrategy
+from smv.error import SmvRuntimeError
 import smv.smvshell
 
 class HiveTest(SmvBaseTest):
@@ -117,3 +119,80 @@ class NewHiveTableTest(HiveTest):
         readBack = self.smvApp.sqlContext.sql("select * from WriteOutM")
         self.should_be_same(res, readBack)
 
+class HivePartitionOverwriteTest(HiveTest):
+    @classmethod
+    def smvAppInitArgs(cls):
+        return super(HivePartitionOverwriteTest, cls).smvAppInitArgs()\
+            + ['smv.conn.my_hive.class=smv.conn.SmvHiveConnectionInfo']
+
+    def _write(self, table, df, **kwargs):
+        SmvHiveIoStrategy(self.smvApp, None, table, "overwrite", **kwargs).write(df)
+
+    def _read(self, table):
+        return self.smvApp.sqlContext.sql("select * from " + table)
+
+    def test_publish_partitioned_module(self):
+        m = self.load("stage.modules.MPart")[0]
+        SmvModuleRunner([m], self.smvApp).publish_to_hive()
+        self.should_be_same(self._read("MPart"), self.df("stage.modules.MPart").select("k", "v", "p"))
+
+    def test_only_partitions_in_data_are_replaced(self):
+        self._write("HivePart1", self.createDF("p:String;v:Integer", "x,1;y,2"), partition_by=["p"])
+        self._write("HivePart1", self.createDF("p:String;v:Integer", "y,20;z,30"), partition_by=["p"])
+        self.should_be_same(
+            self._read("HivePart1"),
+            self.createDF("v:Integer;p:String", "1,x;20,y;30,z")
+        )
+
+    def test_table_recreated_on_schema_change(self):
+        self._write("HiveSchema1", self.createDF("k:String;v:Integer", "a,1"))
+        self._write("HiveSchema1", self.createDF("k:String;v:Integer", "b,2"))
+        self.should_be_same(self._read("HiveSchema1"), self.createDF("k:String;v:Integer", "b,2"))
+
+        self._write("HiveSchema1", self.createDF("k:String;w:Double", "c,3.0"))
+        self.should_be_same(self._read("HiveSchema1"), self.createDF("k:String;w:Double", "c,3.0"))
+
+    def test_atomic_swap(self):
+        self._write("HiveSwap1", self.createDF("k:String;v:Integer", "a,1"), atomic_swap=True)
+        self._write("HiveSwap1", self.createDF("k:String;v:Integer", "b,2"), atomic_swap=True)
+        self.should_be_same(self._read("HiveSwap1"), self.createDF("k:String;v:Integer", "b,2"))
+        tables = [t.lower() for t in self.smvApp.sqlContext.tableNames()]
+        self.assertNotIn("hiveswap1_smv_swap", tables)
+        self.assertNotIn("hiveswap1_smv_old", tables)
+
+    def test_atomic_swap_keeps_partitions_not_in_data(self):
+        self._write("HiveSwapPart1", self.createDF("p:String;v:Integer", "x,1;y,2"),
+            partition_by=["p"], atomic_swap=True)
+        self._write("HiveSwapPart1", self.createDF("p:String;v:Integer", "y,20;z,30"),
+            partition_by=["p"], atomic_swap=True)
+        self.should_be_same(
+            self._read("HiveSwapPart1"),
+            self.createDF("v:Integer;p:String", "1,x;20,y;30,z")
+        )
+
+    def test_atomic_swap_partitions_schema_change(self):
+        self._write("HiveSwapPart2", self.createDF("p:String;v:Integer", "x,1;y,2"),
+            partition_by=["p"], atomic_swap=True)
+        with self.assertRaises(SmvRuntimeError):
+            self._write("HiveSwapPart2", self.createDF("p:String;w:Double", "y,2.0"),
+                partition_by=["p"], atomic_swap=True)
+        # the table is left as it was
+        self.should_be_same(
+            self._read("HiveSwapPart2"),
+            self.createDF("v:Integer;p:String", "1,x;2,y")
+        )
+
+    def test_qualified_table_name(self):
+        self._write("default.HiveQual1", self.createDF("p:String;v:Integer", "x,1;y,2"), partition_by=["p"])
+        self._write("default.HiveQual1", self.createDF("p:String;v:Integer", "y,20"), partition_by=["p"])
+        self.should_be_same(
+            self._read("default.HiveQual1"),
+            self.createDF("v:Integer;p:String", "1,x;20,y")
+        )
+
+    def test_hive_output_table_partition_by(self):
+        self.df("stage.modules.NewHivePartOutput")
+        self.should_be_same(
+            self._read("WriteOutMPart"),
+            self.createDF("k:String;v:Integer;p:String", "a,1,x;b,2,y")
+        )
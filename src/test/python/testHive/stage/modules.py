@@ -41,3 +41,17 @@ class NewHiveOutput(SmvHiveOutputTable):
         return [NewHiveInput]
     def tableName(self): return "WriteOutM"
     def connectionName(self): return "my_hive"
+
+class MPart(SmvModule, SmvOutput):
+    def requiresDS(self): return []
+    def tableName(self): return "MPart"
+    def publishHivePartitionBy(self): return ["p"]
+    def run(self, i):
+        return self.smvApp.createDF("p:String;k:String;v:Integer", "x,a,1;y,b,2")
+
+class NewHivePartOutput(SmvHiveOutputTable):
+    def requiresDS(self): return [MPart]
+    def tableName(self): return "WriteOutMPart"
+    def connectionName(self): return "my_hive"
+    def writeMode(self): return "overwrite"
+    def partitionBy(self): return ["p"]
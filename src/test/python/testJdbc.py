@@ -13,6 +13,8 @@
 
 from test_support.smvbasetest import SmvBaseTest
 from pyspark.sql import DataFrame
+from py4j.protocol import Py4JJavaError
+from smv.utils import smv_copy_array
 from smv.smvmodulerunner import SmvModuleRunner
 
 
@@ -55,3 +57,76 @@ class NewJdbcTest(SmvBaseTest):
             .option("dbtable", "MyJdbcTable")\
             .load()
         self.should_be_same(res, df)
+
+    def _create_num_table(self):
+        df = self.createDF("K:String;V:Integer", "a,1;b,2;c,3;d,4;e,5;f,6")
+        df.write.jdbc(self.url(), "MyJdbcNumTable", mode="overwrite",
+            properties={"driver": "org.apache.derby.jdbc.EmbeddedDriver"})
+        return df
+
+    def test_SmvJdbcInputTable_partitionColumn(self):
+        df = self._create_num_table()
+        res = self.df("stage.modules.NewJdbcPartitionedTable")
+        self.assertEqual(res.rdd.getNumPartitions(), 3)
+        self.should_be_same(res, df)
+
+    def test_SmvJdbcInputTable_predicates(self):
+        df = self._create_num_table()
+        res = self.df("stage.modules.NewJdbcPredicatesTable")
+        self.assertEqual(res.rdd.getNumPartitions(), 2)
+        self.should_be_same(res, df)
+
+    def test_SmvJdbcInputTable_userQuery(self):
+        self._create_num_table()
+        res = self.df("stage.modules.NewJdbcQueryTable")
+        self.should_be_same(res, self.createDF("K:String", "e;f"))
+
+    def _read_table(self, table):
+        return self.smvApp.sqlContext.read\
+            .format("jdbc")\
+            .option("url", self.url())\
+            .option("dbtable", table)\
+            .load()
+
+    def test_SmvJdbcOutputTable_upsert(self):
+        old = self.createDF("ID:Integer;V:Integer", "1,1;2,2")
+        old.write.jdbc(self.url(), "MyJdbcUpsertTable", mode="overwrite",
+            properties={"driver": "org.apache.derby.jdbc.EmbeddedDriver"})
+
+        self.df("stage.modules.NewJdbcUpsertTable")
+        res = self._read_table("MyJdbcUpsertTable")
+        self.should_be_same(res, self.createDF("ID:Integer;V:Integer", "1,1;2,20;3,30;4,40"))
+
+        # the staging table is dropped
+        staging = self._read_table("SYS.SYSTABLES")\
+            .where("TABLENAME LIKE 'MYJDBCUPSERTTABLE_SMV_STAGE%'")
+        self.assertEqual(staging.count(), 0)
+
+    def test_SmvJdbcOutputTable_upsert_rejects_null_keys(self):
+        old = self.createDF("ID:Integer;V:Integer", "1,1;2,2")
+        old.write.jdbc(self.url(), "MyJdbcNullKeyTable", mode="overwrite",
+            properties={"driver": self.driver()})
+        stage = self.createDF("ID:Integer;V:Integer", "2,20;,30")
+        stage.write.jdbc(self.url(), "MyJdbcNullKeyTable_stage", mode="overwrite",
+            properties={"driver": self.driver()})
+
+        sc = self.smvApp.sc
+        jdbc_helper = self.smvApp._jvm.org.tresamigos.smv.jdbc.JdbcHelper
+        with self.assertRaises(Py4JJavaError):
+            jdbc_helper.mergeFromStaging(
+                self.url(), self.driver(), None, None,
+                "MyJdbcNullKeyTable", "MyJdbcNullKeyTable_stage",
+                smv_copy_array(sc, "ID"), smv_copy_array(sc, "ID", "V"))
+
+        # the table is unchanged, and the staging table dropped
+        self.should_be_same(self._read_table("MyJdbcNullKeyTable"), old)
+        self.assertFalse(jdbc_helper.tableExists(
+            self.url(), self.driver(), None, None, "MyJdbcNullKeyTable_stage"))
+
+    def test_SmvJdbcOutputTable_truncate(self):
+        old = self.createDF("ID:Integer;V:Integer", "1,1")
+        old.write.jdbc(self.url(), "MyJdbcTruncateTable", mode="overwrite",
+            properties={"driver": "org.apache.derby.jdbc.EmbeddedDriver"})
+
+        df = self.df("stage.modules.NewJdbcTruncateTable")
+        self.should_be_same(self._read_table("MyJdbcTruncateTable"), df)
@@ -41,3 +41,84 @@ class NewJdbcOutputTable(SmvJdbcOutputTable):
 
     def connectionName(self):
         return "myjdbc_conn"
+
+class NewJdbcPartitionedTable(SmvJdbcInputTable):
+    def tableName(self):
+        return "MyJdbcNumTable"
+
+    def connectionName(self):
+        return "myjdbc_conn"
+
+    def partitionColumn(self):
+        return "V"
+
+    def numPartitions(self):
+        return 3
+
+class NewJdbcPredicatesTable(SmvJdbcInputTable):
+    def tableName(self):
+        return "MyJdbcNumTable"
+
+    def connectionName(self):
+        return "myjdbc_conn"
+
+    def predicates(self):
+        return ["V < 3", "V >= 3"]
+
+class NewJdbcQueryTable(SmvJdbcInputTable):
+    def tableName(self):
+        return "MyJdbcNumTable"
+
+    def connectionName(self):
+        return "myjdbc_conn"
+
+    def userQuery(self):
+        return "SELECT K FROM MyJdbcNumTable WHERE V > 4"
+
+    def fetchSize(self):
+        return 2
+
+class MyJdbcUpdates(SmvModule):
+    def requiresDS(self):
+        return []
+
+    def run(self, i):
+        return self.smvApp.createDF("ID:Integer;V:Integer", "2,20;3,30;4,40")
+
+class NewJdbcUpsertTable(SmvJdbcOutputTable):
+    def requiresDS(self):
+        return [MyJdbcUpdates]
+
+    def tableName(self):
+        return "MyJdbcUpsertTable"
+
+    def connectionName(self):
+        return "myjdbc_conn"
+
+    def upsertKeys(self):
+        return ["ID"]
+
+    def batchSize(self):
+        return 2
+
+    def numWriters(self):
+        return 1
+
+class NewJdbcTruncateTable(SmvJdbcOutputTable):
+    def requiresDS(self):
+        return [MyJdbcUpdates]
+
+    def tableName(self):
+        return "MyJdbcTruncateTable"
+
+    def connectionName(self):
+        return "myjdbc_conn"
+
+    def writeMode(self):
+        return "overwrite"
+
+    def truncate(self):
+        return True
+
+    def isolationLevel(self):
+        return "READ_COMMITTED"
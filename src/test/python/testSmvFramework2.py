@@ -148,6 +148,29 @@ class SmvFrameworkTest2(SmvBaseTest):
         self.assertTrue(os.path.exists(meta_path))
         self.assertTrue(os.path.exists(hist_path))
 
+    def test_publish_copies_persisted_csv(self):
+        self.smvApp.setDynamicRunConfig({"smv.sparkdf.defaultPersistFormat": "smvcsv_on_hdfs"})
+        fqn = "stage.modules.M2"
+        pub_dir = self.tmpTestDir() + "/publish"
+
+        m = self.load(fqn)[0]
+        df = self.df(fqn)
+        SmvModuleRunner([m], self.smvApp).publish(pub_dir)
+
+        csv_path = '{}/{}.csv'.format(pub_dir, m.fqn())
+        persisted_path = m.persistStrategy()._file_path
+        parts = [f for f in os.listdir(persisted_path) if f.startswith("part-")]
+        self.assertTrue(len(parts) > 0)
+        for f in parts:
+            # published by hard linking the persisted files
+            self.assertTrue(os.path.samefile(
+                os.path.join(persisted_path, f), os.path.join(csv_path, f)))
+        self.assertTrue(os.path.exists('{}/{}.schema'.format(pub_dir, m.fqn())))
+
+        from smv.smviostrategy import SmvCsvPersistenceStrategy
+        published = SmvCsvPersistenceStrategy(self.smvApp, None, None, csv_path).read()
+        self.should_be_same(published, df)
+
 
     def test_quick_run(self):
         fqn1 = "stage.modules.M1"
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# This file is licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from test_support.smvbasetest import SmvBaseTest
+from smv.smvfsbackend import SmvFsBackend, SmvLocalFsBackend
+from smv.smvlock import SmvLock
+
+class SmvFsBackendTest(SmvBaseTest):
+    def setUp(self):
+        super(SmvFsBackendTest, self).setUp()
+        self.mkTmpTestDir()
+        self.fs = SmvFsBackend(self.smvApp._jvm)
+
+    def test_local_paths_use_local_backend(self):
+        p = os.path.abspath(self.tmpTestDir())
+        self.assertIsInstance(self.fs._backend(p), SmvLocalFsBackend)
+        self.assertIsInstance(self.fs._backend("file://" + p), SmvLocalFsBackend)
+        self.assertNotIsInstance(self.fs._backend("hdfs://nn:8020/a/b"), SmvLocalFsBackend)
+
+    def test_write_read_roundtrip(self):
+        p = self.tmpTestDir() + "/sub/a.meta"
+        self.fs.writeToFile(u'{"a": "é"}', p)
+        self.assertTrue(self.fs.exists(p))
+        self.assertEqual(self.fs.readFromFile(p), u'{"a": "é"}')
+
+        # readable through the JVM as well
+        self.assertEqual(self.smvApp._jvm.SmvHDFS.readFromFile(p), u'{"a": "é"}')
+
+    def test_overwrite_file_written_by_jvm(self):
+        p = self.tmpTestDir() + "/b.hist"
+        self.smvApp._jvm.SmvHDFS.writeToFile("old", p)
+        self.fs.writeToFile("new", p)
+        self.assertEqual(self.smvApp._jvm.SmvHDFS.readFromFile(p), "new")
+        self.assertTrue(self.fs.deleteFile(p))
+        self.assertFalse(self.fs.exists(p))
+        self.assertFalse(self.fs.deleteFile(p))
+
+    def test_create_file_atomic(self):
+        p = self.tmpTestDir() + "/c.semaphore"
+        self.fs.createFileAtomic(p)
+        self.assertTrue(os.path.exists(p))
+        with self.assertRaises(Exception):
+            self.fs.createFileAtomic(p)
+
+    def test_lock_unlock(self):
+        p = self.tmpTestDir() + "/d.lock"
+        with SmvLock(self.smvApp._jvm, p):
+            self.assertTrue(os.path.exists(p))
+        self.assertFalse(os.path.exists(p))
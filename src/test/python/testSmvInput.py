@@ -13,6 +13,7 @@
 
 import unittest
 import json
+import os
 
 from test_support.smvbasetest import SmvBaseTest
 from smv import *
@@ -197,6 +198,48 @@ id:integer"""
                 Go get one now they are going fast,Ford,E350,1997""")
         self.should_be_same(expect, df)
 
+    def test_SmvXmvFile_inferred_schema_is_cached(self):
+        import glob
+        from pyspark.sql.types import StructType, StructField, StringType
+
+        fqn = "stage.modules.Xml1"
+        pattern = "{}/{}_*.xmlschema.json".format(self.smvApp.outputDir(), fqn)
+        for f in glob.glob(pattern):
+            os.remove(f)
+
+        self._create_xml_file('xmltest/f1.xml')
+        self.df(fqn, forceRun=True)
+
+        cached = glob.glob(pattern)
+        self.assertEqual(len(cached), 1)
+
+        # a later run reads the cached schema instead of inferring it
+        schema = StructType([StructField(n, StringType(), True) for n in ["comment", "make", "model", "year"]])
+        with open(cached[0], "w") as f:
+            f.write(schema.json())
+        df = self.df(fqn, forceRun=True)
+        self.assertEqual(df.schema["year"].dataType, StringType())
+
+    def test_SmvXmvFile_stale_schema_caches_are_removed(self):
+        import glob
+
+        fqn = "stage.modules.Xml1"
+        pattern = "{}/{}_*.xmlschema.json".format(self.smvApp.outputDir(), fqn)
+        for f in glob.glob(pattern):
+            os.remove(f)
+
+        self._create_xml_file('xmltest/f1.xml')
+        self.df(fqn, forceRun=True)
+        old = glob.glob(pattern)
+
+        # a rewritten input infers a new schema, which replaces the old cache
+        self.createTempInputFile('xmltest/f1.xml',
+            '<?xml version="1.0"?><ROWSET><ROW><make>Tesla</make></ROW></ROWSET>')
+        self.df(fqn, forceRun=True)
+        cached = glob.glob(pattern)
+        self.assertEqual(len(cached), 1)
+        self.assertNotEqual(cached, old)
+
     def test_SmvXmvFile_given_schema(self):
         fqn = "stage.modules.Xml2"
         self._create_xml_file('xmltest/f1.xml')
@@ -294,3 +337,49 @@ id:integer"""
         res = self.df("stage.modules.NewMultiCsvFiles1")
         exp = self.createDF("col1:String", "a;b")
         self.should_be_same(res, exp)
+
+    def test_multi_csv_glob_combined(self):
+        self.createTempInputFile("multi_csv_glob/f1.csv", "col1\na\nc\n")
+        self.createTempInputFile("multi_csv_glob/f2.csv", "col1\nb\n")
+        self.createTempInputFile("multi_csv_glob/f3.txt", "col1\nx\n")
+        self.createTempInputFile("multi_csv_glob.schema", "col1: String\n")
+
+        res = self.df("stage.modules.NewMultiCsvFiles2")
+        exp = self.createDF("col1:String", "a;c;b")
+        self.should_be_same(res, exp)
+        # both small files are combined into a single partition
+        self.assertEqual(res.rdd.getNumPartitions(), 1)
+
+    def test_parquet_input_with_pushdown(self):
+        df = self.createDF("k:String;p:Integer;v:Double", "a,1,1.0;b,1,2.0;c,2,3.0")
+        df.write.partitionBy("p").mode("overwrite").parquet(self.tmpInputDir() + "/parquet_in")
+
+        res = self.df("stage.modules.NewParquetFile1")
+        exp = self.createDF("k:String;v:Double", "a,1.0;b,2.0")
+        self.should_be_same(res, exp)
+
+    def test_orc_input_with_partition_filter(self):
+        df = self.createDF("k:String;p:Integer;v:Double", "a,1,1.0;b,1,2.0;c,2,3.0")
+        df.write.partitionBy("p").mode("overwrite").orc(self.tmpInputDir() + "/orc_in")
+
+        res = self.df("stage.modules.NewOrcFile1")
+        exp = self.createDF("k:String;v:Double", "b,2.0")
+        self.should_be_same(res, exp)
+
+        # the filter on the partition column prunes the directories
+        plan = res._jdf.queryExecution().executedPlan().toString()
+        self.assertNotIn("PartitionFilters: []", plan)
+
+    def test_multi_csv_hash_follows_files(self):
+        self.createTempInputFile("multi_csv_fp/f1.csv", "col1\na\n")
+        m = self.load("stage.modules.NewMultiCsvFiles3")[0]
+        h = m.instanceValHash()
+
+        # same files, same hash in a new transaction
+        self.assertEqual(self.load("stage.modules.NewMultiCsvFiles3")[0].instanceValHash(), h)
+
+        # a new file changes the hash of a new transaction, the listing is cached
+        # within a transaction
+        self.createTempInputFile("multi_csv_fp/f2.csv", "col1\nb\n")
+        self.assertEqual(m.instanceValHash(), h)
+        self.assertNotEqual(self.load("stage.modules.NewMultiCsvFiles3")[0].instanceValHash(), h)
@@ -14,7 +14,7 @@
 from smv import *
 from smv.dqm import *
 from smv.functions import smvStrCat
-from smv.iomod import SmvCsvInputFile, SmvMultiCsvInputFiles, SmvXmlInputFile
+from smv.iomod import SmvCsvInputFile, SmvMultiCsvInputFiles, SmvXmlInputFile, SmvParquetInputFile, SmvOrcInputFile
 
 import pyspark.sql.functions as F
 
@@ -178,3 +178,49 @@ class NewMultiCsvFiles1(SmvMultiCsvInputFiles):
 
     def dirName(self):
         return "multi_csv"
+
+class NewMultiCsvFiles2(SmvMultiCsvInputFiles):
+    def connectionName(self):
+        return "my_hdfs"
+
+    def dirName(self):
+        return "multi_csv_glob/*.csv"
+
+    def schemaFileName(self):
+        return "multi_csv_glob.schema"
+
+    def maxSplitSizeMB(self):
+        return 64
+
+class NewMultiCsvFiles3(SmvMultiCsvInputFiles):
+    def connectionName(self):
+        return "my_hdfs"
+
+    def dirName(self):
+        return "multi_csv_fp"
+
+class NewParquetFile1(SmvParquetInputFile):
+    def connectionName(self):
+        return "my_hdfs"
+
+    def fileName(self):
+        return "parquet_in"
+
+    def requiredColumns(self):
+        return ["k", "v"]
+
+    def partitionFilter(self):
+        return "p = 1"
+
+class NewOrcFile1(SmvOrcInputFile):
+    def connectionName(self):
+        return "my_hdfs"
+
+    def fileName(self):
+        return "orc_in"
+
+    def requiredColumns(self):
+        return ["k", "v"]
+
+    def partitionFilter(self):
+        return "p = 1 and v > 1.0"
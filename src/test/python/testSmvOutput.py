@@ -33,4 +33,26 @@ class SmvOutputTest(SmvBaseTest):
 
         read_back = openCsv(self.tmpDataDir() + "/csv_out_test.csv")
 
-        self.should_be_same(res, read_back)
\ No newline at end of file
+        self.should_be_same(res, read_back)
+
+    def _data_files(self, path):
+        return [f for (_, _, files) in os.walk(path) for f in files
+            if not (f.startswith(".") or f.startswith("_"))]
+
+    def test_csv_out_num_files(self):
+        res = self.df("stage.modules.CsvOutSingle")
+        path = self.tmpDataDir() + "/csv_out_single.csv"
+        self.assertEqual(len(self._data_files(path)), 1)
+        self.should_be_same(res, openCsv(path))
+
+    def test_parquet_out_compacted(self):
+        res = self.df("stage.modules.ParquetOut")
+        path = self.tmpDataDir() + "/parquet_out"
+
+        # one small file per partition directory, instead of one per task
+        self.assertEqual(sorted(d for d in os.listdir(path) if d.startswith("p=")), ["p=1", "p=2"])
+        self.assertEqual(len(self._data_files(path)), 2)
+        self.assertFalse(os.path.exists(path + ".smv_tmp"))
+
+        read_back = self.smvApp.sqlContext.read.parquet(path).select("k", "p")
+        self.should_be_same(res, read_back)
@@ -12,7 +12,7 @@
 # limitations under the License.
 
 from smv import *
-from smv.iomod import SmvCsvOutputFile
+from smv.iomod import SmvCsvOutputFile, SmvParquetOutputFile
 
 class MyData(SmvModule):
     def requiresDS(self):
@@ -29,4 +29,43 @@ class CsvOut(SmvCsvOutputFile):
         return "csv_out_test.csv"
 
     def requiresDS(self):
-        return [MyData]
\ No newline at end of file
+        return [MyData]
+
+class MyData4(SmvModule):
+    def requiresDS(self):
+        return []
+
+    def run(self, i):
+        return self.smvApp.createDF("k:String;p:Integer", "a,1;b,1;c,2;d,2").repartition(4)
+
+class CsvOutSingle(SmvCsvOutputFile):
+    def connectionName(self):
+        return "my_out_conn"
+
+    def fileName(self):
+        return "csv_out_single.csv"
+
+    def requiresDS(self):
+        return [MyData4]
+
+    def numOutputFiles(self):
+        return 1
+
+class ParquetOut(SmvParquetOutputFile):
+    def connectionName(self):
+        return "my_out_conn"
+
+    def fileName(self):
+        return "parquet_out"
+
+    def requiresDS(self):
+        return [MyData4]
+
+    def writeMode(self):
+        return "overwrite"
+
+    def partitionBy(self):
+        return ["p"]
+
+    def targetFileSizeMB(self):
+        return 64
@@ -35,6 +35,13 @@ class AggFuncsTest extends SmvTestUtil {
     assert(hist === Map("231" -> 1l, "123" -> 2l))
   }
 
+  test("test Histogram with too many values") {
+    val ssc = sqlContext; import ssc.implicits._
+    val df  = sqlContext.range(1001).toDF("id").repartition(4)
+    val e   = intercept[Exception] { df.agg(histInt('id)).collect }
+    assert(e.getMessage contains "Too many values")
+  }
+
   test("test MostFrequentValue 1") {
     val ssc = sqlContext
     import ssc.implicits._
@@ -134,4 +134,48 @@ class CsvTest extends SmvTestUtil {
 
   }
 
+  test("Test writing and reading compressed CSV file") {
+    val df      = dfFrom("f1:String;f2:Integer", "x,1;y,2;z,").repartition(2)
+    val csvPath = testcaseTempDir + "/test_gzip.csv"
+
+    new FileIOHandler(sparkSession, csvPath)
+      .saveAsCsvWithSchema(df, compression = "gzip")
+
+    // part files carry the codec extension and the schema records the codec
+    val parts = SmvHDFS.dirList(csvPath).filter(_.startsWith("part-"))
+    assert(parts.nonEmpty && parts.forall(_.endsWith(".gz")))
+    val schema = SmvSchema.fromFile(sc, SmvSchema.dataPathToSchemaPath(csvPath))
+    assert(schema.compression === Some("gzip"))
+
+    assertDataFramesEqual(open(csvPath), df)
+  }
+
+  test("Test writing and reading multi-part CSV file with header") {
+    val df      = dfFrom("f1:String;f2:Integer", "x,1;y,2;z,3;w,4").repartition(3)
+    val csvPath = testcaseTempDir + "/test_multi_part.csv"
+    df.saveAsCsvWithSchema(csvPath, CsvAttributes.defaultCsvWithHeader)
+
+    // the header is only in the first part file, the first lines of the others are data
+    assert(SmvHDFS.dirList(csvPath).count(_.startsWith("part-")) > 2)
+    assertDataFramesEqual(open(csvPath, CsvAttributes.defaultCsvWithHeader), df)
+  }
+
+  test("Test reading CSV files each with a header") {
+    val dir = testcaseTempDir + "/test_file_headers"
+    SmvHDFS.writeToFile("f1,f2\nx,1\ny,2\n", dir + "/f1.csv")
+    SmvHDFS.writeToFile("f1,f2\nz,3\n", dir + "/f2.csv")
+
+    val res = new FileIOHandler(sparkSession, dir).csvFileWithSchema(
+      CsvAttributes.defaultCsvWithHeader,
+      SmvSchema.fromString("f1:String;f2:Integer"),
+      dqm.TerminateParserLogger)
+    assertSrddDataEqual(res, "x,1;y,2;z,3")
+  }
+
+  test("Test unknown compression codec") {
+    intercept[SmvRuntimeException] {
+      FileIOHandler.compressionCodec("no-such-codec", sc.hadoopConfiguration)
+    }
+  }
+
 }
@@ -115,6 +115,13 @@ class EddTaskTest extends SmvTestUtil {
     dfDate = dfFrom("d:Date[yyyyMMdd]", "19010701;20150402;20130930;20151204")
   }
 
+  /** run a single task through an EddTaskGroup */
+  private def taskResult(data: DataFrame, task: edd.EddTask): DataFrame =
+    new edd.EddTaskGroup {
+      override val df       = data
+      override val taskList = Seq(task)
+    }.run()
+
   private def histJson(s: String) = {
     val extract = """.*(\{"hist.*\})""".r
     val histStr = s match { case extract(hist) => hist }
@@ -124,70 +131,70 @@ class EddTaskTest extends SmvTestUtil {
   test("test EddTask AvgTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.AvgTask($"v")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "v,stat,avg,Average,1.025")
   }
 
   test("test EddTask StdDevTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.StdDevTask($"v")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "v,stat,std,Standard Deviation,0.9535023160258536")
   }
 
   test("test EddTask CntTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.CntTask($"v")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "v,stat,cnt,Non-Null Count,4")
   }
 
   test("test EddTask MinTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.MinTask($"v")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "v,stat,min,Min,0.2")
   }
 
   test("test EddTask MaxTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.MaxTask($"v")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "v,stat,max,Max,2.2")
   }
 
   test("test EddTask StringMinLenTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.StringMinLenTask($"p")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "p,stat,mil,Min Length,1")
   }
 
   test("test EddTask StringMaxLenTask") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.StringMaxLenTask($"p")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "p,stat,mal,Max Length,1")
   }
 
-  test("test EddTask StringDistinctCountTask") {
+  test("test EddTask DistinctCountTask") {
     val ssc = sqlContext; import ssc.implicits._
-    val std = edd.StringDistinctCountTask($"p")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val std = edd.DistinctCountTask($"p")
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, "p,stat,dct,Approx Distinct Count,2")
   }
 
   test("test EddTask AmountHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.AmountHistogram($"v")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     assertSrddDataEqual(res, """v,hist,amt,as Amount,{"histSortByFreq":false,"hist":{"0.01":4}}""")
   }
 
   test("test EddTask BinNumericHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.BinNumericHistogram($"v", 0.5)
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
 
     val rep = res.toDF.collect
       .map { r =>
@@ -206,7 +213,7 @@ key                      count      Pct    cumCount   cumPct
   test("test EddTask YearHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.YearHistogram($"d")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
 
     val rep = res.toDF.collect
       .map { r =>
@@ -221,7 +228,7 @@ key                      count      Pct    cumCount   cumPct
 2015                         2   50.00%           4  100.00%
 -------------------------------------------------""")
 
-    val res2 = dfDate.agg(std.aggCol).select(std.resultCols: _*)
+    val res2 = taskResult(dfDate, std)
 
     val rep2 = res2.toDF.collect
       .map { r =>
@@ -241,7 +248,7 @@ key                      count      Pct    cumCount   cumPct
   test("test EddTask MonthHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.MonthHistogram($"d")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
 
     val rep = res.toDF.collect
       .map { r =>
@@ -257,7 +264,7 @@ key                      count      Pct    cumCount   cumPct
 12                           1   25.00%           4  100.00%
 -------------------------------------------------""")
 
-    val res2 = dfDate.agg(std.aggCol).select(std.resultCols: _*)
+    val res2 = taskResult(dfDate, std)
 
     val rep2 = res2.toDF.collect
       .map { r =>
@@ -277,7 +284,7 @@ key                      count      Pct    cumCount   cumPct
   test("test EddTask DoWHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.DoWHistogram($"d")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     val rep = res.toDF.collect
       .map { r =>
         EddResult(r)
@@ -291,7 +298,7 @@ key                      count      Pct    cumCount   cumPct
 5                            1   25.00%           4  100.00%
 -------------------------------------------------""")
 
-    val res2 = dfDate.agg(std.aggCol).select(std.resultCols: _*)
+    val res2 = taskResult(dfDate, std)
     val rep2 = res2.toDF.collect
       .map { r =>
         EddResult(r)
@@ -310,7 +317,7 @@ key                      count      Pct    cumCount   cumPct
   test("test EddTask HourHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.HourHistogram($"d")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     val rep = res.toDF.collect
       .map { r =>
         EddResult(r)
@@ -326,7 +333,7 @@ key                      count      Pct    cumCount   cumPct
   test("test EddTask BooleanHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.BooleanHistogram($"b")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     val rep = res.toDF.collect
       .map { r =>
         EddResult(r)
@@ -344,7 +351,7 @@ true                         2   50.00%           4  100.00%
   test("test EddTask StringByKeyHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.StringByKeyHistogram($"k")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     val rep = res.toDF.collect
       .map { r =>
         EddResult(r)
@@ -361,7 +368,7 @@ z                            3   75.00%           4  100.00%
   test("test EddTask StringByFreqHistogram") {
     val ssc = sqlContext; import ssc.implicits._
     val std = edd.StringByFreqHistogram($"k")
-    val res = df.agg(std.aggCol).select(std.resultCols: _*)
+    val res = taskResult(df, std)
     val rep = res.toDF.collect
       .map { r =>
         EddResult(r)
@@ -375,6 +382,43 @@ a                            1   25.00%           4  100.00%
 -------------------------------------------------""")
   }
 
+  test("test EddTask QuantilesTask") {
+    val data = sqlContext.range(1, 101).toDF("v")
+    val res  = taskResult(data, edd.QuantilesTask(data("v"))).collect
+
+    assert(res.map { _.getString(2) }.toSeq === Seq("q01", "q05", "q25", "q50", "q75", "q95", "q99"))
+    assert(res(3).getString(3) === "Approx 50% Quantile")
+    edd.QuantilesTask.Ranks.zip(res).foreach {
+      case (r, row) => assert(math.abs(row.getString(4).toDouble - r * 100) <= 2.0)
+    }
+  }
+
+  test("test EddTask FrequentItemsTask") {
+    val ssc = sqlContext; import ssc.implicits._
+    val std = edd.FrequentItemsTask($"k")
+    val res = taskResult(df, std)
+    val rep = res.toDF.collect
+      .map { r =>
+        EddResult(r)
+      }
+      .head
+      .toReport()
+    assert(rep === """Histogram of k: Frequent Items
+key                      count      Pct    cumCount   cumPct
+z                            3   75.00%           3   75.00%
+a                            1   25.00%           4  100.00%
+-------------------------------------------------""")
+  }
+
+  test("test EddSketch") {
+    val res = df.select("k", "t").edd.sketch()
+    val rows = res.toDF.collect.map { r => (r.getString(0), r.getString(2), r.getString(4)) }
+
+    assert(rows.filter(_._1 == "k").map(_._2).toSeq === Seq("cnt", "nct", "dct", "fqi"))
+    assert(rows.filter(_._1 == "t").map(_._2).toSeq ===
+      Seq("cnt", "nct", "dct", "q01", "q05", "q25", "q50", "q75", "q95", "q99"))
+  }
+
   test("test EddSummary") {
     val res = df.edd.summary()
 
@@ -433,6 +477,67 @@ true                         2   50.00%           4  100.00%
 -------------------------------------------------""")
   }
 
+  /** number of Spark jobs started by `body` */
+  private def countJobs(body: => Unit): Int = {
+    import org.apache.spark.scheduler.{SparkListener, SparkListenerJobStart}
+    val sc = sparkSession.sparkContext
+    val groups = scala.collection.mutable.ArrayBuffer[String]()
+    val listener = new SparkListener {
+      override def onJobStart(jobStart: SparkListenerJobStart): Unit = groups.synchronized {
+        groups += jobStart.properties.getProperty("spark.jobGroup.id")
+      }
+    }
+
+    // listeners can not be removed before Spark 2.2, the jobs are told apart by their group
+    sc.addSparkListener(listener)
+    try {
+      sc.setJobGroup("countJobs", "counted")
+      body
+      // events are delivered in order, so once the marker job is seen all the counted ones are too
+      sc.setJobGroup("countJobsMarker", "marker")
+      sc.parallelize(Seq(1)).count
+      val deadline = System.currentTimeMillis + 10000
+      while (!groups.synchronized(groups.contains("countJobsMarker")) && System.currentTimeMillis < deadline)
+        Thread.sleep(10)
+      groups.synchronized(groups.count(_ == "countJobs"))
+    } finally {
+      sc.clearJobGroup()
+    }
+  }
+
+  test("test EddSummary runs one job for the stats and one for the histograms") {
+    assert(countJobs { df.select("k", "t", "v").edd.summary().toDF.collect } === 1)
+    assert(countJobs { df.select("k", "t", "v").smvGroupBy("k").edd.summary().toDF.collect } === 1)
+    assert(countJobs { df.edd.summary().toDF.collect } === 2)
+    assert(countJobs { df.smvGroupBy("k").edd.summary().toDF.collect } === 2)
+  }
+
+  test("test EddHistogram other bucket") {
+    // 1100 distinct values, "0" to "99" appear twice
+    val data = sqlContext.range(1200).select((col("id") % 1100).cast("string") as "s")
+    val res  = data.edd.histogram(Hist("s", sortByFreq = true)).toDF.collect
+    val hist = EddResult.parseHistJson(res.head.getString(4)).toMap
+
+    assert(hist.size === 1001)
+    assert(hist(EddHistTask.OtherKey) === 100L)
+    assert((0 until 100).forall { i => hist(i.toString) == 2L })
+    assert(hist.values.sum === 1200L)
+  }
+
+  test("test EddHistogram with too many values") {
+    val data = sqlContext.range(1001).select(col("id").cast("double") as "v")
+    val e    = intercept[SmvRuntimeException] { data.edd.histogram(Hist("v", binSize = 0.0)).toDF.collect }
+    assert(e.getMessage contains "Too many values")
+  }
+
+  test("test EddHistogram with clearly too many values fails before counting") {
+    val data = sqlContext.range(5000).select(col("id").cast("double") as "v")
+    // only the distinct count estimate runs
+    assert(countJobs {
+      intercept[SmvRuntimeException] { data.edd.histogram(Hist("v", binSize = 0.0)).toDF.collect }
+    } === 1)
+  }
+
   test("test EddSummary with groupKey") {
     val res = df.select("k", "t").smvGroupBy("k").edd.summary().orderBy("groupKey")
 
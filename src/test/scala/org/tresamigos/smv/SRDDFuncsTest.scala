@@ -295,6 +295,24 @@ class dedupByKeyTest extends SmvTestUtil {
     assertUnorderedSeqEqual(res.collect.map(_.toString), Seq("[1,null,hello]", "[2,10.0,null]"))
   }
 
+  test("test dedupByKey keeps the first record in input order") {
+    val df = dfFrom("a:Integer; b:Integer", (1 to 100).map(i => s"${i % 3},${i}").mkString(";"))
+
+    val res = df.dedupByKey("a")
+    assertUnorderedSeqEqual(res.collect.map(_.toString), Seq("[1,1]", "[2,2]", "[0,3]"))
+    assert(res.schema.fieldNames === Seq("a", "b"))
+  }
+
+  test("test dedupByKey with a map column") {
+    val df = dfFrom("a:Integer; b:Integer", (1 to 100).map(i => s"${i % 3},${i}").mkString(";"))
+      .withColumn("m", map(lit("b"), col("b")))
+
+    val res = df.dedupByKey("a")
+    assertUnorderedSeqEqual(res.collect.map(_.toString),
+      Seq("[1,1,Map(b -> 1)]", "[2,2,Map(b -> 2)]", "[0,3,Map(b -> 3)]"))
+    assert(res.schema === df.schema)
+  }
+
   test("test dedupByKeyWithOrder") {
     val ssc = sqlContext; import ssc.implicits._
     val df  = dfFrom("a:Integer; b:Double; c:String", """1,,hello;
@@ -333,6 +351,24 @@ class smvOverlapCheckTest extends SmvTestUtil {
                             Seq("[a,110]", "[b,110]", "[c,111]", "[d,011]"))
 
   }
+
+  test("test smvOverlapCheck with duplicate keys") {
+    val s1 = dfFrom("k: String; src: Integer", "a,1;a,2;b,3")
+    val s2 = dfFrom("k: String", "a;a;c")
+
+    val res = s1.smvOverlapCheck("k")(s2)
+    assertUnorderedSeqEqual(res.collect.map(_.toString), Seq("[a,11]", "[b,10]", "[c,01]"))
+  }
+
+  test("test smvOverlapCheck with null keys") {
+    val s1 = dfFrom("k: String; v: Integer", "a,1;,2;,3")
+    val s2 = dfFrom("k: String; v: Integer", ",1;a,2")
+    val s3 = dfFrom("k: String", "b")
+
+    val res = s1.smvOverlapCheck("k")(s2, s3)
+    assertUnorderedSeqEqual(res.collect.map(_.toString),
+                            Seq("[a,110]", "[null,100]", "[null,010]", "[b,001]"))
+  }
 }
 
 class smvHashSampleTest extends SmvTestUtil {
@@ -341,7 +377,32 @@ class smvHashSampleTest extends SmvTestUtil {
     val a   = dfFrom("key:String", "a;b;c;d;e;f;g;h;i;j;k")
     val res = a.union(a).smvHashSample($"key", 0.3)
     assertUnorderedSeqEqual(res.collect.map(_.toString),
-                            Seq("[a]", "[g]", "[i]", "[a]", "[g]", "[i]"))
+                            Seq("[e]", "[g]", "[h]", "[k]", "[e]", "[g]", "[h]", "[k]"))
+  }
+
+  test("test smvHashSample is consistent with the hash function") {
+    val ssc = sqlContext; import ssc.implicits._
+    val a   = dfFrom("key:String", "a;b;c;d;e;f;g;h;i;j;k")
+    val res = a.smvHashSample($"key", 0.5, 42)
+    val exp = a.where((hash($"key") bitwiseAND Int.MaxValue) < Int.MaxValue * 0.5)
+    assertDataFramesEqual(res, exp)
+  }
+
+  test("test smvHashSample with multiple keys") {
+    val ssc = sqlContext; import ssc.implicits._
+    val a = dfFrom("k:String;n:Integer",
+                   "a,0;b,1;c,2;d,3;e,4;f,5;g,6;h,7;i,8;j,9;k,10")
+    val res = a.smvHashSample(Seq($"k", $"n"), 0.3, 23)
+    assertUnorderedSeqEqual(res.collect.map(_.toString), Seq("[d,3]", "[e,4]", "[g,6]"))
+  }
+
+  test("test smvStratifiedHashSample") {
+    val ssc = sqlContext; import ssc.implicits._
+    val a = dfFrom("key:String;s:String",
+                   "a,x;b,x;c,x;d,x;e,x;f,x;g,x;h,x;i,x;j,x;k,x;l,y;m,y;n,z")
+    val res = a.smvStratifiedHashSample($"key", $"s", Map[Any, Double]("x" -> 0.3, "y" -> 1.0))
+    assertUnorderedSeqEqual(res.collect.map(_.toString),
+                            Seq("[e,x]", "[g,x]", "[h,x]", "[k,x]", "[l,y]", "[m,y]"))
   }
 }
 
@@ -447,4 +508,33 @@ class OtherDFHelperTest extends SmvTestUtil {
     assertUnorderedSeqEqual(res, Seq("a", "b"))
     assert(cnt === 4)
   }
+
+  test("Test smvDiscoverPK with approx") {
+    val a          = dfFrom("a:String; b:String; c:String; d:String", """1,2,1,x;
+         1,1,2,x;
+         2,1,2,;
+         2,2,2,x;
+         3,1,,""")
+    val (res, cnt) = a.smvDiscoverPK(approx = true)
+
+    assertUnorderedSeqEqual(res, Seq("a", "b"))
+    assert(cnt === 5)
+  }
+
+  test("Test smvDiscoverPK with approx on a wide DataFrame") {
+    import org.apache.spark.sql.functions.col
+    // key is (c0, c1), 98 other low cardinality columns
+    val others = (2 until 100).map { i => (col("id") % 2 + i) as s"c${i}" }
+    val wide = sparkSession.range(200).select(
+      Seq(col("id") % 10 as "c0", col("id") / 10 cast "long" as "c1") ++ others: _*)
+
+    val (res, cnt) = wide.smvDiscoverPK(approx = true)
+    assertUnorderedSeqEqual(res, Seq("c0", "c1"))
+    assert(cnt === 200)
+
+    val e = intercept[SmvRuntimeException] {
+      new PrimaryKeyDiscovery(false).discoverPKApprox(wide, 10000, maxArity = 12)
+    }
+    assert(e.getMessage.startsWith("Too many column combinations"))
+  }
 }
@@ -160,4 +160,58 @@ class SchemaDiscoveryTest extends SmvTestUtil {
     //When one record in one format and the second in a different format should default to StringType
     assert(helper.getTypeFormat(DateTypeFormat("MM-dd-yyyy"), "Jan-01-2001") === StringTypeFormat())
   }
+
+  test("Test mergeTypeFormat follows the type promotions") {
+    import SchemaDiscoveryHelper.mergeTypeFormat
+    assert(mergeTypeFormat(null, IntegerTypeFormat()) === IntegerTypeFormat())
+    assert(mergeTypeFormat(IntegerTypeFormat(), LongTypeFormat()) === LongTypeFormat())
+    assert(mergeTypeFormat(FloatTypeFormat(), IntegerTypeFormat()) === FloatTypeFormat())
+    assert(mergeTypeFormat(LongTypeFormat(), FloatTypeFormat()) === DoubleTypeFormat())
+    assert(mergeTypeFormat(DateTypeFormat("yyyyMMdd"), IntegerTypeFormat()) === IntegerTypeFormat())
+    assert(mergeTypeFormat(DateTypeFormat("yyyyMMdd"), DateTypeFormat("yyyy-MM-dd")) === StringTypeFormat())
+    assert(mergeTypeFormat(BooleanTypeFormat(), IntegerTypeFormat()) === StringTypeFormat())
+    assert(mergeTypeFormat(TimestampTypeFormat("yyyy-MM-dd HH:mm:ss"), TimestampTypeFormat("yyyy-MM-dd HH:mm:ss")) ===
+      TimestampTypeFormat("yyyy-MM-dd HH:mm:ss"))
+  }
+
+  test("Test distributed schema discovery matches the driver side discovery") {
+    val lines  = sqlContext.sparkContext.textFile(testDataDir + "SchemaDiscoveryTest/test3.csv").collect
+    val helper = new SchemaDiscoveryHelper(sqlContext)
+    val ca     = CsvAttributes.defaultCsvWithHeader
+
+    val expected = helper.discoverSchema(sqlContext.sparkContext.parallelize(lines, 1), 10, ca)
+    for (sampling <- Seq(SchemaDiscoveryHelper.SampleRandom, SchemaDiscoveryHelper.SampleStratified)) {
+      // one data line per partition
+      val schema = helper.discoverSchema(sqlContext.sparkContext.parallelize(lines, lines.length), 10, ca, sampling)
+      assert(schema.toString === expected.toString)
+      assert(SmvKeys.getMetaDesc(schema.toStructType.apply("name").metadata) === "123")
+    }
+  }
+
+  test("Test stratified schema discovery samples every file") {
+    resetTestcaseTempDir()
+    val header = "id,amt\n"
+    createTempFile("a.csv", header + (1 to 100).map(i => s"${i},${i}").mkString("\n"))
+    createTempFile("b.csv", header + (1 to 100).map(i => s"${i},${i}.5").mkString("\n"))
+
+    implicit val ca = CsvAttributes.defaultCsvWithHeader
+    val helper      = new SchemaDiscoveryHelper(sqlContext)
+
+    // the head of the data only holds integer amounts
+    val head = helper.discoverSchemaFromFile(testcaseTempDir + "/*.csv", 20)
+    val strat =
+      helper.discoverSchemaFromFile(testcaseTempDir + "/*.csv", 20, SchemaDiscoveryHelper.SampleStratified)
+
+    assert(strat.entries.map(_.field.name) === Seq("id", "amt"))
+    assert(strat.entries(0).typeFormat === IntegerTypeFormat())
+    assert(strat.entries(1).typeFormat === FloatTypeFormat())
+    assert(head.entries(1).typeFormat === IntegerTypeFormat())
+  }
+
+  test("Test reservoirSample keeps the order and the size") {
+    val sampled = SchemaDiscoveryHelper.reservoirSample((1 to 1000).iterator, 10, 1).toSeq
+    assert(sampled.size === 10)
+    assert(sampled === sampled.sorted)
+    assert(SchemaDiscoveryHelper.reservoirSample((1 to 5).iterator, 10, 1).toSeq === (1 to 5))
+  }
 }
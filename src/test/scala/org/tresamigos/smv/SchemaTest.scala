@@ -83,6 +83,30 @@ class SmvSchemaTest extends SmvTestUtil {
     assert(decFormat.valToStr(Decimal("1234")) === "1234")
   }
 
+  test("Test value converters give the same values as strToVal") {
+    val cases = Seq(
+      DoubleTypeFormat()       -> Seq(" 1.5 ", "-0.1", "3.", ".25", "1e5", "12345678901234567890.5", "", "  "),
+      DecimalTypeFormat(8, 3)  -> Seq("1.5", " -12.125", "007", "12345.678", "123456.7", "1.2345", ""),
+      DecimalTypeFormat(30, 2) -> Seq("123456789012345678901234.5", "1.25"),
+      IntegerTypeFormat()      -> Seq(" 12", "-3 ", ""),
+      TimestampTypeFormat("yyyyMMdd HH:mm") -> Seq("20170102 03:04", ""),
+      DateTypeFormat("yyyy/MM/dd")          -> Seq("2017/01/02", "")
+    )
+
+    cases.foreach {
+      case (fmt, values) =>
+        val conv = fmt.newConverter()
+        values.foreach { v =>
+          assert(conv(v) === fmt.strToVal(v), s"for ${fmt} on [${v}]")
+        }
+    }
+  }
+
+  test("Test value converters reject invalid values") {
+    intercept[NumberFormatException] { DoubleTypeFormat().newConverter()("1.2.3") }
+    intercept[NumberFormatException] { DecimalTypeFormat(8, 3).newConverter()("1-2") }
+  }
+
   test("Test Decimal default format") {
     val df = dfFrom("a:Decimal", "1234")
     assertSrddSchemaEqual(df, "a: Decimal[10,0]")
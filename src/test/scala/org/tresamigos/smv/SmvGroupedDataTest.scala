@@ -54,6 +54,24 @@ class SmvGroupedDataTest extends SmvTestUtil {
     )
   }
 
+  test("Test smvTopNRecs") {
+    val ssc = sqlContext; import ssc.implicits._
+    val df = dfFrom("k:String; v:Integer; t:String",
+                    """a,1,x; a,5,y; a,3,z; a,,w; b,2,x; b,2,y; ,4,x; ,1,y""").repartition(3)
+
+    // nulls last with desc order, null key is a group of its own
+    val res = df.smvGroupBy("k").smvTopNRecs(2, $"v".desc, $"t")
+    assertSrddSchemaEqual(res, "k:String; v:Integer; t:String")
+    assertUnorderedSeqEqual(res.collect.map(_.toString),
+                            Seq("[a,5,y]", "[a,3,z]", "[b,2,x]", "[b,2,y]", "[null,4,x]", "[null,1,y]"))
+
+    // exactly N records per group on ties
+    assert(df.smvGroupBy("k").smvTopNRecs(1, $"v".desc).where($"k" === "b").count === 1)
+
+    // global top N is sorted
+    assert(df.smvTopNRecs(3, $"v".desc).collect.map(_.getInt(1)).toSeq === Seq(5, 4, 3))
+  }
+
   test("Test smvRePartition function") {
     val ssc = sqlContext; import ssc.implicits._
 
@@ -69,6 +87,17 @@ class SmvGroupedDataTest extends SmvTestUtil {
     assert(res.rdd.partitions.size === 2)
   }
 
+  test("Test smvRePartition is reused by an aggregation on the keys") {
+    import org.apache.spark.sql.functions
+    import org.apache.spark.sql.execution.exchange.ShuffleExchange
+
+    val df  = dfFrom("k:String; t:Integer; v:Double", "z,1,0.2;z,2,1.4;z,5,2.2;a,1,0.3;")
+    val res = df.smvGroupBy("k").smvRePartition(2).toDF.groupBy("k").agg(functions.sum("v") as "v")
+    val exchanges = res.queryExecution.executedPlan.collect { case e: ShuffleExchange => e }
+    assert(exchanges.size === 1)
+    assertUnorderedSeqEqual(res.collect.map(_.toString), Seq("[a,0.3]", "[z,3.8]"))
+  }
+
   test("test fillExpectedWithNull") {
     val df  = dfFrom("k:String; v:String; t:Integer", "1,a,1;1,b,2;1,a,3;1,d,1")
     val res = df.smvGroupBy("k").fillExpectedWithNull("v", Set("a", "b", "c"), true)
@@ -66,6 +66,59 @@ class SmvHDFSTest extends SmvTestUtil {
     assert(mt0 < mt1)
   }
 
+  test("Test fingerprint of directories and glob patterns") {
+    resetTestcaseTempDir()
+    Seq("d/sub", "d/.hidden").foreach(d => new java.io.File(testcaseTempDir, d).mkdirs())
+    createTempFile("d/F1.csv", "a")
+    createTempFile("d/sub/F2.csv", "b")
+
+    val dir       = s"${testcaseTempDir}/d"
+    val glob      = s"${testcaseTempDir}/d/*.csv"
+    val recursive = new org.apache.hadoop.conf.Configuration()
+    recursive.setBoolean(SmvHDFS.InputDirRecursiveKey, true)
+
+    val fp0  = SmvHDFS.fingerprint(dir)
+    val rfp0 = SmvHDFS.fingerprint(dir, false, recursive)
+    val gp0  = SmvHDFS.fingerprint(glob)
+
+    // stable, and covers the files of sub-directories only when reading recursively
+    assert(SmvHDFS.fingerprint(dir) === fp0)
+    assertUnorderedSeqEqual(SmvHDFS.matchedFiles(dir).map(_.getPath.getName), Seq("F1.csv"))
+    assertUnorderedSeqEqual(SmvHDFS.matchedFiles(dir, true).map(_.getPath.getName),
+                            Seq("F1.csv", "F2.csv"))
+
+    // hidden files do not count
+    createTempFile("d/_SUCCESS", "")
+    createTempFile("d/.hidden/F3.csv", "c")
+    assert(SmvHDFS.fingerprint(dir) === fp0)
+    assert(SmvHDFS.fingerprint(dir, false, recursive) === rfp0)
+
+    // a file in a sub-directory only changes the recursive directory fingerprint
+    createTempFile("d/sub/F4.csv", "d")
+    assert(SmvHDFS.fingerprint(dir) === fp0)
+    assert(SmvHDFS.fingerprint(dir, false, recursive) !== rfp0)
+    assert(SmvHDFS.fingerprint(glob) === gp0)
+
+    // a rewritten file changes all of them
+    createTempFile("d/F1.csv", "aa")
+    assert(SmvHDFS.fingerprint(dir) !== fp0)
+    assert(SmvHDFS.fingerprint(glob) !== gp0)
+  }
+
+  test("Test matchedFiles splits paths outside of glob braces") {
+    resetTestcaseTempDir()
+    Seq("a", "b", "c").foreach(d => new java.io.File(testcaseTempDir, d).mkdirs())
+    createTempFile("a/F1.csv", "a")
+    createTempFile("b/F2.csv", "b")
+    createTempFile("c/F3.csv", "c")
+
+    assert(SmvHDFS.splitPaths("x/{a,b}/*.csv,y,z/{c,{d,e}}") === Seq("x/{a,b}/*.csv", "y", "z/{c,{d,e}}"))
+
+    val paths = s"${testcaseTempDir}/{a,b}/*.csv,${testcaseTempDir}/c"
+    assertUnorderedSeqEqual(SmvHDFS.matchedFiles(paths).map(_.getPath.getName),
+                            Seq("F1.csv", "F2.csv", "F3.csv"))
+  }
+
   test("Test HDFS file read") {
     resetTestcaseTempDir()
 
@@ -53,4 +53,18 @@ class SmvSkewJoinTest extends SmvTestUtil {
     val explanation = dfExplanation(skewJoinRes)
     assert(explanation contains ("BroadcastHashJoin"))
   }
+
+  test("Test smvSkewJoinByKey with detected skew is same as smvJoinByKey") {
+    val df1 = dfFrom("a:Integer;b:String", """1,a;2,b;3,c;4,d;4,e;4,f;4,g;4,h;;i""")
+    val df2 = dfFrom("a:Integer;c:String", """2,x;3,y;4,z;4,w;4,v;5,u;;t""")
+
+    Seq(SmvJoinType.Inner, SmvJoinType.LeftOuter, SmvJoinType.RightOuter, SmvJoinType.Outer)
+      .foreach { joinType =>
+        val normalJoinRes = df1.smvJoinByKey(df2, Seq("a"), joinType)
+        val skewJoinRes = df1.smvSkewJoinByKey(df2, joinType, "a",
+                                               threshold = 0.3, numBuckets = 3, sampleRate = 1.0)
+        assertUnorderedSeqEqual(skewJoinRes.collect.map(_.toString),
+                                normalJoinRes.collect.map(_.toString))
+      }
+  }
 }
@@ -0,0 +1,68 @@
+package org.tresamigos.smv
+
+import org.tresamigos.smv.dqm._
+
+class SparkCsvEngineTest extends SmvTestUtil {
+  // the corrupt record column of the native CSV reader requires Spark 2.2+
+  private def assumeSpark22() = {
+    val Array(major, minor) = org.apache.spark.SPARK_VERSION.split("\\.").take(2).map(_.toInt)
+    assume(major > 2 || (major == 2 && minor >= 2))
+  }
+
+  private def sparkOpen(path: String, schemaStr: String, logger: ParserLogger = TerminateParserLogger) = {
+    val handler = new FileIOHandler(sparkSession, path)
+    handler.sparkCsvFileWithSchema(null, SmvSchema.fromString(schemaStr), logger)
+  }
+
+  test("Spark CSV engine reads the same data as the default parser") {
+    assumeSpark22()
+    val schemaStr =
+      "@has-header = true;name:String[,NA];age:Integer;amt:Double;ts:Timestamp[yyyyMMdd];dt:Date[yyyy/MM/dd]"
+    createTempFile("sparkEngine1.csv",
+                   "name,age,amt,ts,dt\n" +
+                     "\"Bob\",22, 1.5,20170101,2017/01/02\n" +
+                     "NA, ,,,\n" +
+                     "\"Fred, Jr\",24,3.,20170301,2017/03/02\n")
+    val path = testcaseTempDir + "/sparkEngine1.csv"
+
+    val res = sparkOpen(path, schemaStr)
+    val exp = new FileIOHandler(sparkSession, path)
+      .csvFileWithSchema(null, SmvSchema.fromString(schemaStr), TerminateParserLogger)
+
+    assert(res.schema === exp.schema)
+    assertDataFramesEqual(res, exp)
+  }
+
+  test("Spark CSV engine reports parser errors to the parser logger") {
+    assumeSpark22()
+    createTempFile("sparkEngine2.csv", "a,1\nb,x\nc,3\n")
+    val path = testcaseTempDir + "/sparkEngine2.csv"
+
+    val dqmState = new DQMState(sc, Nil, Nil)
+    val res      = sparkOpen(path, "@has-header = false;k:String;v:Integer", new ParserValidation(dqmState))
+
+    assertSrddDataEqual(res, "a,1;c,3")
+    dqmState.snapshot()
+    assert(dqmState.getParserCount() === 1)
+    assertStrMatches(dqmState.getParserLog().head, "b,x".r)
+  }
+
+  test("Spark CSV engine rejects decimals in integral fields") {
+    assumeSpark22()
+    createTempFile("sparkEngine3.csv", "a,1,10\nb,1.5,20\nc,3,3.0\nd,-4,+40\n")
+    val path = testcaseTempDir + "/sparkEngine3.csv"
+
+    val dqmState = new DQMState(sc, Nil, Nil)
+    val res = sparkOpen(path, "@has-header = false;k:String;v:Integer;w:Long", new ParserValidation(dqmState))
+
+    assertSrddDataEqual(res, "a,1,10;d,-4,40")
+    dqmState.snapshot()
+    assert(dqmState.getParserCount() === 2)
+  }
+
+  test("Spark CSV engine rejects Map and Array fields") {
+    intercept[SmvUnsupportedType] {
+      sparkOpen(testcaseTempDir + "/none.csv", "m:Map[String,Integer]")
+    }
+  }
+}
@@ -0,0 +1,64 @@
+package org.tresamigos.smv
+package benchmark
+
+import java.io.ByteArrayOutputStream
+
+import org.apache.hadoop.conf.Configuration
+import org.apache.hadoop.fs.Path
+import org.apache.spark.sql.SparkSession
+import org.apache.spark.sql.functions._
+import org.tresamigos.smv.dqm.TerminateParserLogger
+
+import scala.util.Try
+
+/**
+ * Write and read throughput of SMV csv persistence per compression codec.
+ * Codecs which are not available in this environment (e.g. snappy or zstd without
+ * the Hadoop native library) are skipped.
+ */
+object CsvCodecBenchmark extends SmvBenchmark {
+  val Codecs = Seq(null, "gzip", "bzip2", "snappy", "zstd")
+
+  /** the codec is known, and its native library (if any) is loaded */
+  def available(codec: String, conf: Configuration): Boolean =
+    Try(FileIOHandler.compressionCodec(codec, conf).foreach {
+      _.createOutputStream(new ByteArrayOutputStream).close()
+    }).isSuccess
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val df = spark
+      .range(numRows)
+      .select(
+        col("id"),
+        concat(lit("name "), col("id") % 1000).as("name"),
+        ((col("id") % 10000) / 7.0).as("amt"),
+        (col("id") % 100).cast("int").as("qty")
+      )
+      .cache
+    df.count
+
+    for (codec <- Codecs) {
+      val name = Option(codec).getOrElse("none")
+      if (!available(codec, spark.sparkContext.hadoopConfiguration)) {
+        println(s"skipping ${name}: codec not available")
+      } else {
+        val path    = s"${System.getProperty("java.io.tmpdir")}/smv_bench_codec_${name}_${numRows}.csv"
+        val handler = new FileIOHandler(spark, path)
+
+        measure(s"write ${name}", numRows) {
+          SmvHDFS.deleteFile(path)
+          handler.saveAsCsvWithSchema(df, strNullValue = "_SmvStrNull_", compression = codec)
+        }
+
+        val schema = SmvSchema.fromFile(spark.sparkContext, SmvSchema.dataPathToSchemaPath(path))
+        measure(s"read ${name}", numRows) {
+          handler.csvFileWithSchema(null, schema, TerminateParserLogger).agg(sum("amt")).collect
+        }
+
+        val p     = new Path(path)
+        val bytes = p.getFileSystem(spark.sparkContext.hadoopConfiguration).getContentSummary(p).getLength
+        println(f"${name}%-10s on disk: ${bytes / 1024.0 / 1024.0}%.1f MB")
+      }
+    }
+  }
+}
@@ -0,0 +1,46 @@
+package org.tresamigos.smv
+package benchmark
+
+import org.apache.spark.sql.SparkSession
+import org.apache.spark.sql.functions._
+import org.tresamigos.smv.dqm.TerminateParserLogger
+
+/** Compare the default opencsv parser with the Spark native CSV engine */
+object CsvIngestBenchmark extends SmvBenchmark {
+  val SchemaStr =
+    "@has-header = false;id:Long;name:String;amt:Double;qty:Integer;ts:Timestamp[yyyy-MM-dd HH:mm:ss];dt:Date"
+
+  /** write a csv file with numRows rows, returns its path */
+  def createFile(spark: SparkSession, numRows: Long): String = {
+    val path = s"${System.getProperty("java.io.tmpdir")}/smv_bench_csv_${numRows}"
+    SmvHDFS.deleteFile(path)
+    spark
+      .range(numRows)
+      .select(
+        concat_ws(
+          ",",
+          col("id"),
+          concat(lit("\"name "), col("id") % 1000, lit("\"")),
+          (col("id") % 10000) / 7.0,
+          col("id") % 100,
+          lit("2017-03-04 05:06:07"),
+          lit("2017-03-04")
+        ))
+      .write
+      .text(path)
+    path
+  }
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val path    = createFile(spark, numRows)
+    val schema  = SmvSchema.fromString(SchemaStr)
+    val handler = new FileIOHandler(spark, path)
+
+    measure("smv opencsv parser", numRows) {
+      handler.csvFileWithSchema(null, schema, TerminateParserLogger).agg(sum("amt")).collect
+    }
+    measure("spark native csv engine", numRows) {
+      handler.sparkCsvFileWithSchema(null, schema, TerminateParserLogger).agg(sum("amt")).collect
+    }
+  }
+}
@@ -0,0 +1,41 @@
+package org.tresamigos.smv
+package benchmark
+
+import org.apache.spark.sql.{DataFrame, Row, SparkSession}
+import org.apache.spark.sql.functions._
+
+/**
+ * dedupByKey on skewed keys: half of the rows share a single key, the other half
+ * are spread over many keys. Compared with the former RDD groupBy implementation,
+ * which materializes every group.
+ */
+object DedupBenchmark extends SmvBenchmark {
+
+  /** the former implementation, kept here as the baseline */
+  def rddGroupByDedup(df: DataFrame, keys: String*): DataFrame = {
+    val ordinals = df.schema.getIndices(keys: _*)
+    val rdd = df.rdd.groupBy { row: Row =>
+      ordinals.map(row(_))
+    }.values.map(_.head)
+    df.sqlContext.createDataFrame(rdd, df.schema)
+  }
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val df = spark
+      .range(numRows)
+      .select(
+        when(col("id") % 2 === 0, lit(0L)).otherwise(col("id") % 100000).as("k"),
+        col("id").as("v"),
+        concat(lit("payload "), col("id")).as("s")
+      )
+      .cache
+    df.count
+
+    measure("rdd groupBy dedup (skewed)", numRows) {
+      rddGroupByDedup(df, "k").count
+    }
+    measure("dedupByKey (skewed)", numRows) {
+      df.dedupByKey("k").count
+    }
+  }
+}
@@ -0,0 +1,68 @@
+package org.tresamigos.smv
+package benchmark
+
+import org.apache.spark.sql.{Row, SparkSession}
+import org.apache.spark.sql.expressions.{MutableAggregationBuffer, UserDefinedAggregateFunction}
+import org.apache.spark.sql.functions._
+import org.apache.spark.sql.types._
+
+/**
+ * String histograms on a high-cardinality column: the map-buffer UDAF, which EDD histograms
+ * used to run on, the native groupBy count plan of EDD histograms, and a plain groupBy count.
+ * The UDAF fails beyond 1000 distinct values, so it only runs on the 1000 values column;
+ * the EDD histogram also runs on a column with many more distinct values, with an "other"
+ * bucket.
+ */
+object HistogramBenchmark extends SmvBenchmark {
+
+  /** the former EDD implementation (same as `histStr`), kept here as the baseline */
+  object udafHistStr extends UserDefinedAggregateFunction {
+    def inputSchema   = new StructType().add("v", StringType)
+    def bufferSchema  = new StructType().add("map", DataTypes.createMapType(StringType, LongType))
+    def dataType      = DataTypes.createMapType(StringType, LongType)
+    def deterministic = true
+
+    def initialize(buffer: MutableAggregationBuffer) = buffer.update(0, Map(): Map[Any, Long])
+
+    def update(buffer: MutableAggregationBuffer, input: Row) = {
+      val m = buffer.getMap(0).asInstanceOf[Map[Any, Long]]
+      val k = input.get(0)
+      buffer.update(0, m + (k -> (m.getOrElse(k, 0L) + 1L)))
+    }
+
+    def merge(buffer1: MutableAggregationBuffer, buffer2: Row) = {
+      val m1 = buffer1.getMap(0).asInstanceOf[Map[Any, Long]]
+      val m2 = buffer2.getMap(0).asInstanceOf[Map[Any, Long]]
+      buffer1.update(0, (m1 /: m2) { case (map, (k, v)) => map + (k -> (map.getOrElse(k, 0L) + v)) })
+    }
+
+    def evaluate(buffer: Row) = buffer.getMap(0)
+  }
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val df = spark
+      .range(numRows)
+      .select(
+        concat(lit("v"), col("id") % 1000).as("s1k"),
+        concat(lit("v"), col("id") % 100000).as("s100k")
+      )
+      .cache
+    df.count
+
+    measure("udaf histogram (1000 values)", numRows) {
+      df.agg(udafHistStr(col("s1k"))).collect
+    }
+    measure("edd histogram (1000 values)", numRows) {
+      df.edd.histogram("s1k").toDF.collect
+    }
+    measure("groupBy count (1000 values)", numRows) {
+      df.groupBy("s1k").count.collect
+    }
+    measure("edd histogram with other bucket (100000 values)", numRows) {
+      df.edd.histogram("s100k").toDF.collect
+    }
+    measure("groupBy count (100000 values)", numRows) {
+      df.groupBy("s100k").count.collect
+    }
+  }
+}
@@ -0,0 +1,77 @@
+/*
+ * This file is licensed under the Apache License, Version 2.0
+ * (the "License"); you may not use this file except in compliance with
+ * the License.  You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package org.tresamigos.smv
+package benchmark
+
+import java.nio.file.Files
+
+import org.apache.spark.sql.{SaveMode, SparkSession}
+import org.apache.spark.sql.functions._
+import org.tresamigos.smv.jdbc.{JdbcDialectHelper, JdbcHelper}
+
+/**
+ * JDBC write throughput against an embedded Derby database, with Spark's default
+ * options and with the batching, writer count and upsert options of SmvJdbcOutputTable.
+ *
+ * sbt "test:runMain org.tresamigos.smv.benchmark.JdbcWriteBenchmark 200000"
+ */
+object JdbcWriteBenchmark extends SmvBenchmark {
+  override def defaultNumRows = 200000L
+
+  val Driver = "org.apache.derby.jdbc.EmbeddedDriver"
+
+  override def run(spark: SparkSession, numRows: Long): Unit = {
+    JdbcDialectHelper.registerDerby()
+    val url = s"jdbc:derby:${Files.createTempDirectory("smvbench")}/derby;create=true"
+
+    val df = spark
+      .range(numRows)
+      .select(col("id").cast("int").as("ID"), (rand(1) * 1000).cast("int").as("V"))
+      .repartition(8)
+      .cache()
+    df.count()
+
+    def write(name: String, batchSize: Int, numWriters: Int): Unit = {
+      val props = new java.util.Properties()
+      props.put("driver", Driver)
+      if (batchSize > 0) props.put("batchsize", batchSize.toString)
+      val data = if (numWriters > 0) df.coalesce(numWriters) else df
+      measure(name, numRows) {
+        data.write.mode(SaveMode.Overwrite).jdbc(url, "BENCH_" + name.replaceAll("\\W", "_"), props)
+      }
+    }
+
+    write("default", 0, 0)
+    write("batchsize=10000", 10000, 0)
+    write("batchsize=10000 writers=2", 10000, 2)
+    write("batchsize=10000 writers=4", 10000, 4)
+
+    // upsert 10% of the rows of an existing table, which has an index on the key like a real target would
+    val props = new java.util.Properties()
+    props.put("driver", Driver)
+    props.put("batchsize", "10000")
+    df.write.mode(SaveMode.Overwrite).jdbc(url, "BENCH_UPSERT", props)
+    val conn = java.sql.DriverManager.getConnection(url)
+    try conn.createStatement().executeUpdate("CREATE INDEX BENCH_UPSERT_ID ON BENCH_UPSERT(\"ID\")")
+    finally conn.close()
+
+    val updates = df.where(col("ID") % 10 === 0).withColumn("V", col("V") + 1)
+    measure("upsert by key (staging + merge)", numRows / 10) {
+      updates.write.mode(SaveMode.Overwrite).jdbc(url, "BENCH_UPSERT_STAGE", props)
+      JdbcHelper.mergeFromStaging(
+        url, Driver, null, null, "BENCH_UPSERT", "BENCH_UPSERT_STAGE", Array("ID"), Array("ID", "V"))
+    }
+  }
+}
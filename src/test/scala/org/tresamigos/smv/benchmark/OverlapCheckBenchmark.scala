@@ -0,0 +1,63 @@
+package org.tresamigos.smv
+package benchmark
+
+import org.apache.spark.sql.{DataFrame, SparkSession}
+import org.apache.spark.sql.functions._
+
+/**
+ * smvOverlapCheck over 2, 5 and 10 inputs, with overlapping key ranges. Compared
+ * with the former implementation, which folds one full outer join per input.
+ */
+object OverlapCheckBenchmark extends SmvBenchmark {
+
+  /** the former implementation, kept here as the baseline */
+  def joinFoldOverlapCheck(df: DataFrame, key: String, partition: Int = 4)(
+      dfother: DataFrame*): DataFrame = {
+    import df.sqlContext.implicits._
+
+    val dfSimple = df.select($"${key}", $"${key}" as s"${key}_0").repartition(partition)
+    val otherSimple = dfother.zipWithIndex.map {
+      case (df, i) =>
+        val newkey = s"${key}_${i + 1}"
+        (newkey, df.select($"${key}" as newkey).repartition(partition))
+    }
+
+    val joined = otherSimple.foldLeft(dfSimple) { (c, p) =>
+      val newkey = p._1
+      val r      = p._2
+      c.join(r, $"${key}" === $"${newkey}", SmvJoinType.Outer)
+        .smvSelectPlus(coalesce($"${key}", $"${newkey}") as "tmp")
+        .smvSelectMinus(key)
+        .smvRenameField("tmp" -> key)
+    }
+
+    val hasCols = Range(0, otherSimple.size + 1).map { i =>
+      val newkey = s"${key}_${i}"
+      when($"${newkey}".isNull, "0").otherwise("1")
+    }
+
+    joined.select($"${key}", smvfuncs.smvStrCat(hasCols: _*) as "flag")
+  }
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val inputs = (0 until 10).map { i =>
+      // each input covers numRows keys, shifted by a tenth of the range from the previous one
+      val df = spark
+        .range(numRows)
+        .select((col("id") + lit(i * numRows / 10)).as("k"))
+        .cache
+      df.count
+      df
+    }
+
+    Seq(2, 5, 10).foreach { n =>
+      val (first, others) = (inputs.head, inputs.slice(1, n))
+      measure(s"join fold overlap check (${n} inputs)", numRows * n) {
+        joinFoldOverlapCheck(first, "k")(others: _*).count
+      }
+      measure(s"smvOverlapCheck (${n} inputs)", numRows * n) {
+        first.smvOverlapCheck("k")(others: _*).count
+      }
+    }
+  }
+}
@@ -0,0 +1,63 @@
+package org.tresamigos.smv
+package benchmark
+
+import org.apache.spark.sql.SparkSession
+import org.apache.spark.sql.functions._
+import org.tresamigos.smv.dqm.TerminateParserLogger
+
+/**
+ * Measure the SmvSchema value conversion of the CSV read path on numeric,
+ * decimal and timestamp heavy data.
+ *
+ * Compares the per-partition converters with the per-value `SmvSchema.toValue`
+ * dispatch on the same parsed fields, and times a full file read.
+ */
+object SchemaParseBenchmark extends SmvBenchmark {
+  override def defaultNumRows = 10000000L
+
+  val SchemaStr =
+    "@has-header = false;i:Integer;l:Long;d:Double;dec:Decimal[12,2];ts:Timestamp[yyyy-MM-dd HH:mm:ss];s:String"
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val path = s"${System.getProperty("java.io.tmpdir")}/smv_bench_schema_${numRows}"
+    SmvHDFS.deleteFile(path)
+    spark
+      .range(numRows)
+      .select(
+        concat_ws(
+          ",",
+          col("id") % 100000,
+          col("id"),
+          concat(lit(" "), (col("id") % 10000) / 8.0, lit(" ")),
+          ((col("id") % 1000000) / 100.0).cast("decimal(12,2)"),
+          lit("2017-03-04 05:06:07"),
+          lit("abc")
+        ))
+      .write
+      .text(path)
+
+    val schema = SmvSchema.fromString(SchemaStr)
+    val fields = spark.sparkContext.textFile(path).map(_.split(",", -1).toSeq).cache
+    fields.count
+
+    measure("SmvSchema.toValue per value", numRows) {
+      fields.map { r =>
+        r.zipWithIndex.map { case (v, i) => schema.toValue(i, v) }
+      }.count
+    }
+    measure("SmvSchema.valueConverters", numRows) {
+      fields.mapPartitions { it =>
+        val converters = schema.valueConverters()
+        it.map { r =>
+          val a = new Array[Any](converters.length)
+          var i = 0
+          while (i < a.length) { a(i) = converters(i)(r(i)); i += 1 }
+          a
+        }
+      }.count
+    }
+    measure("full read through FileIOHandler", numRows) {
+      new FileIOHandler(spark, path).csvFileWithSchema(null, schema, TerminateParserLogger).count
+    }
+  }
+}
@@ -0,0 +1,43 @@
+package org.tresamigos.smv.benchmark
+
+import org.apache.spark.sql.SparkSession
+
+/**
+ * Minimal harness for the micro-benchmarks in this package.
+ *
+ * Benchmarks are not part of the test suite. Run them with, for example,
+ * {{{
+ * sbt "test:runMain org.tresamigos.smv.benchmark.CsvIngestBenchmark 10000000"
+ * }}}
+ * The first command line argument, when given, is the number of rows.
+ */
+trait SmvBenchmark {
+  /** default number of rows, could be overridden on the command line */
+  def defaultNumRows: Long = 1000000L
+
+  def run(spark: SparkSession, numRows: Long): Unit
+
+  /** run `body` once to warm up, then `iters` times, and print the best and average time */
+  def measure(name: String, numRows: Long, iters: Int = 3)(body: => Unit): Unit = {
+    body
+    val times = (1 to iters).map { _ =>
+      val start = System.nanoTime
+      body
+      (System.nanoTime - start) / 1e9
+    }
+    val best = times.min
+    println(f"${name}%-40s best ${best}%8.3fs  avg ${times.sum / iters}%8.3fs  ${numRows / best}%12.0f rows/s")
+  }
+
+  def main(args: Array[String]): Unit = {
+    val numRows = args.headOption.map(_.toLong).getOrElse(defaultNumRows)
+    val spark = SparkSession.builder
+      .master("local[*]")
+      .appName(getClass.getSimpleName)
+      .config("spark.ui.enabled", "false")
+      .getOrCreate()
+    spark.sparkContext.setLogLevel("ERROR")
+    try run(spark, numRows)
+    finally spark.stop()
+  }
+}
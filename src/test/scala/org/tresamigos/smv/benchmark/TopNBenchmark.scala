@@ -0,0 +1,40 @@
+package org.tresamigos.smv
+package benchmark
+
+import org.apache.spark.sql.{Column, DataFrame, SparkSession}
+import org.apache.spark.sql.expressions.Window
+import org.apache.spark.sql.functions._
+
+/** smvTopNRecs on large groups with a small N, compared with the former window implementation */
+object TopNBenchmark extends SmvBenchmark {
+
+  /** the former implementation, kept here as the baseline */
+  def windowTopN(df: DataFrame, keys: Seq[String], n: Int, orders: Column*): DataFrame = {
+    val w = Window.partitionBy(keys.map(col): _*).orderBy(orders: _*)
+    df.withColumn("_rank", rank() over w)
+      .withColumn("_rownum", row_number() over w)
+      .where(col("_rank") <= n && col("_rownum") <= n)
+      .drop("_rank", "_rownum")
+  }
+
+  def run(spark: SparkSession, numRows: Long): Unit = {
+    val df = spark
+      .range(numRows)
+      .select(
+        (col("id") % 100).as("k"),
+        (rand(1) * 1000000).cast("long").as("v"),
+        concat(lit("payload "), col("id")).as("s")
+      )
+      .cache
+    df.count
+
+    for (n <- Seq(1, 10)) {
+      measure(s"window top ${n} (100 groups)", numRows) {
+        windowTopN(df, Seq("k"), n, col("v").desc).count
+      }
+      measure(s"smvTopNRecs ${n} (100 groups)", numRows) {
+        df.smvGroupBy("k").smvTopNRecs(n, col("v").desc).count
+      }
+    }
+  }
+}